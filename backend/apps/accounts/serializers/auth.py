@@ -37,6 +37,12 @@ class VerifyOTPSerializer(serializers.Serializer):
         max_length=6,
         help_text='6-digit OTP'
     )
+    cart_session_id = serializers.CharField(
+        required=False,
+        allow_blank=True,
+        max_length=255,
+        help_text='Guest cart session to merge into the account cart'
+    )
     
     def validate_email(self, value):
         return value.lower().strip()
@@ -84,7 +84,7 @@ class AuthService:
         return response
     
     @staticmethod
-    def verify_otp(email: str, otp: str, ip_address: str = None) -> dict:
+    def verify_otp(email: str, otp: str, ip_address: str = None, cart_session_id: str = None) -> dict:
         """
         Verify OTP and return JWT tokens.
         
@@ -92,6 +92,7 @@ class AuthService:
             email: User's email address
             otp: The OTP to verify
             ip_address: Client IP address for logging
+            cart_session_id: Guest cart session to merge into the user's cart
         
         Returns:
             dict with access token, refresh token, and user data
@@ -156,6 +157,9 @@ class AuthService:
         
         logger.info(f"User {email} logged in successfully")
         
+        if cart_session_id and user.role == RoleChoices.CUSTOMER:
+            AuthService._merge_guest_cart(cart_session_id, user)
+        
         return {
             'access': str(refresh.access_token),
             'refresh': str(refresh),
@@ -169,6 +173,21 @@ class AuthService:
             }
         }
     
+    @staticmethod
+    def _merge_guest_cart(cart_session_id: str, user):
+        """Merge a guest cart into the user's cart; never blocks login."""
+        from apps.customers.services import CartService, CartCacheStore
+        
+        if not CartService.is_valid_session_id(cart_session_id):
+            return
+        try:
+            CartService.merge_guest_cart(cart_session_id, user)
+        except Exception:
+            logger.exception(f"Failed to merge guest cart for user {user.id}")
+            return
+        CartCacheStore.invalidate_session(cart_session_id)
+        CartCacheStore.invalidate_user(user.id)
+    
     @staticmethod
     def refresh_token(refresh_token: str) -> dict:
         """
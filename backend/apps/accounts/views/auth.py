@@ -88,7 +88,11 @@ class VerifyOTPView(APIView):
         result = AuthService.verify_otp(
             email=serializer.validated_data['email'],
             otp=serializer.validated_data['otp'],
-            ip_address=get_client_ip(request)
+            ip_address=get_client_ip(request),
+            cart_session_id=(
+                serializer.validated_data.get('cart_session_id')
+                or request.headers.get('X-Cart-Session')
+            )
         )
         
         return Response({
@@ -0,0 +1,73 @@
+"""
+Management command to remind customers about abandoned carts and delete
+stale guest carts.
+
+Intended to run from cron every hour.
+
+Usage:
+    python manage.py cleanup_carts
+    python manage.py cleanup_carts --abandoned-after-hours 6 --guest-retention-days 14
+    python manage.py cleanup_carts --skip-notify --batch-size 1000
+    python manage.py cleanup_carts --dry-run
+"""
+from django.core.management.base import BaseCommand
+
+from apps.customers.services import CartCleanupService
+
+
+class Command(BaseCommand):
+    help = 'Send abandoned cart reminders and delete idle guest carts'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--abandoned-after-hours',
+            type=int,
+            help='Idle time before a cart is abandoned (default: CART_ABANDONED_AFTER_HOURS)',
+        )
+        parser.add_argument(
+            '--max-age-days',
+            type=int,
+            help='Do not remind about carts idle longer than this (default: CART_ABANDONED_MAX_AGE_DAYS)',
+        )
+        parser.add_argument(
+            '--guest-retention-days',
+            type=int,
+            help='Delete guest carts idle longer than this (default: CART_GUEST_RETENTION_DAYS)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=CartCleanupService.BATCH_SIZE,
+            help='Carts handled per transaction',
+        )
+        parser.add_argument('--skip-notify', action='store_true', help='Do not send reminders')
+        parser.add_argument('--skip-purge', action='store_true', help='Do not delete guest carts')
+        parser.add_argument('--dry-run', action='store_true', help='Only report matching carts')
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+
+        if not options['skip_notify']:
+            result = CartCleanupService.notify_abandoned(
+                idle_hours=options['abandoned_after_hours'],
+                max_age_days=options['max_age_days'],
+                batch_size=options['batch_size'],
+                dry_run=dry_run,
+            )
+            if dry_run:
+                self.stdout.write(f"{result['matched']} abandoned carts would be reminded.")
+            else:
+                self.stdout.write(self.style.SUCCESS(f"Sent {result['notified']} abandoned cart reminders."))
+
+        if not options['skip_purge']:
+            result = CartCleanupService.purge_guest_carts(
+                older_than_days=options['guest_retention_days'],
+                batch_size=options['batch_size'],
+                dry_run=dry_run,
+            )
+            if dry_run:
+                self.stdout.write(f"{result['matched']} guest carts would be deleted.")
+            else:
+                self.stdout.write(self.style.SUCCESS(
+                    f"Deleted {result['deleted']} guest carts ({result['items_deleted']} items)."
+                ))
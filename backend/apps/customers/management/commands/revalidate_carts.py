@@ -0,0 +1,45 @@
+"""
+Management command to revalidate cart prices and stock in bulk.
+
+Intended to run nightly from cron.
+
+Usage:
+    python manage.py revalidate_carts
+    python manage.py revalidate_carts --active-within-days 30 --chunk-size 1000
+    python manage.py revalidate_carts --dry-run
+"""
+from django.core.management.base import BaseCommand
+
+from apps.customers.services import CartRevalidationService
+
+
+class Command(BaseCommand):
+    help = 'Update cart lines to current prices and drop or cap lines without stock'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--active-within-days',
+            type=int,
+            help='Only carts updated within this many days (default: all carts)',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=CartRevalidationService.CHUNK_SIZE,
+            help='Carts revalidated per batch',
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Only report changes')
+
+    def handle(self, *args, **options):
+        result = CartRevalidationService.revalidate_active_carts(
+            active_within_days=options['active_within_days'],
+            chunk_size=options['chunk_size'],
+            apply=not options['dry_run'],
+        )
+
+        prefix = 'Would change' if options['dry_run'] else 'Changed'
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix} {result['lines']} lines in {result['changed_carts']} of {result['carts']} carts."
+        ))
+        for issue, count in sorted(result['issues'].items()):
+            self.stdout.write(f"  {issue}: {count}")
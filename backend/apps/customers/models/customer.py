@@ -2,6 +2,7 @@
 Customer models.
 """
 from django.db import models
+from django.db.models import Sum
 from django.conf import settings
 from core.models import BaseModel
 from core.utils.choices import AddressTypeChoices
@@ -86,7 +87,7 @@ class Cart(BaseModel):
         blank=True,
         related_name='carts'
     )
-    session_id = models.CharField(max_length=255, blank=True, null=True)
+    session_id = models.CharField(max_length=255, blank=True, null=True, db_index=True)
     
     subtotal = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     discount_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
@@ -95,19 +96,24 @@ class Cart(BaseModel):
     
     coupon_code = models.CharField(max_length=50, blank=True, null=True)
     
+    # Set when an abandoned-cart reminder is sent; reset by later activity
+    abandoned_notified_at = models.DateTimeField(null=True, blank=True)
+    
     class Meta:
         verbose_name = 'cart'
         verbose_name_plural = 'carts'
+        indexes = [
+            models.Index(fields=['updated_at']),
+        ]
     
     def __str__(self):
         return f"Cart {self.id} - {self.customer or self.session_id}"
     
     def recalculate(self):
-        """Recalculate cart totals."""
-        items = self.items.all()
-        self.subtotal = sum(item.total_price for item in items)
+        """Recalculate cart totals with a single aggregate query."""
+        self.subtotal = self.items.aggregate(subtotal=Sum('total_price'))['subtotal'] or 0
         self.total = self.subtotal - self.discount_amount + self.tax_amount
-        self.save(update_fields=['subtotal', 'total'])
+        self.save(update_fields=['subtotal', 'total', 'updated_at'])
 
 
 class CartItem(BaseModel):
@@ -137,9 +143,10 @@ class CartItem(BaseModel):
         return f"{self.product.name} x {self.quantity}"
     
     def save(self, *args, **kwargs):
+        # Cart totals are recalculated once per operation by CartService,
+        # not on every item save.
         self.total_price = self.unit_price * self.quantity
         super().save(*args, **kwargs)
-        self.cart.recalculate()
 
 
 class Wishlist(BaseModel):
@@ -63,7 +63,8 @@ class CartSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'subtotal', 'tax_amount', 'total', 'created_at', 'updated_at']
     
     def get_items_count(self, obj):
-        return obj.items.count()
+        # Uses the prefetched items when available
+        return len(obj.items.all())
 
 
 class AddToCartSerializer(serializers.Serializer):
@@ -72,10 +73,35 @@ class AddToCartSerializer(serializers.Serializer):
     quantity = serializers.IntegerField(min_value=1, default=1)
 
 
+class BulkAddToCartSerializer(serializers.Serializer):
+    items = AddToCartSerializer(many=True, allow_empty=False)
+
+
 class UpdateCartItemSerializer(serializers.Serializer):
     quantity = serializers.IntegerField(min_value=0)
 
 
+class CartItemQuantitySerializer(serializers.Serializer):
+    item_id = serializers.IntegerField()
+    quantity = serializers.IntegerField(min_value=0)
+
+
+class BulkUpdateCartItemsSerializer(serializers.Serializer):
+    items = CartItemQuantitySerializer(many=True, allow_empty=False)
+
+
+class CartRevalidationChangeSerializer(serializers.Serializer):
+    """A cart line that no longer matches current price or stock."""
+    item_id = serializers.IntegerField()
+    product_id = serializers.IntegerField()
+    variant_id = serializers.IntegerField(allow_null=True)
+    issues = serializers.ListField(child=serializers.CharField())
+    old_price = serializers.DecimalField(max_digits=10, decimal_places=2)
+    new_price = serializers.DecimalField(max_digits=10, decimal_places=2)
+    old_quantity = serializers.IntegerField()
+    new_quantity = serializers.IntegerField()
+
+
 class WishlistSerializer(serializers.ModelSerializer):
     product = ProductListSerializer(read_only=True)
     
@@ -83,3 +109,15 @@ class WishlistSerializer(serializers.ModelSerializer):
         model = Wishlist
         fields = ['id', 'product', 'created_at']
         read_only_fields = ['id', 'created_at']
+
+
+class CustomerOrderHistorySerializer(serializers.Serializer):
+    """Compact order row for the customer's order history."""
+    id = serializers.IntegerField()
+    order_number = serializers.CharField()
+    order_date = serializers.DateTimeField()
+    status = serializers.CharField()
+    payment_status = serializers.CharField()
+    total_amount = serializers.DecimalField(max_digits=12, decimal_places=2)
+    item_count = serializers.IntegerField()
+    first_item_image = serializers.JSONField(allow_null=True)
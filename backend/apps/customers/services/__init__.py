@@ -0,0 +1,6 @@
+from .cart_service import CartService
+from .cart_store import CartCacheStore
+from .cart_revalidation import CartRevalidationService
+from .cart_cleanup import CartCleanupService
+
+__all__ = ['CartService', 'CartCacheStore', 'CartRevalidationService', 'CartCleanupService']
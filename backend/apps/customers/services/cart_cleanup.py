@@ -0,0 +1,158 @@
+"""
+Abandoned cart service.
+
+Finds carts idle beyond configurable windows through the index on
+Cart.updated_at, sends abandoned-cart reminders in bulk and deletes stale
+guest carts in small chunks so the cart tables stay small.
+"""
+import logging
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+from apps.customers.models import Cart, CartItem
+from apps.customers.services.cart_store import CartCacheStore
+from apps.notifications.models import Notification
+
+logger = logging.getLogger(__name__)
+
+
+class CartCleanupService:
+    """Service class for abandoned cart reminders and guest cart cleanup."""
+
+    BATCH_SIZE = 500
+
+    @staticmethod
+    def abandoned_carts(idle_hours: int = None, max_age_days: int = None):
+        """
+        Customer carts with items, idle for at least `idle_hours` but less
+        than `max_age_days`, not yet reminded since their last change.
+        """
+        if idle_hours is None:
+            idle_hours = getattr(settings, 'CART_ABANDONED_AFTER_HOURS', 24)
+        if max_age_days is None:
+            max_age_days = getattr(settings, 'CART_ABANDONED_MAX_AGE_DAYS', 14)
+
+        now = timezone.now()
+        return Cart.objects.filter(
+            customer__isnull=False,
+            subtotal__gt=0,
+            updated_at__lt=now - timedelta(hours=idle_hours),
+            updated_at__gte=now - timedelta(days=max_age_days),
+        ).filter(
+            Q(abandoned_notified_at__isnull=True) | Q(abandoned_notified_at__lt=F('updated_at'))
+        )
+
+    @staticmethod
+    def notify_abandoned(idle_hours: int = None, max_age_days: int = None,
+                         batch_size: int = None, dry_run: bool = False) -> dict:
+        """
+        Send abandoned-cart reminders in bulk.
+
+        Each batch costs one read, one bulk insert of notifications and one
+        UPDATE marking the carts as reminded. The UPDATE leaves updated_at
+        alone, so a cart is reminded again only after new activity.
+
+        Args:
+            idle_hours: Minimum idle time before a cart counts as abandoned
+            max_age_days: Carts idle longer than this are not reminded
+            batch_size: Carts handled per transaction
+            dry_run: Only count matching carts
+
+        Returns:
+            Dict with matched and notified counts
+        """
+        batch_size = batch_size or CartCleanupService.BATCH_SIZE
+        carts = CartCleanupService.abandoned_carts(idle_hours, max_age_days)
+
+        if dry_run:
+            return {'matched': carts.count(), 'notified': 0}
+
+        matched = notified = 0
+        last_id = 0
+        while True:
+            rows = list(
+                carts.filter(id__gt=last_id)
+                .order_by('id')
+                .annotate(item_count=Count('items'))
+                .values('id', 'customer__user_id', 'total', 'item_count')[:batch_size]
+            )
+            if not rows:
+                break
+            last_id = rows[-1]['id']
+            matched += len(rows)
+
+            notifications = [
+                Notification(
+                    user_id=row['customer__user_id'],
+                    type='promo',
+                    title='You left something in your cart',
+                    message=(
+                        f"Your cart has {row['item_count']} item{'s' if row['item_count'] != 1 else ''} "
+                        f"worth {row['total']} waiting for you."
+                    ),
+                    data={'cart_id': row['id'], 'reason': 'abandoned_cart'},
+                )
+                for row in rows
+            ]
+            with transaction.atomic():
+                Notification.objects.bulk_create(notifications)
+                Cart.objects.filter(id__in=[row['id'] for row in rows]).update(
+                    abandoned_notified_at=timezone.now()
+                )
+            notified += len(notifications)
+
+        logger.info(f"Sent {notified} abandoned cart reminders")
+        return {'matched': matched, 'notified': notified}
+
+    @staticmethod
+    def purge_guest_carts(older_than_days: int = None, batch_size: int = None,
+                          dry_run: bool = False) -> dict:
+        """
+        Delete guest carts idle longer than the retention window.
+
+        Carts are removed a chunk of primary keys at a time, each chunk in
+        its own short transaction, so no long-running lock is held on the
+        cart tables.
+
+        Args:
+            older_than_days: Retention in days (default: CART_GUEST_RETENTION_DAYS)
+            batch_size: Carts deleted per transaction
+            dry_run: Only count matching carts
+
+        Returns:
+            Dict with matched and deleted cart counts and deleted item count
+        """
+        if older_than_days is None:
+            older_than_days = getattr(settings, 'CART_GUEST_RETENTION_DAYS', 30)
+        batch_size = batch_size or CartCleanupService.BATCH_SIZE
+
+        carts = Cart.objects.filter(
+            customer__isnull=True,
+            updated_at__lt=timezone.now() - timedelta(days=older_than_days),
+        )
+        if dry_run:
+            return {'matched': carts.count(), 'deleted': 0, 'items_deleted': 0}
+
+        deleted = items_deleted = 0
+        while True:
+            rows = list(carts.order_by('id').values_list('id', 'session_id')[:batch_size])
+            if not rows:
+                break
+            with transaction.atomic():
+                # Re-check the filter on the locked rows: a guest may have
+                # used or claimed the cart since it was selected
+                locked = dict(
+                    carts.filter(id__in=[cart_id for cart_id, _ in rows])
+                    .select_for_update()
+                    .values_list('id', 'session_id')
+                )
+                items_deleted += CartItem.objects.filter(cart_id__in=list(locked)).delete()[0]
+                deleted += carts.filter(id__in=list(locked)).delete()[0]
+                CartCacheStore.invalidate_keys(
+                    CartCacheStore.session_key(session_id) for session_id in locked.values() if session_id
+                )
+
+        logger.info(f"Deleted {deleted} stale guest carts ({items_deleted} items)")
+        return {'matched': deleted, 'deleted': deleted, 'items_deleted': items_deleted}
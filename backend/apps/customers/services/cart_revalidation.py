@@ -0,0 +1,254 @@
+"""
+Cart revalidation service.
+
+Cart lines snapshot the unit price when added. Before checkout (and in the
+nightly job) lines are checked against current prices and available stock
+for any number of carts using two bulk queries.
+"""
+import logging
+from collections import Counter, defaultdict
+from datetime import timedelta
+from django.db import transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+from apps.customers.models import Cart, CartItem
+from apps.customers.services.cart_store import CartCacheStore
+from apps.inventory.models import Inventory
+from core.utils.constants import ProductStatus
+
+logger = logging.getLogger(__name__)
+
+PRICE_CHANGED = 'price_changed'
+QUANTITY_CAPPED = 'quantity_capped'
+OUT_OF_STOCK = 'out_of_stock'
+UNAVAILABLE = 'unavailable'
+
+
+class CartRevalidationService:
+    """Service class for revalidating cart prices and stock in bulk."""
+    
+    CHUNK_SIZE = 500
+
+    @staticmethod
+    def revalidate(cart_ids, apply: bool = False) -> list:
+        """
+        Compare cart lines against current prices and stock.
+
+        Args:
+            cart_ids: IDs of the carts to check
+            apply: Write the corrections (new prices, capped quantities,
+                removal of unavailable lines) and recalculate cart totals
+
+        Returns:
+            List of change dicts, one per affected line, with item_id,
+            cart_id, product_id, variant_id, issue, old/new price and
+            old/new quantity. new_quantity is 0 for lines to be removed.
+            With `apply`, only the changes actually written.
+        """
+        cart_ids = list(cart_ids)
+        if not cart_ids:
+            return []
+
+        lines = list(
+            CartItem.objects.filter(cart_id__in=cart_ids).values(
+                'id', 'cart_id', 'product_id', 'variant_id', 'quantity', 'unit_price',
+                'product__selling_price', 'product__status', 'product__is_active',
+                'product__track_inventory', 'product__allow_backorder',
+                'variant__price', 'variant__is_active',
+            )
+        )
+        if not lines:
+            return []
+
+        stock = CartRevalidationService._available_stock({line['product_id'] for line in lines})
+
+        changes = [
+            change for change in (
+                CartRevalidationService._check_line(line, stock) for line in lines
+            ) if change
+        ]
+
+        if apply and changes:
+            changes = CartRevalidationService.apply_changes(changes)
+
+        return changes
+
+    @staticmethod
+    def revalidate_active_carts(active_within_days: int = None, chunk_size: int = None,
+                                apply: bool = True) -> dict:
+        """
+        Revalidate every cart touched recently, a chunk of carts at a time.
+
+        Carts are walked in primary-key order so memory stays bounded and
+        each chunk costs the same two read queries regardless of cart count.
+
+        Args:
+            active_within_days: Only carts updated within this many days
+                (all carts when None)
+            chunk_size: Carts per chunk
+            apply: Write corrections; False only reports them
+
+        Returns:
+            Dict with carts (checked), changed_carts, lines and a per-issue count
+        """
+        chunk_size = chunk_size or CartRevalidationService.CHUNK_SIZE
+        carts = Cart.objects.filter(items__isnull=False).distinct()
+        if active_within_days:
+            carts = carts.filter(updated_at__gte=timezone.now() - timedelta(days=active_within_days))
+
+        checked = lines = 0
+        changed_carts = set()
+        issues = Counter()
+        last_id = 0
+        while True:
+            ids = list(carts.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:chunk_size])
+            if not ids:
+                break
+            changes = CartRevalidationService.revalidate(ids, apply=apply)
+            checked += len(ids)
+            lines += len(changes)
+            for change in changes:
+                changed_carts.add(change['cart_id'])
+                issues.update(change['issues'])
+            last_id = ids[-1]
+
+        logger.info(f"Revalidated {checked} carts: {lines} lines changed in {len(changed_carts)} carts")
+        return {
+            'carts': checked,
+            'changed_carts': len(changed_carts),
+            'lines': lines,
+            'issues': dict(issues),
+        }
+
+    @staticmethod
+    def apply_changes(changes: list) -> list:
+        """
+        Write revalidation changes with bulk queries and refresh cart totals.
+
+        The carts are locked (in primary-key order, like CartService) and
+        each line is re-read first: a change is only written if the line
+        still has the quantity and price it was checked with, so quantities
+        edited or lines deleted since the check are left alone.
+
+        Returns:
+            The changes that were applied
+        """
+        cart_ids = sorted({change['cart_id'] for change in changes})
+
+        with transaction.atomic():
+            locked = Cart.objects.select_for_update().filter(id__in=cart_ids).order_by('id')
+            list(locked.values_list('id', flat=True))
+            current = {
+                item_id: (quantity, unit_price)
+                for item_id, quantity, unit_price in CartItem.objects.filter(
+                    id__in=[change['item_id'] for change in changes]
+                ).values_list('id', 'quantity', 'unit_price')
+            }
+            applied = [
+                change for change in changes
+                if current.get(change['item_id']) == (change['old_quantity'], change['old_price'])
+            ]
+
+            to_delete = [change['item_id'] for change in applied if change['new_quantity'] == 0]
+            to_update = [
+                CartItem(
+                    id=change['item_id'],
+                    unit_price=change['new_price'],
+                    quantity=change['new_quantity'],
+                    total_price=change['new_price'] * change['new_quantity'],
+                )
+                for change in applied if change['new_quantity'] > 0
+            ]
+            if to_delete:
+                CartItem.objects.filter(id__in=to_delete).delete()
+            if to_update:
+                CartItem.objects.bulk_update(to_update, ['unit_price', 'quantity', 'total_price'])
+            if applied:
+                CartRevalidationService._recalculate_carts({change['cart_id'] for change in applied})
+        return applied
+
+    @staticmethod
+    def _available_stock(product_ids) -> dict:
+        """
+        Available stock keyed by (product_id, variant_id) and by
+        (product_id, None) for the product-wide total.
+        """
+        stock = defaultdict(int)
+        rows = (
+            Inventory.objects.filter(product_id__in=product_ids, is_active=True)
+            .values('product_id', 'variant_id')
+            .annotate(available=Sum(F('quantity') - F('reserved_quantity')))
+        )
+        for row in rows:
+            available = max(row['available'] or 0, 0)
+            stock[(row['product_id'], None)] += available
+            if row['variant_id']:
+                stock[(row['product_id'], row['variant_id'])] += available
+        return stock
+
+    @staticmethod
+    def _check_line(line: dict, stock: dict):
+        """Return the change needed for one line, or None if it is still valid."""
+        old_price = line['unit_price']
+        old_quantity = line['quantity']
+        change = {
+            'item_id': line['id'],
+            'cart_id': line['cart_id'],
+            'product_id': line['product_id'],
+            'variant_id': line['variant_id'],
+            'old_price': old_price,
+            'new_price': old_price,
+            'old_quantity': old_quantity,
+            'new_quantity': old_quantity,
+            'issues': [],
+        }
+
+        variant_inactive = line['variant_id'] and not line['variant__is_active']
+        if line['product__status'] != ProductStatus.ACTIVE or not line['product__is_active'] or variant_inactive:
+            change['new_quantity'] = 0
+            change['issues'].append(UNAVAILABLE)
+            return change
+
+        current_price = line['variant__price'] if line['variant_id'] else line['product__selling_price']
+        if current_price != old_price:
+            change['new_price'] = current_price
+            change['issues'].append(PRICE_CHANGED)
+
+        if line['product__track_inventory'] and not line['product__allow_backorder']:
+            available = stock.get((line['product_id'], line['variant_id']), 0)
+            if available <= 0:
+                change['new_quantity'] = 0
+                change['issues'].append(OUT_OF_STOCK)
+            elif available < old_quantity:
+                change['new_quantity'] = available
+                change['issues'].append(QUANTITY_CAPPED)
+
+        return change if change['issues'] else None
+
+    @staticmethod
+    def _recalculate_carts(cart_ids):
+        """
+        Recalculate totals for several carts with one aggregate query.
+
+        updated_at is left untouched so system revalidation does not make an
+        idle cart look active again.
+        """
+        subtotals = dict(
+            CartItem.objects.filter(cart_id__in=cart_ids)
+            .values('cart_id')
+            .annotate(subtotal=Sum('total_price'))
+            .values_list('cart_id', 'subtotal')
+        )
+        carts = list(Cart.objects.filter(id__in=cart_ids).select_related('customer'))
+        for cart in carts:
+            cart.subtotal = subtotals.get(cart.id) or 0
+            cart.total = cart.subtotal - cart.discount_amount + cart.tax_amount
+        Cart.objects.bulk_update(carts, ['subtotal', 'total'])
+
+        keys = []
+        for cart in carts:
+            if cart.customer_id:
+                keys.append(CartCacheStore.user_key(cart.customer.user_id))
+            elif cart.session_id:
+                keys.append(CartCacheStore.session_key(cart.session_id))
+        CartCacheStore.invalidate_keys(keys)
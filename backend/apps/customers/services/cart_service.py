@@ -0,0 +1,310 @@
+"""
+Cart service for batched cart mutations.
+"""
+import logging
+import secrets
+from django.core import signing
+from django.db import transaction
+from django.db.models import Prefetch
+from django.utils import timezone
+from apps.customers.models import Customer, Cart, CartItem
+from apps.products.models import Product, ProductVariant
+from core.exceptions import NotFoundError, ValidationException
+
+logger = logging.getLogger(__name__)
+
+
+class CartService:
+    """
+    Service class for cart operations.
+
+    Every mutation locks the cart row, applies all item changes with bulk
+    queries and recalculates the cart totals exactly once.
+    """
+
+    @staticmethod
+    def get_cart(user=None, session_id: str = None) -> Cart:
+        """
+        Get or create the active cart for an authenticated user, or the
+        guest cart for a cart session when there is no user.
+        """
+        if user is not None and user.is_authenticated:
+            customer, _ = Customer.objects.get_or_create(user=user)
+            cart, _ = Cart.objects.get_or_create(customer=customer)
+            return cart
+        if not session_id:
+            raise ValidationException("A cart session is required for guest carts.")
+        cart, _ = Cart.objects.get_or_create(session_id=session_id, customer__isnull=True)
+        return cart
+
+    @staticmethod
+    def find_cart(user=None, session_id: str = None):
+        """Return the existing cart for a user or cart session, or None."""
+        if user is not None and user.is_authenticated:
+            return Cart.objects.filter(customer__user=user).order_by('id').first()
+        if session_id:
+            return Cart.objects.filter(session_id=session_id, customer__isnull=True).first()
+        return None
+
+    SESSION_SALT = 'customers.cart-session'
+
+    @staticmethod
+    def new_session_id() -> str:
+        """Generate an unguessable, signed guest cart session id."""
+        return signing.Signer(salt=CartService.SESSION_SALT).sign(secrets.token_urlsafe(24))
+
+    @staticmethod
+    def is_valid_session_id(session_id: str) -> bool:
+        """Whether a guest cart session id was issued by new_session_id."""
+        if not session_id:
+            return False
+        try:
+            signing.Signer(salt=CartService.SESSION_SALT).unsign(session_id)
+        except signing.BadSignature:
+            return False
+        return True
+
+    @staticmethod
+    def merge_guest_cart(session_id: str, user):
+        """
+        Merge a guest cart into the user's cart after login.
+
+        Runs a fixed number of queries regardless of cart size: lines for
+        products already in the customer cart have their quantities added
+        with one bulk_update, the remaining guest lines are re-pointed to
+        the customer cart with one UPDATE, and the guest cart is deleted.
+
+        Args:
+            session_id: Guest cart session id
+            user: User who just logged in
+
+        Returns:
+            The customer's cart, or None if there was no guest cart
+        """
+        guest = Cart.objects.filter(session_id=session_id, customer__isnull=True).only('id').first()
+        if not guest:
+            return None
+
+        customer_cart = CartService.get_cart(user=user)
+        now = timezone.now()
+
+        with transaction.atomic():
+            # Lock both carts in id order to avoid deadlocks with concurrent merges
+            locked = {
+                cart.pk: cart
+                for cart in Cart.objects.select_for_update().filter(
+                    pk__in=[guest.pk, customer_cart.pk]
+                ).order_by('pk')
+            }
+            if guest.pk not in locked:
+                return customer_cart
+            customer_cart = locked[customer_cart.pk]
+
+            guest_lines = list(
+                CartItem.objects.filter(cart_id=guest.pk).values_list('id', 'product_id', 'variant_id', 'quantity')
+            )
+            existing = {
+                (line.product_id, line.variant_id): line
+                for line in CartItem.objects.filter(
+                    cart=customer_cart,
+                    product_id__in={product_id for _, product_id, _, _ in guest_lines},
+                )
+            }
+
+            to_update = []
+            to_move = []
+            for line_id, product_id, variant_id, quantity in guest_lines:
+                line = existing.get((product_id, variant_id))
+                if line:
+                    line.quantity += quantity
+                    line.total_price = line.unit_price * line.quantity
+                    line.updated_at = now
+                    to_update.append(line)
+                else:
+                    to_move.append(line_id)
+
+            if to_update:
+                CartItem.objects.bulk_update(to_update, ['quantity', 'total_price', 'updated_at'])
+            if to_move:
+                CartItem.objects.filter(id__in=to_move).update(cart=customer_cart, updated_at=now)
+            Cart.objects.filter(pk=guest.pk).delete()
+            customer_cart.recalculate()
+
+        logger.info(f"Merged guest cart {guest.pk} into cart {customer_cart.pk} for user {user.id}")
+        return customer_cart
+
+    @staticmethod
+    def get_cart_for_display(cart: Cart) -> Cart:
+        """Reload a cart with everything CartSerializer needs prefetched."""
+        return Cart.objects.prefetch_related(
+            Prefetch(
+                'items',
+                queryset=CartItem.objects.select_related('product__category').order_by('id'),
+            )
+        ).get(pk=cart.pk)
+
+    @staticmethod
+    def add_items(cart: Cart, items: list) -> Cart:
+        """
+        Add one or more products to a cart.
+
+        Quantities are added to existing lines for the same product and
+        variant; new lines snapshot the current price.
+
+        Args:
+            cart: Target cart
+            items: List of dicts with product_id, quantity and optional variant_id
+
+        Returns:
+            The cart with recalculated totals
+        """
+        if not items:
+            return cart
+
+        # Collapse duplicates in the request itself
+        requested = {}
+        for item in items:
+            key = (item['product_id'], item.get('variant_id'))
+            requested[key] = requested.get(key, 0) + item['quantity']
+
+        prices = CartService._current_prices(requested.keys())
+
+        now = timezone.now()
+        with transaction.atomic():
+            cart = Cart.objects.select_for_update().get(pk=cart.pk)
+            existing = {
+                (line.product_id, line.variant_id): line
+                for line in CartItem.objects.filter(
+                    cart=cart, product_id__in={product_id for product_id, _ in requested}
+                )
+            }
+
+            to_create = []
+            to_update = []
+            for key, quantity in requested.items():
+                line = existing.get(key)
+                if line:
+                    line.quantity += quantity
+                    line.total_price = line.unit_price * line.quantity
+                    line.updated_at = now
+                    to_update.append(line)
+                else:
+                    unit_price = prices[key]
+                    to_create.append(CartItem(
+                        cart=cart,
+                        product_id=key[0],
+                        variant_id=key[1],
+                        quantity=quantity,
+                        unit_price=unit_price,
+                        total_price=unit_price * quantity,
+                    ))
+
+            if to_create:
+                CartItem.objects.bulk_create(to_create)
+            if to_update:
+                CartItem.objects.bulk_update(to_update, ['quantity', 'total_price', 'updated_at'])
+            cart.recalculate()
+
+        return cart
+
+    @staticmethod
+    def update_items(cart: Cart, items: list) -> Cart:
+        """
+        Set the quantity of one or more cart lines; quantity 0 removes the line.
+
+        Args:
+            cart: Target cart
+            items: List of dicts with item_id and quantity
+
+        Returns:
+            The cart with recalculated totals
+        """
+        if not items:
+            return cart
+
+        quantities = {item['item_id']: item['quantity'] for item in items}
+        now = timezone.now()
+
+        with transaction.atomic():
+            cart = Cart.objects.select_for_update().get(pk=cart.pk)
+            lines = {line.id: line for line in CartItem.objects.filter(cart=cart, id__in=quantities)}
+            missing = set(quantities) - set(lines)
+            if missing:
+                raise NotFoundError(f"Cart item(s) not found: {', '.join(map(str, sorted(missing)))}")
+
+            to_delete = [item_id for item_id, quantity in quantities.items() if quantity == 0]
+            to_update = []
+            for item_id, quantity in quantities.items():
+                if quantity:
+                    line = lines[item_id]
+                    line.quantity = quantity
+                    line.total_price = line.unit_price * quantity
+                    line.updated_at = now
+                    to_update.append(line)
+
+            if to_delete:
+                CartItem.objects.filter(id__in=to_delete).delete()
+            if to_update:
+                CartItem.objects.bulk_update(to_update, ['quantity', 'total_price', 'updated_at'])
+            cart.recalculate()
+
+        return cart
+
+    @staticmethod
+    def remove_items(cart: Cart, item_ids: list) -> Cart:
+        """
+        Remove lines from a cart and recalculate its totals.
+
+        Raises:
+            NotFoundError: If none of the items belong to the cart
+        """
+        with transaction.atomic():
+            cart = Cart.objects.select_for_update().get(pk=cart.pk)
+            deleted, _ = CartItem.objects.filter(cart=cart, id__in=item_ids).delete()
+            if not deleted:
+                raise NotFoundError("Cart item not found.")
+            cart.recalculate()
+        return cart
+
+    @staticmethod
+    def clear(cart: Cart) -> Cart:
+        """Remove every line from a cart."""
+        with transaction.atomic():
+            cart = Cart.objects.select_for_update().get(pk=cart.pk)
+            CartItem.objects.filter(cart=cart).delete()
+            cart.recalculate()
+        return cart
+
+    @staticmethod
+    def _current_prices(keys) -> dict:
+        """
+        Resolve the current unit price for (product_id, variant_id) keys in
+        at most two queries.
+
+        Raises:
+            NotFoundError: If a product or variant does not exist
+        """
+        product_ids = {product_id for product_id, _ in keys}
+        variant_ids = {variant_id for _, variant_id in keys if variant_id}
+
+        products = dict(
+            Product.objects.filter(id__in=product_ids).values_list('id', 'selling_price')
+        )
+        variants = {}
+        if variant_ids:
+            variants = {
+                row[0]: row[1:]
+                for row in ProductVariant.objects.filter(id__in=variant_ids).values_list('id', 'product_id', 'price')
+            }
+
+        prices = {}
+        for product_id, variant_id in keys:
+            if product_id not in products:
+                raise NotFoundError(f"Product {product_id} not found.")
+            if variant_id:
+                if variant_id not in variants or variants[variant_id][0] != product_id:
+                    raise ValidationException(f"Variant {variant_id} does not belong to product {product_id}.")
+                prices[(product_id, variant_id)] = variants[variant_id][1]
+            else:
+                prices[(product_id, variant_id)] = products[product_id]
+        return prices
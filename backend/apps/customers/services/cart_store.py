@@ -0,0 +1,173 @@
+"""
+Cache-backed cart store.
+
+When settings.CART_STORAGE is 'cache', each active cart is kept in the
+cache backend as a snapshot so the common cart read is a single cache hit.
+Writes go to Cart/CartItem (write-through) and, once they commit, replace
+the cart's generation token in the cache. A cache miss reads the token,
+then the database, and caches the snapshot tagged with that token. A
+snapshot only counts as a hit while its token is current, so a snapshot
+read before a concurrent write committed is never served, however the
+cache writes of readers and writers interleave.
+
+The snapshot holds the CartSerializer output, so cached and database-backed
+responses have the same shape:
+    {'v': SNAPSHOT_VERSION, 'gen': token, 'data': {...CartSerializer fields...}}
+"""
+import logging
+import uuid
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from apps.customers.serializers import CartSerializer
+from apps.customers.services.cart_service import CartService
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 3
+ZERO = '0.00'
+
+# CartSerializer output for a cart that does not exist yet
+EMPTY_CART = {
+    'id': None,
+    'subtotal': ZERO,
+    'discount_amount': ZERO,
+    'tax_amount': ZERO,
+    'total': ZERO,
+    'coupon_code': None,
+    'items': [],
+    'items_count': 0,
+    'created_at': None,
+    'updated_at': None,
+}
+
+
+class CartCacheStore:
+    """Service class for reading and writing cached cart snapshots."""
+
+    KEY_PREFIX = 'cart'
+
+    @staticmethod
+    def enabled() -> bool:
+        """Whether carts are served from the cache."""
+        return getattr(settings, 'CART_STORAGE', 'db') == 'cache'
+
+    @staticmethod
+    def user_key(user_id: int) -> str:
+        """Cache key for an authenticated user's cart."""
+        return f"{CartCacheStore.KEY_PREFIX}:v{SNAPSHOT_VERSION}:user:{user_id}"
+
+    @staticmethod
+    def session_key(session_id: str) -> str:
+        """Cache key for a guest cart session."""
+        return f"{CartCacheStore.KEY_PREFIX}:v{SNAPSHOT_VERSION}:session:{session_id}"
+
+    @staticmethod
+    def key_for(user=None, session_id: str = None) -> str:
+        """Cache key for the cart owned by a user or, failing that, a session."""
+        if user is not None and user.is_authenticated:
+            return CartCacheStore.user_key(user.id)
+        return CartCacheStore.session_key(session_id)
+
+    @staticmethod
+    def generation_key(key: str) -> str:
+        """Cache key of the generation token for a cart key."""
+        return f"{key}:gen"
+
+    @staticmethod
+    def get(user=None, session_id: str = None) -> dict:
+        """
+        Return the cart snapshot for a user or guest session.
+
+        A cache hit costs one cache round trip and no database queries. On a
+        miss the snapshot is loaded from the database (without creating an
+        empty cart) and cached under the current generation.
+        """
+        if not (user is not None and user.is_authenticated) and not session_id:
+            return CartCacheStore.build_snapshot(None)
+
+        key = CartCacheStore.key_for(user, session_id)
+        gen_key = CartCacheStore.generation_key(key)
+        cached = cache.get_many([key, gen_key])
+        snapshot, generation = cached.get(key), cached.get(gen_key)
+        if snapshot is not None and generation is not None and snapshot.get('gen') == generation:
+            return snapshot
+
+        if generation is None:
+            cache.add(gen_key, uuid.uuid4().hex, CartCacheStore.timeout())
+            generation = cache.get(gen_key)
+        # The token is read before the database, so a write committing after
+        # this read has already replaced it and this snapshot is never a hit
+        cart = CartService.find_cart(user=user, session_id=session_id)
+        snapshot = CartCacheStore.build_snapshot(cart, generation)
+        if generation is not None:
+            cache.set(key, snapshot, CartCacheStore.timeout())
+        return snapshot
+
+    @staticmethod
+    def write_through(operation, user=None, session_id: str = None):
+        """
+        Run a cart mutation and invalidate the cached snapshot once it commits.
+
+        Args:
+            operation: Callable performing the mutation (typically a
+                CartService method) and returning the updated Cart
+            user: Cart owner
+            session_id: Guest cart session when there is no user
+
+        Returns:
+            The fresh snapshot
+        """
+        key = CartCacheStore.key_for(user, session_id)
+        with transaction.atomic():
+            cart = operation()
+            snapshot = CartCacheStore.build_snapshot(cart)
+            CartCacheStore.invalidate_keys([key])
+        return snapshot
+
+    @staticmethod
+    def invalidate_keys(keys):
+        """
+        Retire the cached snapshots for cart keys.
+
+        Runs when the current transaction commits (straight away outside
+        one): new generation tokens make any snapshot read earlier a miss.
+        """
+        keys = list(keys)
+        if not keys:
+            return
+
+        def retire():
+            timeout = CartCacheStore.timeout()
+            cache.set_many({CartCacheStore.generation_key(key): uuid.uuid4().hex for key in keys}, timeout)
+            cache.delete_many(keys)
+
+        transaction.on_commit(retire)
+
+    @staticmethod
+    def invalidate_user(user_id: int):
+        """Drop a user's cached cart (e.g. after checkout or admin edits)."""
+        CartCacheStore.invalidate_keys([CartCacheStore.user_key(user_id)])
+
+    @staticmethod
+    def invalidate_session(session_id: str):
+        """Drop a guest session's cached cart."""
+        CartCacheStore.invalidate_keys([CartCacheStore.session_key(session_id)])
+
+    @staticmethod
+    def timeout() -> int:
+        return getattr(settings, 'CART_CACHE_TIMEOUT', 7 * 24 * 3600)
+
+    @staticmethod
+    def build_snapshot(cart, generation: str = None) -> dict:
+        """Serialize a cart (or the empty cart for None) into a snapshot."""
+        if cart is None:
+            data = dict(EMPTY_CART, items=[])
+        else:
+            data = CartSerializer(CartService.get_cart_for_display(cart)).data
+        return {'v': SNAPSHOT_VERSION, 'gen': generation, 'data': data}
+
+    @staticmethod
+    def to_representation(snapshot: dict) -> dict:
+        """The API response body for a snapshot (CartSerializer shape)."""
+        return snapshot['data']
@@ -6,6 +6,7 @@ from rest_framework.routers import DefaultRouter
 from apps.customers.views import (
     CustomerViewSet,
     CurrentCustomerView,
+    CustomerOrderHistoryView,
     CustomerAddressViewSet,
     WishlistViewSet,
 )
@@ -21,6 +22,7 @@ wishlist_router.register('wishlist', WishlistViewSet, basename='wishlist')
 
 urlpatterns = [
     path('me/', CurrentCustomerView.as_view(), name='current-customer'),
+    path('me/orders/', CustomerOrderHistoryView.as_view(), name='customer-order-history'),
     path('', include(router.urls)),
     path('', include(address_router.urls)),
     path('', include(wishlist_router.urls)),
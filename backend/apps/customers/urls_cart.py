@@ -2,9 +2,10 @@
 Cart URL patterns.
 """
 from django.urls import path
-from apps.customers.views import CartView, CartItemView
+from apps.customers.views import CartView, CartItemView, CartRevalidateView
 
 urlpatterns = [
     path('', CartView.as_view(), name='cart'),
+    path('revalidate/', CartRevalidateView.as_view(), name='cart-revalidate'),
     path('items/<int:item_id>/', CartItemView.as_view(), name='cart-item'),
 ]
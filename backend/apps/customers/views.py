@@ -4,21 +4,31 @@ Customer views.
 from rest_framework import status, viewsets
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.decorators import action
-from drf_spectacular.utils import extend_schema
+from django.db.models import Count, IntegerField, JSONField, Max, OuterRef, Subquery
+from django.utils.http import quote_etag
+from drf_spectacular.utils import extend_schema, OpenApiParameter
 
-from apps.customers.models import Customer, CustomerAddress, Cart, CartItem, Wishlist
+from apps.customers.models import Customer, CustomerAddress, Wishlist
+from apps.customers.services import CartService, CartCacheStore, CartRevalidationService
 from apps.customers.serializers import (
     CustomerSerializer,
     CustomerAddressSerializer,
     CartSerializer,
     CartItemSerializer,
     AddToCartSerializer,
+    BulkAddToCartSerializer,
     UpdateCartItemSerializer,
+    BulkUpdateCartItemsSerializer,
+    CartRevalidationChangeSerializer,
     WishlistSerializer,
+    CustomerOrderHistorySerializer,
 )
 from apps.products.models import Product
+from apps.sales_orders.models import SalesOrder, SalesOrderItem
+from core.pagination import KeysetPagination
+from core.exceptions import NotFoundError
 from core.permissions import IsAdmin
 
 
@@ -70,6 +80,77 @@ class CurrentCustomerView(APIView):
         })
 
 
+class CustomerOrderHistoryView(APIView):
+    """
+    "My Orders" list for the current customer.
+
+    Reads a compact values() projection newest-first over the
+    (customer, -created_at) index with keyset pagination, and answers
+    conditional GETs with 304 while the customer's orders are unchanged.
+    """
+    permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter('cursor', str, description='Cursor from the previous page'),
+            OpenApiParameter('page_size', int),
+            OpenApiParameter('status', str),
+        ],
+        responses={200: CustomerOrderHistorySerializer(many=True)},
+        tags=['Customers'],
+    )
+    def get(self, request):
+        """List the current customer's orders, newest first."""
+        paginator = self.pagination_class()
+        customer_id = Customer.objects.filter(user=request.user).values_list('id', flat=True).first()
+
+        orders = SalesOrder.objects.filter(customer_id=customer_id)
+        status_filter = request.query_params.get('status')
+        if status_filter:
+            orders = orders.filter(status=status_filter)
+
+        # Any order change bumps updated_at, so (latest update, count) is a
+        # cheap version of the list; the page parameters make it per-page.
+        version = orders.aggregate(last_updated=Max('updated_at'), count=Count('id'))
+        last_updated = version['last_updated']
+        etag = quote_etag('{}-{}-{}-{}-{}'.format(
+            customer_id,
+            last_updated.timestamp() if last_updated else 0,
+            version['count'],
+            request.query_params.get('cursor', ''),
+            paginator.get_page_size(request),
+        ))
+        if etag in request.headers.get('If-None-Match', ''):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+        items = SalesOrderItem.objects.filter(sales_order=OuterRef('pk'))
+        rows = orders.values(
+            'id', 'order_number', 'order_date', 'status',
+            'payment_status', 'total_amount', 'created_at',
+        ).annotate(
+            item_count=Subquery(
+                items.order_by().values('sales_order').annotate(c=Count('id')).values('c'),
+                output_field=IntegerField(),
+            ),
+            first_item_image=Subquery(
+                items.order_by('id').values('product_image')[:1],
+                output_field=JSONField(),
+            ),
+        )
+
+        page = paginator.paginate_queryset(rows, request, view=self)
+        for row in page:
+            row['item_count'] = row['item_count'] or 0
+
+        response = paginator.get_paginated_response(
+            CustomerOrderHistorySerializer(page, many=True).data
+        )
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+
 class CustomerAddressViewSet(viewsets.ModelViewSet):
     """ViewSet for customer addresses."""
     permission_classes = [IsAuthenticated]
@@ -86,68 +167,131 @@ class CustomerAddressViewSet(viewsets.ModelViewSet):
         serializer.save(customer=customer)
 
 
-class CartView(APIView):
-    """View for shopping cart."""
-    permission_classes = [IsAuthenticated]
+CART_SESSION_HEADER = 'X-Cart-Session'
+
+
+class CartResponseMixin:
+    """
+    Resolve the caller's cart and build cart responses from the cache store
+    or the database.
     
-    def get_cart(self, request):
-        """Get or create cart for user."""
-        customer, _ = Customer.objects.get_or_create(user=request.user)
-        cart, _ = Cart.objects.get_or_create(customer=customer)
+    Authenticated users get their customer cart; guests are identified by
+    the X-Cart-Session header, a signed id issued on their first cart write.
+    """
+    
+    def get_session_id(self, request, create=False):
+        """Guest cart session from the request, optionally issuing a new one."""
+        if request.user.is_authenticated:
+            return None
+        session_id = request.headers.get(CART_SESSION_HEADER)
+        # Only ids this server issued; anything else starts a fresh session
+        if not CartService.is_valid_session_id(session_id):
+            session_id = None
+        if not session_id and create:
+            session_id = CartService.new_session_id()
+        return session_id
+    
+    def get_cart(self, request, session_id=None):
+        """Get or create cart for the user or guest session."""
+        return CartService.get_cart(user=request.user, session_id=session_id)
+    
+    def get_existing_cart(self, request):
+        """Existing cart for the user or guest session, or 404."""
+        cart = CartService.find_cart(user=request.user, session_id=self.get_session_id(request))
+        if not cart:
+            raise NotFoundError('Cart item not found.')
         return cart
     
+    def cart_response(self, request, operation=None, session_id=None):
+        """
+        Run an optional cart mutation and return the resulting cart.
+        
+        `operation` is a callable returning the updated Cart. With cache
+        storage enabled the cart is served from (and written through) the
+        cached snapshot instead of being re-serialized from the database.
+        """
+        user = request.user
+        if session_id is None:
+            session_id = self.get_session_id(request)
+        
+        if CartCacheStore.enabled():
+            if operation:
+                snapshot = CartCacheStore.write_through(operation, user=user, session_id=session_id)
+            else:
+                snapshot = CartCacheStore.get(user=user, session_id=session_id)
+            data = CartCacheStore.to_representation(snapshot)
+        else:
+            if operation:
+                cart = operation()
+            elif user.is_authenticated:
+                cart = self.get_cart(request)
+            else:
+                # Don't create empty guest carts on reads
+                cart = CartService.find_cart(session_id=session_id)
+            if cart:
+                data = CartSerializer(CartService.get_cart_for_display(cart)).data
+            else:
+                data = CartCacheStore.to_representation(CartCacheStore.build_snapshot(None))
+        
+        response = Response({
+            'success': True,
+            'data': data
+        })
+        if session_id:
+            response[CART_SESSION_HEADER] = session_id
+        return response
+
+
+class CartView(CartResponseMixin, APIView):
+    """View for shopping cart (customers and guests)."""
+    permission_classes = [AllowAny]
+    
     @extend_schema(responses={200: CartSerializer}, tags=['Cart'])
     def get(self, request):
         """Get current cart."""
-        cart = self.get_cart(request)
-        return Response({
-            'success': True,
-            'data': CartSerializer(cart).data
-        })
+        return self.cart_response(request)
     
     @extend_schema(request=AddToCartSerializer, responses={200: CartSerializer}, tags=['Cart'])
     def post(self, request):
-        """Add item to cart."""
-        serializer = AddToCartSerializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
-        
-        cart = self.get_cart(request)
-        
-        try:
-            product = Product.objects.get(id=serializer.validated_data['product_id'])
-        except Product.DoesNotExist:
-            return Response({
-                'success': False,
-                'error': {'message': 'Product not found.'}
-            }, status=status.HTTP_404_NOT_FOUND)
-        
-        variant_id = serializer.validated_data.get('variant_id')
-        quantity = serializer.validated_data['quantity']
+        """Add one item, or several via an `items` list, to the cart."""
+        if 'items' in request.data:
+            serializer = BulkAddToCartSerializer(data=request.data)
+            serializer.is_valid(raise_exception=True)
+            items = serializer.validated_data['items']
+        else:
+            serializer = AddToCartSerializer(data=request.data)
+            serializer.is_valid(raise_exception=True)
+            items = [serializer.validated_data]
         
-        # Get or create cart item
-        cart_item, created = CartItem.objects.get_or_create(
-            cart=cart,
-            product=product,
-            variant_id=variant_id,
-            defaults={
-                'quantity': quantity,
-                'unit_price': product.selling_price
-            }
+        session_id = self.get_session_id(request, create=True)
+        return self.cart_response(
+            request,
+            lambda: CartService.add_items(self.get_cart(request, session_id), items),
+            session_id=session_id,
         )
+    
+    @extend_schema(request=BulkUpdateCartItemsSerializer, responses={200: CartSerializer}, tags=['Cart'])
+    def patch(self, request):
+        """Update quantities of several cart items at once (0 removes)."""
+        serializer = BulkUpdateCartItemsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
         
-        if not created:
-            cart_item.quantity += quantity
-            cart_item.save()
-        
-        return Response({
-            'success': True,
-            'data': CartSerializer(cart).data
-        })
+        items = serializer.validated_data['items']
+        return self.cart_response(
+            request, lambda: CartService.update_items(self.get_existing_cart(request), items)
+        )
+    
+    @extend_schema(tags=['Cart'])
+    def delete(self, request):
+        """Remove all items from the cart."""
+        return self.cart_response(
+            request, lambda: CartService.clear(self.get_existing_cart(request))
+        )
 
 
-class CartItemView(APIView):
-    """View for individual cart items."""
-    permission_classes = [IsAuthenticated]
+class CartItemView(CartResponseMixin, APIView):
+    """View for individual cart items (customers and guests)."""
+    permission_classes = [AllowAny]
     
     @extend_schema(request=UpdateCartItemSerializer, responses={200: CartSerializer}, tags=['Cart'])
     def patch(self, request, item_id):
@@ -155,65 +299,44 @@ class CartItemView(APIView):
         serializer = UpdateCartItemSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         
-        customer = getattr(request.user, 'customer', None)
-        if not customer:
-            return Response({
-                'success': False,
-                'error': {'message': 'Customer profile not found.'}
-            }, status=status.HTTP_404_NOT_FOUND)
-        
-        try:
-            cart_item = CartItem.objects.get(
-                id=item_id,
-                cart__customer=customer
-            )
-        except CartItem.DoesNotExist:
-            return Response({
-                'success': False,
-                'error': {'message': 'Cart item not found.'}
-            }, status=status.HTTP_404_NOT_FOUND)
-        
         quantity = serializer.validated_data['quantity']
-        
-        if quantity == 0:
-            cart_item.delete()
-        else:
-            cart_item.quantity = quantity
-            cart_item.save()
-        
-        cart = cart_item.cart
-        return Response({
-            'success': True,
-            'data': CartSerializer(cart).data
-        })
+        return self.cart_response(request, lambda: CartService.update_items(
+            self.get_existing_cart(request), [{'item_id': item_id, 'quantity': quantity}]
+        ))
     
     @extend_schema(tags=['Cart'])
     def delete(self, request, item_id):
         """Remove item from cart."""
-        customer = getattr(request.user, 'customer', None)
-        if not customer:
-            return Response({
-                'success': False,
-                'error': {'message': 'Customer profile not found.'}
-            }, status=status.HTTP_404_NOT_FOUND)
+        return self.cart_response(request, lambda: CartService.remove_items(
+            self.get_existing_cart(request), [item_id]
+        ))
+
+
+class CartRevalidateView(CartResponseMixin, APIView):
+    """Check the cart against current prices and stock (customers and guests)."""
+    permission_classes = [AllowAny]
+    
+    @extend_schema(
+        parameters=[
+            OpenApiParameter('apply', bool, description='Write corrections to the cart (default true)'),
+        ],
+        tags=['Cart']
+    )
+    def post(self, request):
+        """
+        Revalidate the cart before checkout.
         
-        try:
-            cart_item = CartItem.objects.get(
-                id=item_id,
-                cart__customer=customer
-            )
-            cart = cart_item.cart
-            cart_item.delete()
-        except CartItem.DoesNotExist:
-            return Response({
-                'success': False,
-                'error': {'message': 'Cart item not found.'}
-            }, status=status.HTTP_404_NOT_FOUND)
+        Returns the changed lines (price changed, quantity capped, out of
+        stock or unavailable) alongside the cart. With apply=false the cart
+        is left untouched so the client can show the differences first.
+        """
+        apply = request.query_params.get('apply', 'true').lower() not in ('false', '0')
+        cart = CartService.find_cart(user=request.user, session_id=self.get_session_id(request))
+        changes = CartRevalidationService.revalidate([cart.id], apply=apply) if cart else []
         
-        return Response({
-            'success': True,
-            'data': CartSerializer(cart).data
-        })
+        response = self.cart_response(request)
+        response.data['changes'] = CartRevalidationChangeSerializer(changes, many=True).data
+        return response
 
 
 class WishlistViewSet(viewsets.ModelViewSet):
@@ -3,6 +3,8 @@ from .models import Coupon
 
 @admin.register(Coupon)
 class CouponAdmin(admin.ModelAdmin):
-    list_display = ('code', 'discount_type', 'discount_value', 'start_date', 'end_date', 'is_active')
-    search_fields = ('code',)
-    list_filter = ('is_active', 'discount_type', 'start_date', 'end_date')
+    list_display = ('code', 'coupon_type', 'value', 'valid_from', 'valid_until', 'usage_count', 'is_active')
+    search_fields = ('code', 'name')
+    list_filter = ('is_active', 'coupon_type', 'applicability', 'valid_from', 'valid_until')
+    raw_id_fields = ('get_product', 'applicable_products')
+    filter_horizontal = ('applicable_categories', 'applicable_vendors', 'applicable_brands')
@@ -0,0 +1,95 @@
+"""
+Management command to move coupons from the retired offers coupon table
+into the unified coupon model.
+
+Safe to re-run: codes that already exist (case-insensitive) are skipped.
+
+Usage:
+    python manage.py import_legacy_coupons --dry-run
+    python manage.py import_legacy_coupons --table offers_coupon --chunk-size 2000
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from apps.sales_orders.models import Coupon
+
+LEGACY_COLUMNS = (
+    'id', 'code', 'description', 'discount_type', 'discount_value',
+    'min_purchase_amount', 'max_discount_amount', 'start_date', 'end_date',
+    'usage_limit', 'usage_count', 'user_usage_limit', 'is_active',
+)
+
+
+class Command(BaseCommand):
+    help = 'Import coupons from the legacy offers coupon table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--table', default='offers_coupon', help='Legacy table name')
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Rows imported per transaction')
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would be imported')
+
+    def handle(self, *args, **options):
+        table = options['table']
+        if table not in connection.introspection.table_names():
+            raise CommandError(f"Table {table} does not exist; nothing to import.")
+
+        quote = connection.ops.quote_name
+        sql = (
+            f"SELECT {', '.join(quote(column) for column in LEGACY_COLUMNS)} "
+            f"FROM {quote(table)} WHERE {quote('id')} > %s ORDER BY {quote('id')}"
+        )
+
+        imported = skipped = 0
+        last_id = 0
+        while True:
+            with connection.cursor() as cursor:
+                cursor.execute(f"{sql} LIMIT {int(options['chunk_size'])}", [last_id])
+                rows = [dict(zip(LEGACY_COLUMNS, row)) for row in cursor.fetchall()]
+            if not rows:
+                break
+            last_id = rows[-1]['id']
+
+            existing = {
+                code.upper()
+                for code in Coupon.objects.filter(
+                    code__in=[row['code'] for row in rows] + [row['code'].upper() for row in rows]
+                ).values_list('code', flat=True)
+            }
+            coupons = []
+            for row in rows:
+                code = row['code'].upper()
+                if code in existing:
+                    skipped += 1
+                    continue
+                existing.add(code)
+                coupons.append(self._convert(row, code))
+
+            if not options['dry_run']:
+                with transaction.atomic():
+                    Coupon.objects.bulk_create(coupons)
+            imported += len(coupons)
+
+        prefix = 'Would import' if options['dry_run'] else 'Imported'
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix} {imported} coupons; skipped {skipped} with existing codes."
+        ))
+
+    @staticmethod
+    def _convert(row, code):
+        return Coupon(
+            code=code,
+            name=code,
+            description=row['description'],
+            coupon_type='fixed' if row['discount_type'] == 'fixed' else 'percentage',
+            value=row['discount_value'],
+            min_order_value=row['min_purchase_amount'] or None,
+            max_discount=row['max_discount_amount'],
+            valid_from=row['start_date'],
+            valid_until=row['end_date'],
+            usage_limit=row['usage_limit'],
+            usage_count=row['usage_count'] or 0,
+            per_user_limit=row['user_usage_limit'] or 1,
+            applicability='all',
+            is_active=bool(row['is_active']),
+            is_public=True,
+        )
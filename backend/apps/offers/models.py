@@ -1,49 +1,11 @@
 """
-Offers and Coupons models.
-"""
-from django.db import models
-from django.utils import timezone
-from core.models import BaseModel
+Offers models.
 
-class Coupon(BaseModel):
-    """Discount coupons."""
-    code = models.CharField(max_length=50, unique=True)
-    description = models.TextField(blank=True, null=True)
-    
-    discount_type = models.CharField(
-        max_length=20,
-        choices=[('percentage', 'Percentage'), ('fixed', 'Fixed Amount')],
-        default='percentage'
-    )
-    discount_value = models.DecimalField(max_digits=10, decimal_places=2)
-    
-    min_purchase_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
-    max_discount_amount = models.DecimalField(max_digits=12, decimal_places=2, blank=True, null=True)
-    
-    start_date = models.DateTimeField(default=timezone.now)
-    end_date = models.DateTimeField()
-    
-    usage_limit = models.PositiveIntegerField(blank=True, null=True, help_text="Total number of times this coupon can be used")
-    usage_count = models.PositiveIntegerField(default=0)
-    
-    user_usage_limit = models.PositiveIntegerField(default=1, help_text="Limit per user")
-    
-    is_active = models.BooleanField(default=True)
-    
-    class Meta:
-        verbose_name = 'Coupon'
-        verbose_name_plural = 'Coupons'
-        ordering = ['-created_at']
-    
-    def __str__(self):
-        return self.code
+Coupons are a single model, apps.sales_orders.models.Coupon, evaluated by
+apps.sales_orders.services.CouponEngine. It is re-exported here so offers
+code keeps one import path. Rows from the retired offers coupon table are
+carried over by the import_legacy_coupons command.
+"""
+from apps.sales_orders.models import Coupon, CouponUsage
 
-    def is_valid(self):
-        now = timezone.now()
-        if not self.is_active:
-            return False
-        if self.start_date > now or self.end_date < now:
-            return False
-        if self.usage_limit and self.usage_count >= self.usage_limit:
-            return False
-        return True
+__all__ = ['Coupon', 'CouponUsage']
@@ -1,11 +1,50 @@
+"""
+Offers serializers.
+
+/offers/coupons/ keeps the field names of the retired offers coupon model
+(discount_type, discount_value, min_purchase_amount, ...) and maps them
+onto the unified coupon model, so existing clients keep working.
+"""
+from django.utils import timezone
 from rest_framework import serializers
 from .models import Coupon
 
+
 class CouponSerializer(serializers.ModelSerializer):
+    """Unified coupon under the legacy offers field names."""
+    name = serializers.CharField(max_length=100, required=False)
+    discount_type = serializers.ChoiceField(
+        source='coupon_type', choices=Coupon.COUPON_TYPE_CHOICES, default='percentage'
+    )
+    discount_value = serializers.DecimalField(source='value', max_digits=10, decimal_places=2)
+    min_purchase_amount = serializers.DecimalField(
+        source='min_order_value', max_digits=10, decimal_places=2, required=False, allow_null=True
+    )
+    max_discount_amount = serializers.DecimalField(
+        source='max_discount', max_digits=10, decimal_places=2, required=False, allow_null=True
+    )
+    start_date = serializers.DateTimeField(source='valid_from', default=timezone.now)
+    end_date = serializers.DateTimeField(source='valid_until')
+    user_usage_limit = serializers.IntegerField(source='per_user_limit', min_value=0, default=1)
+
     class Meta:
         model = Coupon
-        fields = '__all__'
-        read_only_fields = ('usage_count', 'created_at', 'updated_at')
+        fields = [
+            'id', 'code', 'name', 'description',
+            'discount_type', 'discount_value',
+            'min_purchase_amount', 'max_discount_amount',
+            'start_date', 'end_date',
+            'usage_limit', 'usage_count', 'user_usage_limit',
+            'is_active', 'created_at', 'updated_at',
+        ]
+        read_only_fields = ['id', 'usage_count', 'created_at', 'updated_at']
+
+    def validate(self, attrs):
+        # The legacy model had no name; new coupons are named after their code
+        if self.instance is None and not attrs.get('name'):
+            attrs['name'] = attrs['code']
+        return attrs
+
 
 class CouponValidationSerializer(serializers.Serializer):
     """Serializer for validating coupon codes."""
@@ -1,74 +1,60 @@
+"""
+Offers views.
+
+/offers/coupons/ is the legacy coupon API. It serves the unified coupon
+model under the old field names and response shapes, and checks codes
+with CouponEngine, so it applies the same rules as /sales-orders/coupons/.
+"""
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
+from apps.sales_orders.services import CouponEngine
 from core.permissions import IsAdmin
 from .models import Coupon
 from .serializers import CouponSerializer, CouponValidationSerializer
 
+
 class CouponViewSet(viewsets.ModelViewSet):
     """ViewSet for managing coupons."""
-    queryset = Coupon.objects.all()
     serializer_class = CouponSerializer
-    
+
     def get_permissions(self):
         if self.action in ['validate', 'list']:
             return [AllowAny()]
         return [IsAuthenticated(), IsAdmin()]
-    
+
     def get_queryset(self):
-        if self.action in ['validate', 'list']:
-            return Coupon.objects.filter(is_active=True)
-        return super().get_queryset()
+        queryset = Coupon.objects.order_by('-created_at')
+        if getattr(self.request.user, 'role', None) in ['super_admin', 'admin']:
+            return queryset
+        return queryset.filter(is_active=True, is_public=True)
 
     @action(detail=False, methods=['post'])
     def validate(self, request):
-        """Validate a coupon code."""
+        """Validate a coupon code against a cart total."""
         serializer = CouponValidationSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        
-        code = serializer.validated_data['code']
-        cart_total = serializer.validated_data['cart_total']
-        
-        try:
-            coupon = self.get_queryset().get(code=code) # Case sensitive? My model says unique code. settings view used upper()
-        except Coupon.DoesNotExist:
-            # Try upper case
-            try:
-                coupon = self.get_queryset().get(code=code.upper())
-            except Coupon.DoesNotExist:
-                return Response(
-                    {'error': 'Invalid coupon code'},
-                    status=status.HTTP_404_NOT_FOUND
-                )
-        
-        # Check validity
-        if not coupon.is_valid():
+
+        compiled, result = CouponEngine.check_code(
+            serializer.validated_data['code'],
+            request.user,
+            cart_total=serializer.validated_data['cart_total'],
+        )
+        if compiled is None:
             return Response(
-                {'error': 'Coupon has expired or reached usage limit'},
-                status=status.HTTP_400_BAD_REQUEST
+                {'error': 'Invalid coupon code'},
+                status=status.HTTP_404_NOT_FOUND
             )
-        
-        # Check minimum purchase
-        if cart_total < coupon.min_purchase_amount:
+
+        if not result['valid']:
             return Response(
-                {
-                    'error': f'Minimum purchase of {coupon.min_purchase_amount} required'
-                },
+                {'error': result['message']},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        
-        # Calculate discount
-        discount_amount = 0
-        if coupon.discount_type == 'percentage':
-            discount_amount = (cart_total * coupon.discount_value) / 100
-            if coupon.max_discount_amount:
-                discount_amount = min(discount_amount, coupon.max_discount_amount)
-        elif coupon.discount_type == 'fixed':
-            discount_amount = coupon.discount_value
-        
+
         return Response({
             'valid': True,
-            'coupon': CouponSerializer(coupon).data,
-            'discount_amount': float(discount_amount)
+            'coupon': CouponSerializer(Coupon.objects.get(pk=compiled['id'])).data,
+            'discount_amount': float(result['discount_amount'])
         })
@@ -0,0 +1,73 @@
+"""
+Payment gateway clients.
+
+The refund worker talks to the gateway through the client named by the
+PAYMENT_GATEWAY_CLIENT setting, so a real integration (or a fake in
+development) can be swapped in without touching the queue. Clients get
+plain data rather than model instances because the worker calls them from
+a thread pool, away from the database.
+"""
+import uuid
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+
+
+class GatewayError(Exception):
+    """
+    A gateway call failed.
+
+    `retryable` is False when retrying cannot help (e.g. the gateway
+    rejected the refund), so the refund fails straight away.
+    """
+
+    def __init__(self, message: str, retryable: bool = True, response: dict = None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.response = response
+
+
+class BaseGatewayClient:
+    """Interface every gateway client implements."""
+
+    def refund(self, request: dict) -> dict:
+        """
+        Refund part or all of a captured payment.
+
+        Args:
+            request: Dict with refund_number (also the idempotency key, so a
+                retried call never refunds twice), amount, currency,
+                payment_number, gateway and transaction_id
+
+        Returns:
+            Dict with the gateway's refund_id and raw response
+
+        Raises:
+            GatewayError: If the gateway did not accept the refund
+        """
+        raise NotImplementedError
+
+
+class StubGatewayClient(BaseGatewayClient):
+    """Accepts every refund without calling a gateway (development only)."""
+
+    def refund(self, request: dict) -> dict:
+        refund_id = f"rfnd_{uuid.uuid5(uuid.NAMESPACE_OID, request['refund_number']).hex[:14]}"
+        return {
+            'refund_id': refund_id,
+            'response': {'id': refund_id, 'status': 'processed', 'amount': str(request['amount'])},
+        }
+
+
+def get_gateway_client() -> BaseGatewayClient:
+    """
+    Instantiate the configured gateway client.
+
+    There is deliberately no default: without a configured client the
+    refund worker fails instead of marking refunds completed that no
+    gateway ever made.
+    """
+    path = getattr(settings, 'PAYMENT_GATEWAY_CLIENT', None)
+    if not path:
+        raise ImproperlyConfigured('PAYMENT_GATEWAY_CLIENT must be set to send refunds to a gateway.')
+    return import_string(path)()
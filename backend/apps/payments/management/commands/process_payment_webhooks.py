@@ -0,0 +1,49 @@
+"""
+Management command to apply queued payment gateway webhook events.
+
+Run it from cron to drain the inbox, or with --loop as a long-running
+worker. Several workers may run at once; each claims its own batches.
+
+Usage:
+    python manage.py process_payment_webhooks
+    python manage.py process_payment_webhooks --loop --sleep 2
+    python manage.py process_payment_webhooks --batch-size 1000
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from apps.payments.services import PaymentWebhookService
+
+
+class Command(BaseCommand):
+    help = 'Apply pending payment webhook events to payments and orders in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=PaymentWebhookService.BATCH_SIZE,
+            help='Events applied per transaction',
+        )
+        parser.add_argument('--loop', action='store_true', help='Keep polling for new events')
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=1.0,
+            help='Seconds to wait when the inbox is empty (with --loop)',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            result = PaymentWebhookService.process_pending(batch_size=options['batch_size'])
+            if any(result.values()):
+                self.stdout.write(
+                    f"Processed {result['processed']}, ignored {result['ignored']}, "
+                    f"failed {result['failed']} webhook events."
+                )
+            if not options['loop']:
+                break
+            time.sleep(options['sleep'])
+            close_old_connections()
@@ -0,0 +1,46 @@
+"""
+Management command to send queued refunds to the payment gateway.
+
+Each batch is sent with concurrent gateway calls. Failed calls are retried
+with backoff on later runs. Several workers may run at once; each claims
+its own batches.
+
+Usage:
+    python manage.py process_refunds
+    python manage.py process_refunds --loop --sleep 5
+    python manage.py process_refunds --batch-size 200 --workers 16
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from apps.payments.services import RefundService
+
+
+class Command(BaseCommand):
+    help = 'Send queued refunds to the payment gateway'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=RefundService.BATCH_SIZE,
+            help='Refunds claimed per batch',
+        )
+        parser.add_argument('--workers', type=int, help='Concurrent gateway calls (default: REFUND_WORKERS)')
+        parser.add_argument('--loop', action='store_true', help='Keep polling for due refunds')
+        parser.add_argument('--sleep', type=float, default=5.0, help='Seconds to wait between polls (with --loop)')
+
+    def handle(self, *args, **options):
+        while True:
+            result = RefundService.process_queue(batch_size=options['batch_size'], workers=options['workers'])
+            if any(result.values()):
+                self.stdout.write(
+                    f"Completed {result['completed']}, retrying {result['retried']}, "
+                    f"failed {result['failed']} refunds."
+                )
+            if not options['loop']:
+                break
+            time.sleep(options['sleep'])
+            close_old_connections()
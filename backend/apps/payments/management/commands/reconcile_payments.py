@@ -0,0 +1,50 @@
+"""
+Management command to reconcile payments with a gateway settlement report.
+
+Writes every mismatch (missing payment, amount or status differs) to a CSV
+report and corrects payment statuses the gateway has settled.
+
+Usage:
+    python manage.py reconcile_payments /path/to/settlement_report.csv
+    python manage.py reconcile_payments report.csv --gateway razorpay --report mismatches.csv
+    python manage.py reconcile_payments report.csv --dry-run
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.payments.services import PaymentReconciliationService
+from core.exceptions import ValidationException
+
+
+class Command(BaseCommand):
+    help = 'Reconcile payments against a gateway settlement report'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Gateway report CSV')
+        parser.add_argument('--gateway', help='Only match payments of this gateway')
+        parser.add_argument('--report', help='Mismatch report CSV (default: next to the gateway report)')
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=PaymentReconciliationService.CHUNK_SIZE,
+            help='Report rows matched per query',
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Only report mismatches')
+
+    def handle(self, *args, **options):
+        try:
+            result = PaymentReconciliationService.reconcile(
+                options['path'],
+                gateway=options['gateway'],
+                report_path=options['report'],
+                chunk_size=options['chunk_size'],
+                dry_run=options['dry_run'],
+            )
+        except (OSError, ValidationException) as exc:
+            raise CommandError(str(exc))
+
+        verb = 'would be corrected' if options['dry_run'] else 'corrected'
+        self.stdout.write(self.style.SUCCESS(
+            f"Reconciled {result['rows']} rows: {result['matched']} matched, {result['missing']} missing, "
+            f"{result['amount_mismatch']} amount and {result['status_mismatch']} status mismatches, "
+            f"{result['corrected']} {verb}. Report: {result['report']}"
+        ))
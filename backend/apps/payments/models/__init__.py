@@ -1,3 +1,4 @@
 from .payment import Payment, Refund
+from .webhook import PaymentWebhookEvent
 
-__all__ = ['Payment', 'Refund']
+__all__ = ['Payment', 'Refund', 'PaymentWebhookEvent']
@@ -59,6 +59,9 @@ class Payment(BaseModel):
         verbose_name = 'payment'
         verbose_name_plural = 'payments'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['gateway_transaction_id']),
+        ]
     
     def __str__(self):
         return f"{self.payment_number} - {self.amount}"
@@ -85,6 +88,7 @@ class Refund(BaseModel):
     # Status
     STATUS_CHOICES = [
         ('pending', 'Pending'),
+        ('queued', 'Queued'),
         ('processing', 'Processing'),
         ('completed', 'Completed'),
         ('failed', 'Failed'),
@@ -96,6 +100,11 @@ class Refund(BaseModel):
     gateway_refund_id = models.CharField(max_length=255, blank=True, null=True)
     gateway_response = models.JSONField(blank=True, null=True)
     
+    # Refund queue
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, null=True)
+    
     processed_by = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.SET_NULL,
@@ -109,6 +118,9 @@ class Refund(BaseModel):
         verbose_name = 'refund'
         verbose_name_plural = 'refunds'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
     
     def __str__(self):
         return f"{self.refund_number} - {self.amount}"
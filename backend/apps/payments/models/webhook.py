@@ -0,0 +1,46 @@
+"""
+Payment gateway webhook inbox.
+"""
+from django.db import models
+
+
+class PaymentWebhookEvent(models.Model):
+    """
+    Raw gateway webhook event, stored as received.
+
+    The webhook endpoint only verifies and inserts rows here; the unique
+    (gateway, event_id) constraint drops gateway retries. Events are applied
+    to payments and orders later, in batches, by PaymentWebhookService. The
+    payload is never modified; only the processing columns change.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('processed', 'Processed'),
+        ('ignored', 'Ignored'),
+        ('failed', 'Failed'),
+    ]
+
+    gateway = models.CharField(max_length=50)
+    event_id = models.CharField(max_length=255)
+    event_type = models.CharField(max_length=100)
+    payload = models.JSONField()
+    received_at = models.DateTimeField(auto_now_add=True)
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    error = models.TextField(blank=True, null=True)
+
+    class Meta:
+        verbose_name = 'payment webhook event'
+        verbose_name_plural = 'payment webhook events'
+        ordering = ['-received_at']
+        constraints = [
+            models.UniqueConstraint(fields=['gateway', 'event_id'], name='uniq_payment_webhook_event'),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'id']),
+        ]
+
+    def __str__(self):
+        return f"{self.gateway} {self.event_type} {self.event_id}"
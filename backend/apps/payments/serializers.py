@@ -93,6 +93,7 @@ class RefundSerializer(serializers.ModelSerializer):
             'id', 'refund_number', 'payment', 'payment_number',
             'sales_order', 'order_number', 'amount', 'reason',
             'status', 'gateway_refund_id', 'gateway_response',
+            'attempts', 'next_attempt_at', 'last_error',
             'processed_by', 'processed_by_name', 'processed_at',
             'created_at', 'updated_at'
         ]
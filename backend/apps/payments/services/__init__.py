@@ -0,0 +1,5 @@
+from .webhook_service import PaymentWebhookService
+from .reconciliation_service import PaymentReconciliationService
+from .refund_service import RefundService
+
+__all__ = ['PaymentWebhookService', 'PaymentReconciliationService', 'RefundService']
@@ -0,0 +1,209 @@
+"""
+Payment reconciliation against gateway settlement reports.
+
+The report is streamed in chunks so memory stays bounded however large the
+file is. For each chunk, the rows are indexed by gateway transaction id in
+a dict, and the matching payments are fetched with one IN query on the
+indexed Payment.gateway_transaction_id. Each row is then compared with its
+payment. Mismatches are appended to a report CSV as they are found, and
+safe status corrections are written back with one UPDATE per target
+status.
+
+Report columns (header names are case-insensitive; aliases accepted):
+    transaction_id, amount, status
+
+Mismatch report columns:
+    transaction_id, payment_number, issue, file_amount, amount, file_status, status, action
+"""
+import csv
+import logging
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+from django.db import transaction
+from django.db.models import Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from apps.payments.models import Payment
+from apps.sales_orders.models import SalesOrder
+from core.exceptions import ValidationException
+from core.utils.constants import PaymentStatus
+
+logger = logging.getLogger(__name__)
+
+REPORT_COLUMNS = {
+    'transaction_id': ('transaction_id', 'payment_id', 'txn_id', 'entity_id'),
+    'amount': ('amount', 'txn_amount'),
+    'status': ('status', 'txn_status'),
+}
+
+MISMATCH_HEADER = [
+    'transaction_id', 'payment_number', 'issue', 'file_amount', 'amount', 'file_status', 'status', 'action',
+]
+
+# Gateway report status -> payment status
+GATEWAY_STATUSES = {
+    'captured': PaymentStatus.COMPLETED,
+    'success': PaymentStatus.COMPLETED,
+    'settled': PaymentStatus.COMPLETED,
+    'completed': PaymentStatus.COMPLETED,
+    'failed': PaymentStatus.FAILED,
+    'refunded': PaymentStatus.REFUNDED,
+}
+
+# Payment statuses the report may correct to each gateway status; other
+# disagreements are only reported
+CORRECTABLE_FROM = {
+    PaymentStatus.COMPLETED: {PaymentStatus.PENDING, PaymentStatus.PROCESSING, PaymentStatus.FAILED},
+    PaymentStatus.FAILED: {PaymentStatus.PENDING, PaymentStatus.PROCESSING},
+    PaymentStatus.REFUNDED: {PaymentStatus.COMPLETED},
+}
+
+
+class PaymentReconciliationService:
+    """Service class for reconciling payments with gateway reports."""
+
+    CHUNK_SIZE = 5000
+
+    @staticmethod
+    def reconcile(path, gateway: str = None, report_path=None, chunk_size: int = None,
+                  dry_run: bool = False) -> dict:
+        """
+        Reconcile a gateway report against payments.
+
+        Amount mismatches and transactions with no payment are only
+        reported. Status mismatches are corrected when the move is safe
+        (e.g. a pending payment the gateway captured), and the orders'
+        payment_status follows.
+
+        Args:
+            path: Path of the gateway report CSV
+            gateway: Only match payments of this payment_gateway
+            report_path: Where to write the mismatch CSV
+                (default: next to the report)
+            chunk_size: Report rows matched per query
+            dry_run: Report corrections without applying them
+
+        Returns:
+            Dict with row, match and mismatch counts and the report path
+        """
+        chunk_size = chunk_size or PaymentReconciliationService.CHUNK_SIZE
+        path = Path(path)
+        report_path = Path(report_path) if report_path else path.with_name(f'{path.stem}.mismatches.csv')
+        result = {
+            'rows': 0, 'matched': 0, 'missing': 0, 'duplicate': 0, 'invalid': 0,
+            'amount_mismatch': 0, 'status_mismatch': 0, 'corrected': 0,
+            'report': str(report_path),
+        }
+
+        with open(path, newline='') as source, open(report_path, 'w', newline='') as report:
+            reader = csv.DictReader(source)
+            columns = PaymentReconciliationService._resolve_columns(reader.fieldnames)
+            writer = csv.writer(report)
+            writer.writerow(MISMATCH_HEADER)
+
+            chunk = []
+            for row in reader:
+                chunk.append(row)
+                if len(chunk) >= chunk_size:
+                    PaymentReconciliationService._reconcile_chunk(chunk, columns, gateway, writer, result, dry_run)
+                    chunk = []
+            if chunk:
+                PaymentReconciliationService._reconcile_chunk(chunk, columns, gateway, writer, result, dry_run)
+
+        logger.info(f"Reconciled {path.name}: {result}")
+        return result
+
+    @staticmethod
+    def _resolve_columns(fieldnames) -> dict:
+        """Map each report column to the header name the file uses for it."""
+        headers = {(name or '').strip().lower(): name for name in fieldnames or []}
+        columns = {}
+        for column, aliases in REPORT_COLUMNS.items():
+            name = next((headers[alias] for alias in aliases if alias in headers), None)
+            if name is None:
+                raise ValidationException(f"Gateway report has no {column} column.")
+            columns[column] = name
+        return columns
+
+    @staticmethod
+    def _reconcile_chunk(rows: list, columns: dict, gateway, writer, result: dict, dry_run: bool):
+        result['rows'] += len(rows)
+
+        index = {}
+        for row in rows:
+            transaction_id = (row.get(columns['transaction_id']) or '').strip()
+            file_status = (row.get(columns['status']) or '').strip().lower()
+            try:
+                amount = Decimal((row.get(columns['amount']) or '').strip().replace(',', ''))
+            except InvalidOperation:
+                amount = None
+            if not transaction_id or amount is None:
+                result['invalid'] += 1
+                writer.writerow([transaction_id, '', 'invalid', row.get(columns['amount']), '', file_status, '', ''])
+            elif transaction_id in index:
+                result['duplicate'] += 1
+                writer.writerow([transaction_id, '', 'duplicate', amount, '', file_status, '', ''])
+            else:
+                index[transaction_id] = (amount, file_status)
+        if not index:
+            return
+
+        with transaction.atomic():
+            payments = Payment.objects.filter(gateway_transaction_id__in=list(index))
+            if gateway:
+                payments = payments.filter(payment_gateway=gateway)
+            if not dry_run:
+                payments = payments.select_for_update()
+            payments = {
+                payment.gateway_transaction_id: payment
+                for payment in payments.only(
+                    'id', 'payment_number', 'sales_order_id', 'gateway_transaction_id', 'amount', 'status'
+                )
+            }
+
+            now = timezone.now()
+            corrected = {}
+            for transaction_id, (amount, file_status) in index.items():
+                payment = payments.get(transaction_id)
+                if payment is None:
+                    result['missing'] += 1
+                    writer.writerow([transaction_id, '', 'missing', amount, '', file_status, '', ''])
+                    continue
+
+                result['matched'] += 1
+                if amount != payment.amount:
+                    result['amount_mismatch'] += 1
+                    writer.writerow([
+                        transaction_id, payment.payment_number, 'amount_mismatch',
+                        amount, payment.amount, file_status, payment.status, 'review',
+                    ])
+                    continue
+
+                target = GATEWAY_STATUSES.get(file_status)
+                if target is None or target == payment.status:
+                    continue
+
+                result['status_mismatch'] += 1
+                writer.writerow([
+                    transaction_id, payment.payment_number, 'status_mismatch', amount, payment.amount,
+                    file_status, payment.status,
+                    f'set {target}' if payment.status in CORRECTABLE_FROM[target] else 'review',
+                ])
+                if payment.status in CORRECTABLE_FROM[target]:
+                    corrected.setdefault(target, []).append(payment)
+
+            result['corrected'] += sum(len(group) for group in corrected.values())
+            if dry_run:
+                return
+
+            # Corrections to one status share their values, so each status is one UPDATE
+            for status, group in corrected.items():
+                payment_ids = [payment.id for payment in group]
+                fields = {'status': status, 'updated_at': now}
+                if status == PaymentStatus.COMPLETED:
+                    fields['paid_at'] = Coalesce('paid_at', Value(now))
+                Payment.objects.filter(id__in=payment_ids).update(**fields)
+                SalesOrder.objects.filter(id__in={payment.sales_order_id for payment in group}).update(
+                    payment_status=status, updated_at=now
+                )
@@ -0,0 +1,332 @@
+"""
+Refund queue.
+
+Approved refunds (from the refund API and from returns that pass
+inspection) are queued rather than sent to the gateway in the request. The
+process_refunds worker drains the queue in batches:
+
+1. claim a batch of due refunds with SKIP LOCKED and mark them
+   'processing' in a short transaction, so several workers can run at once;
+2. call the gateway for the whole batch from a thread pool, outside any
+   transaction;
+3. write the outcomes back with bulk updates. This covers the refunds
+   themselves, fully refunded payments and their orders, and the returns
+   waiting on the refunds.
+
+Failed calls are retried with exponential backoff until MAX_ATTEMPTS.
+Refunds that still fail can be put back on the queue by an admin (retry).
+The refund number is sent as the idempotency key, so a retry never
+refunds twice.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Q, Sum
+from django.utils import timezone
+
+from apps.payments.gateway import GatewayError, get_gateway_client
+from apps.payments.models import Payment, Refund
+from apps.sales_orders.models import ReturnRequest, ReturnStatusLog, SalesOrder
+from core.exceptions import BusinessLogicError
+from core.utils.constants import PaymentStatus
+from core.utils.sequences import SequenceService
+
+logger = logging.getLogger(__name__)
+
+# Refund statuses that count against a payment's refundable amount
+OPEN_STATUSES = ['pending', 'queued', 'processing', 'completed']
+
+
+class RefundService:
+    """Service class for queueing refunds and sending them to the gateway."""
+
+    BATCH_SIZE = 100
+    MAX_ATTEMPTS = 6
+    RETRY_DELAY = timedelta(seconds=30)
+    MAX_RETRY_DELAY = timedelta(hours=1)
+    # Refunds left 'processing' this long belong to a worker that died
+    STALE_AFTER = timedelta(minutes=15)
+
+    @staticmethod
+    def enqueue(refund: Refund, user=None) -> Refund:
+        """Approve a pending refund and queue it for the gateway."""
+        now = timezone.now()
+        refund.status = 'queued'
+        refund.next_attempt_at = now
+        refund.processed_by = user
+        refund.processed_at = now
+        refund.save(update_fields=['status', 'next_attempt_at', 'processed_by', 'processed_at', 'updated_at'])
+        return refund
+
+    @staticmethod
+    def retry(refund: Refund, user=None) -> Refund:
+        """
+        Put a failed refund back on the queue with a fresh set of attempts.
+
+        A return waiting on the refund stays linked to it and completes
+        when the retried refund does.
+
+        Raises:
+            BusinessLogicError: If the refund has not failed, or other
+                refunds now cover the payment
+        """
+        with transaction.atomic():
+            refund = Refund.objects.select_for_update().select_related('payment').get(pk=refund.pk)
+            if refund.status != 'failed':
+                raise BusinessLogicError(f"Cannot retry refund in {refund.status} status.")
+            # Failed refunds do not count against the payment, so others may
+            # have been made for the same amount since
+            if refund.amount > RefundService.refundable_amount(refund.payment):
+                raise BusinessLogicError('Refund exceeds the amount left to refund on the payment.')
+
+            now = timezone.now()
+            refund.status = 'queued'
+            refund.attempts = 0
+            refund.next_attempt_at = now
+            refund.processed_by = user
+            refund.processed_at = now
+            refund.save(update_fields=[
+                'status', 'attempts', 'next_attempt_at', 'processed_by', 'processed_at', 'updated_at'
+            ])
+        logger.info(f"Refund requeued: {refund.refund_number}")
+        return refund
+
+    @staticmethod
+    def complete_manually(refund: Refund, gateway_refund_id: str, user=None) -> Refund:
+        """Record a refund already made outside the queue (e.g. from the gateway dashboard)."""
+        with transaction.atomic():
+            refund.status = 'completed'
+            refund.gateway_refund_id = gateway_refund_id
+            refund.processed_by = user
+            refund.processed_at = timezone.now()
+            refund.save(update_fields=[
+                'status', 'gateway_refund_id', 'processed_by', 'processed_at', 'updated_at'
+            ])
+            RefundService._settle([refund.id])
+        return refund
+
+    @staticmethod
+    def refundable_amount(payment: Payment):
+        """Payment amount not yet covered by open or completed refunds."""
+        refunded = payment.refunds.filter(status__in=OPEN_STATUSES).aggregate(total=Sum('amount'))['total'] or 0
+        return payment.amount - refunded
+
+    @staticmethod
+    def queue_return_refund(return_request, user=None):
+        """
+        Queue the refund for a return to its order's original payment.
+
+        Returns:
+            The queued Refund, or None if the return is not refunded to the
+            original payment or nothing is left to refund
+        """
+        if return_request.refund_method != 'original_payment' or return_request.refund_id:
+            return None
+
+        payment = Payment.objects.filter(
+            sales_order_id=return_request.vendor_order.sales_order_id,
+            status=PaymentStatus.COMPLETED,
+        ).order_by('-amount').first()
+        if payment is None:
+            return None
+
+        amount = min(return_request.refund_amount, RefundService.refundable_amount(payment))
+        if amount <= 0:
+            return None
+
+        now = timezone.now()
+        refund = Refund.objects.create(
+            payment=payment,
+            sales_order_id=payment.sales_order_id,
+            refund_number=SequenceService.next_number('REF'),
+            amount=amount,
+            reason=f"Return {return_request.return_number}",
+            status='queued',
+            next_attempt_at=now,
+            processed_by=user,
+            processed_at=now,
+        )
+        return_request.refund = refund
+        return_request.save(update_fields=['refund', 'updated_at'])
+        return refund
+
+    @staticmethod
+    def process_queue(batch_size: int = None, workers: int = None) -> dict:
+        """
+        Send every due queued refund to the gateway.
+
+        Args:
+            batch_size: Refunds claimed per batch
+            workers: Concurrent gateway calls (default: REFUND_WORKERS)
+
+        Returns:
+            Dict with completed, retried and failed refund counts
+        """
+        batch_size = batch_size or RefundService.BATCH_SIZE
+        workers = workers or getattr(settings, 'REFUND_WORKERS', 8)
+        client = get_gateway_client()
+
+        RefundService.requeue_stale()
+        result = {'completed': 0, 'retried': 0, 'failed': 0}
+        while True:
+            counts = RefundService.process_batch(batch_size, workers, client)
+            if counts is None:
+                break
+            for key in result:
+                result[key] += counts[key]
+        return result
+
+    @staticmethod
+    def process_batch(batch_size: int, workers: int, client) -> dict:
+        """
+        Claim one batch of due refunds, call the gateway and record the outcomes.
+
+        Returns:
+            Dict with completed, retried and failed counts, or None when no
+            refunds are due
+        """
+        requests = RefundService._claim(batch_size)
+        if not requests:
+            return None
+
+        with ThreadPoolExecutor(max_workers=min(workers, len(requests))) as pool:
+            outcomes = list(pool.map(lambda request: RefundService._call(client, request), requests))
+        return RefundService._record(outcomes)
+
+    @staticmethod
+    def requeue_stale() -> int:
+        """Put refunds abandoned mid-call back on the queue."""
+        now = timezone.now()
+        count = Refund.objects.filter(
+            status='processing', updated_at__lt=now - RefundService.STALE_AFTER
+        ).update(status='queued', next_attempt_at=now, updated_at=now)
+        if count:
+            logger.warning(f"Requeued {count} stale processing refunds")
+        return count
+
+    @staticmethod
+    def backoff(attempts: int) -> timedelta:
+        """Delay before the next attempt after `attempts` failed ones."""
+        return min(RefundService.RETRY_DELAY * 2 ** (attempts - 1), RefundService.MAX_RETRY_DELAY)
+
+    @staticmethod
+    def _claim(batch_size: int) -> list:
+        """Mark a batch of due refunds 'processing' and return the gateway requests."""
+        now = timezone.now()
+        with transaction.atomic():
+            due = Refund.objects.filter(status='queued', next_attempt_at__lte=now).order_by('next_attempt_at', 'id')
+            if connection.features.has_select_for_update_skip_locked:
+                due = due.select_for_update(skip_locked=True)
+            else:
+                due = due.select_for_update()
+            refund_ids = list(due.values_list('id', flat=True)[:batch_size])
+            if not refund_ids:
+                return []
+            Refund.objects.filter(id__in=refund_ids).update(status='processing', updated_at=now)
+
+        return [
+            {
+                'id': row['id'],
+                'attempts': row['attempts'],
+                'refund_number': row['refund_number'],
+                'amount': row['amount'],
+                'currency': row['payment__currency'],
+                'payment_number': row['payment__payment_number'],
+                'gateway': row['payment__payment_gateway'],
+                'transaction_id': row['payment__gateway_transaction_id'],
+            }
+            for row in Refund.objects.filter(id__in=refund_ids).order_by('id').values(
+                'id', 'attempts', 'refund_number', 'amount',
+                'payment__currency', 'payment__payment_number',
+                'payment__payment_gateway', 'payment__gateway_transaction_id',
+            )
+        ]
+
+    @staticmethod
+    def _call(client, request: dict) -> tuple:
+        """Run one gateway call; errors are returned, not raised, so the batch completes."""
+        try:
+            return request, client.refund(request), None
+        except GatewayError as exc:
+            return request, None, exc
+        except Exception as exc:
+            logger.exception(f"Gateway refund call for {request['refund_number']} failed")
+            return request, None, GatewayError(str(exc))
+
+    @staticmethod
+    def _record(outcomes: list) -> dict:
+        now = timezone.now()
+        counts = {'completed': 0, 'retried': 0, 'failed': 0}
+        refunds = []
+        for request, response, error in outcomes:
+            refund = Refund(id=request['id'], attempts=request['attempts'] + 1, updated_at=now)
+            if error is None:
+                refund.status = 'completed'
+                refund.gateway_refund_id = response.get('refund_id')
+                refund.gateway_response = response.get('response')
+                counts['completed'] += 1
+            elif error.retryable and refund.attempts < RefundService.MAX_ATTEMPTS:
+                refund.status = 'queued'
+                refund.next_attempt_at = now + RefundService.backoff(refund.attempts)
+                refund.last_error = str(error)
+                refund.gateway_response = error.response
+                counts['retried'] += 1
+            else:
+                refund.status = 'failed'
+                refund.last_error = str(error)
+                refund.gateway_response = error.response
+                counts['failed'] += 1
+            refunds.append(refund)
+
+        with transaction.atomic():
+            Refund.objects.bulk_update(refunds, [
+                'status', 'attempts', 'next_attempt_at', 'last_error',
+                'gateway_refund_id', 'gateway_response', 'updated_at',
+            ])
+            RefundService._settle([refund.id for refund in refunds if refund.status == 'completed'])
+
+        logger.info(f"Refund batch of {len(refunds)}: {counts}")
+        return counts
+
+    @staticmethod
+    def _settle(refund_ids: list):
+        """Mark fully refunded payments and orders, and complete the returns waiting on these refunds."""
+        if not refund_ids:
+            return
+        now = timezone.now()
+
+        payment_ids = Refund.objects.filter(id__in=refund_ids).values('payment_id')
+        refunded = list(
+            Payment.objects.filter(id__in=payment_ids)
+            .exclude(status=PaymentStatus.REFUNDED)
+            .annotate(refunded=Sum('refunds__amount', filter=Q(refunds__status='completed')))
+            .filter(refunded__gte=F('amount'))
+            .values_list('id', 'sales_order_id')
+        )
+        if refunded:
+            Payment.objects.filter(id__in=[row[0] for row in refunded]).update(
+                status=PaymentStatus.REFUNDED, updated_at=now
+            )
+            SalesOrder.objects.filter(id__in={row[1] for row in refunded}).update(
+                payment_status=PaymentStatus.REFUNDED, updated_at=now
+            )
+
+        returns = list(
+            ReturnRequest.objects.filter(refund_id__in=refund_ids, status='refund_initiated')
+            .values_list('id', 'refund__refund_number')
+        )
+        if returns:
+            ReturnRequest.objects.filter(id__in=[row[0] for row in returns]).update(
+                status='refund_completed', updated_at=now
+            )
+            ReturnStatusLog.objects.bulk_create([
+                ReturnStatusLog(
+                    return_request_id=return_id,
+                    old_status='refund_initiated',
+                    new_status='refund_completed',
+                    notes=f"Refund {refund_number} completed",
+                )
+                for return_id, refund_number in returns
+            ])
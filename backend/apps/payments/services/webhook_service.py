@@ -0,0 +1,238 @@
+"""
+Payment gateway webhook ingestion.
+
+The webhook endpoint does the minimum per request: verify the HMAC
+signature and insert the raw event into the PaymentWebhookEvent inbox,
+where the unique (gateway, event_id) constraint drops gateway retries.
+A worker (the process_payment_webhooks command) drains the inbox in
+batches. It claims pending events with SKIP LOCKED so several workers can
+run side by side. For each batch it loads the affected payments in one
+query and writes payments, orders and events with bulk updates.
+
+Event payload:
+    {
+        "id": "evt_123",
+        "type": "payment.captured" | "payment.failed",
+        "data": {
+            "reference": "<our payment_number>",
+            "transaction_id": "<gateway transaction id>",
+            "reason": "<failure reason, optional>"
+        }
+    }
+"""
+import hashlib
+import hmac
+import logging
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from apps.payments.models import Payment, PaymentWebhookEvent
+from apps.sales_orders.models import SalesOrder
+from core.exceptions import ValidationException
+from core.utils.constants import PaymentStatus
+
+logger = logging.getLogger(__name__)
+
+# Gateway event type -> payment status it moves the payment to
+EVENT_STATUSES = {
+    'payment.captured': PaymentStatus.COMPLETED,
+    'payment.failed': PaymentStatus.FAILED,
+}
+
+# Payment statuses each target status may be reached from
+ALLOWED_FROM = {
+    PaymentStatus.COMPLETED: {PaymentStatus.PENDING, PaymentStatus.PROCESSING, PaymentStatus.FAILED},
+    PaymentStatus.FAILED: {PaymentStatus.PENDING, PaymentStatus.PROCESSING},
+}
+
+
+class PaymentWebhookService:
+    """Service class for receiving and applying gateway webhook events."""
+
+    BATCH_SIZE = 500
+    MAX_ATTEMPTS = 5
+
+    @staticmethod
+    def verify_signature(body: bytes, signature: str) -> bool:
+        """Check the hex HMAC-SHA256 of the raw body against the shared secret."""
+        secret = getattr(settings, 'PAYMENT_WEBHOOK_SECRET', '')
+        if not secret or not signature:
+            return False
+        expected = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+        return hmac.compare_digest(expected, signature)
+
+    @staticmethod
+    def receive(gateway: str, payload: dict) -> bool:
+        """
+        Store a verified event in the inbox.
+
+        Returns:
+            True if stored, False if the event was already received
+
+        Raises:
+            ValidationException: If the payload has no event id or type
+        """
+        event_id = payload.get('id') if isinstance(payload, dict) else None
+        event_type = payload.get('type') if isinstance(payload, dict) else None
+        if not event_id or not event_type:
+            raise ValidationException('Webhook payload must include id and type.')
+
+        try:
+            with transaction.atomic():
+                PaymentWebhookEvent.objects.create(
+                    gateway=gateway,
+                    event_id=str(event_id),
+                    event_type=str(event_type),
+                    payload=payload,
+                )
+        except IntegrityError:
+            return False
+        return True
+
+    @staticmethod
+    def process_pending(batch_size: int = None) -> dict:
+        """
+        Apply the pending inbox events, oldest first.
+
+        Each run walks the inbox once by id, so an event that keeps failing
+        is retried by the next run rather than in a tight loop.
+
+        Args:
+            batch_size: Events applied per transaction
+
+        Returns:
+            Dict with processed, ignored and failed event counts
+        """
+        batch_size = batch_size or PaymentWebhookService.BATCH_SIZE
+        result = {'processed': 0, 'ignored': 0, 'failed': 0}
+        last_id = 0
+        while True:
+            counts, last_id = PaymentWebhookService.process_batch(batch_size, last_id)
+            if counts is None:
+                break
+            for key in result:
+                result[key] += counts[key]
+        return result
+
+    @staticmethod
+    def process_batch(batch_size: int = None, after_id: int = 0) -> tuple:
+        """
+        Claim and apply one batch of pending events with ids above `after_id`.
+
+        Returns:
+            Tuple of (dict with processed, ignored and failed counts, last
+            claimed event id); the counts are None when no events are left
+        """
+        batch_size = batch_size or PaymentWebhookService.BATCH_SIZE
+        event_ids = []
+        try:
+            with transaction.atomic():
+                events = list(PaymentWebhookService._claim(
+                    PaymentWebhookEvent.objects.filter(status='pending', id__gt=after_id).order_by('id')
+                )[:batch_size])
+                if not events:
+                    return None, after_id
+                event_ids = [event.id for event in events]
+                return PaymentWebhookService._apply(events), event_ids[-1]
+        except Exception:
+            if not event_ids:
+                raise
+            # Retry the events one at a time so one bad event cannot block the batch
+            logger.exception(f"Webhook batch of {len(event_ids)} events failed, retrying one by one")
+            return PaymentWebhookService._apply_individually(event_ids), event_ids[-1]
+
+    @staticmethod
+    def _claim(queryset):
+        """Lock rows for this worker, skipping rows other workers hold."""
+        if connection.features.has_select_for_update_skip_locked:
+            return queryset.select_for_update(skip_locked=True)
+        return queryset.select_for_update()
+
+    @staticmethod
+    def _apply_individually(event_ids: list) -> dict:
+        counts = {'processed': 0, 'ignored': 0, 'failed': 0}
+        for event_id in event_ids:
+            try:
+                with transaction.atomic():
+                    events = list(PaymentWebhookService._claim(
+                        PaymentWebhookEvent.objects.filter(id=event_id, status='pending')
+                    ))
+                    if events:
+                        for key, value in PaymentWebhookService._apply(events).items():
+                            counts[key] += value
+            except Exception as exc:
+                logger.exception(f"Webhook event {event_id} failed")
+                PaymentWebhookService._record_failure([event_id], str(exc))
+                counts['failed'] += 1
+        return counts
+
+    @staticmethod
+    def _apply(events: list) -> dict:
+        now = timezone.now()
+        references = {
+            PaymentWebhookService._data(event).get('reference')
+            for event in events if event.event_type in EVENT_STATUSES
+        }
+        payments = {
+            payment.payment_number: payment
+            for payment in Payment.objects.select_for_update().filter(payment_number__in=references - {None})
+            .only('id', 'payment_number', 'sales_order_id', 'status', 'gateway_transaction_id', 'paid_at', 'notes')
+        }
+
+        changed = {}
+        counts = {'processed': 0, 'ignored': 0, 'failed': 0}
+        for event in events:
+            target = EVENT_STATUSES.get(event.event_type)
+            data = PaymentWebhookService._data(event)
+            payment = payments.get(data.get('reference'))
+            event.attempts += 1
+            event.processed_at = now
+
+            if target is None:
+                event.status, event.error = 'ignored', f"Unhandled event type {event.event_type}"
+            elif payment is None:
+                event.status, event.error = 'failed', f"Unknown payment {data.get('reference')}"
+            elif payment.status not in ALLOWED_FROM[target]:
+                event.status, event.error = 'ignored', f"Payment already {payment.status}"
+            else:
+                payment.status = target
+                payment.gateway_transaction_id = data.get('transaction_id') or payment.gateway_transaction_id
+                payment.gateway_response = event.payload
+                payment.updated_at = now
+                if target == PaymentStatus.COMPLETED:
+                    payment.paid_at = now
+                else:
+                    payment.notes = data.get('reason') or payment.notes
+                changed[payment.id] = payment
+                event.status, event.error = 'processed', None
+            counts[event.status] += 1
+
+        Payment.objects.bulk_update(
+            list(changed.values()),
+            ['status', 'gateway_transaction_id', 'gateway_response', 'paid_at', 'notes', 'updated_at'],
+        )
+        for status in (PaymentStatus.COMPLETED, PaymentStatus.FAILED):
+            order_ids = [payment.sales_order_id for payment in changed.values() if payment.status == status]
+            if order_ids:
+                SalesOrder.objects.filter(id__in=order_ids).update(payment_status=status, updated_at=now)
+
+        PaymentWebhookEvent.objects.bulk_update(events, ['status', 'attempts', 'processed_at', 'error'])
+        return counts
+
+    @staticmethod
+    def _data(event) -> dict:
+        data = event.payload.get('data') if isinstance(event.payload, dict) else None
+        return data if isinstance(data, dict) else {}
+
+    @staticmethod
+    def _record_failure(event_ids: list, error: str):
+        """Count a failed attempt; events stop being retried after MAX_ATTEMPTS."""
+        if not event_ids:
+            return
+        events = PaymentWebhookEvent.objects.filter(id__in=event_ids, status='pending')
+        events.update(attempts=F('attempts') + 1, error=error)
+        events.filter(attempts__gte=PaymentWebhookService.MAX_ATTEMPTS).update(
+            status='failed', processed_at=timezone.now()
+        )
@@ -3,7 +3,7 @@ Payment URL patterns.
 """
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from apps.payments.views import PaymentViewSet, RefundViewSet
+from apps.payments.views import PaymentViewSet, RefundViewSet, PaymentWebhookView
 
 router = DefaultRouter()
 router.register('', PaymentViewSet, basename='payments')
@@ -12,6 +12,7 @@ refund_router = DefaultRouter()
 refund_router.register('refunds', RefundViewSet, basename='refunds')
 
 urlpatterns = [
+    path('webhooks/<slug:gateway>/', PaymentWebhookView.as_view(), name='payment-webhook'),
     path('', include(router.urls)),
     path('', include(refund_router.urls)),
 ]
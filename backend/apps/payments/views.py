@@ -1,15 +1,17 @@
 """
 Payment views.
 """
+import json
+
 from rest_framework import status, viewsets
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.views import APIView
 from rest_framework.decorators import action
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
 from drf_spectacular.utils import extend_schema
 from django.utils import timezone
-import uuid
 
 from apps.payments.models import Payment, Refund
 from apps.payments.serializers import (
@@ -22,19 +24,22 @@ from apps.payments.serializers import (
     RefundCreateSerializer,
     RefundProcessSerializer,
 )
+from apps.payments.services import PaymentWebhookService, RefundService
 from apps.sales_orders.models import SalesOrder
 from core.permissions import IsAdmin, IsVendorOrAdmin
 from core.utils.constants import PaymentStatus
+from core.utils.sequences import SequenceService
+from core.utils.stats import StatsBuilder
 
 
 def generate_payment_number():
     """Generate unique payment number."""
-    return f"PAY-{timezone.now().strftime('%Y%m%d')}-{uuid.uuid4().hex[:8].upper()}"
+    return SequenceService.next_number('PAY')
 
 
 def generate_refund_number():
     """Generate unique refund number."""
-    return f"REF-{timezone.now().strftime('%Y%m%d')}-{uuid.uuid4().hex[:8].upper()}"
+    return SequenceService.next_number('REF')
 
 
 class PaymentViewSet(viewsets.ModelViewSet):
@@ -201,23 +206,21 @@ class PaymentViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def summary(self, request):
         """Get payment summary."""
-        from django.db.models import Sum, Count
-        
-        queryset = self.get_queryset()
-        
-        summary = {
-            'total_payments': queryset.count(),
-            'completed': queryset.filter(status=PaymentStatus.COMPLETED).count(),
-            'pending': queryset.filter(status=PaymentStatus.PENDING).count(),
-            'failed': queryset.filter(status=PaymentStatus.FAILED).count(),
-            'total_amount': float(queryset.filter(status=PaymentStatus.COMPLETED).aggregate(
-                total=Sum('amount')
-            )['total'] or 0),
-            'by_method': {
-                item['payment_method']: item['count']
-                for item in queryset.filter(status=PaymentStatus.COMPLETED).values('payment_method').annotate(count=Count('id'))
-            }
-        }
+        summary = (
+            StatsBuilder(self.get_queryset())
+            .count('total_payments')
+            .count('completed', status=PaymentStatus.COMPLETED)
+            .count('pending', status=PaymentStatus.PENDING)
+            .count('failed', status=PaymentStatus.FAILED)
+            .sum('total_amount', 'amount', status=PaymentStatus.COMPLETED)
+            .count_by(
+                'by_method', 'payment_method',
+                [method for method, _ in Payment.PAYMENT_METHOD_CHOICES],
+                status=PaymentStatus.COMPLETED
+            )
+            .build(name='payments', user=request.user)
+        )
+        summary['total_amount'] = float(summary['total_amount'])
         
         return Response({
             'success': True,
@@ -237,6 +240,8 @@ class RefundViewSet(viewsets.ModelViewSet):
     def get_permissions(self):
         if self.action in ['create']:
             return [IsAuthenticated()]
+        if self.action in ['retry']:
+            return [IsAuthenticated(), IsAdmin()]
         return [IsAuthenticated(), IsVendorOrAdmin()]
     
     def get_queryset(self):
@@ -300,11 +305,7 @@ class RefundViewSet(viewsets.ModelViewSet):
             }, status=status.HTTP_400_BAD_REQUEST)
         
         # Check refund amount
-        existing_refunds = payment.refunds.filter(status__in=['pending', 'processing', 'completed']).aggregate(
-            total=Sum('amount')
-        )['total'] or 0
-        
-        max_refundable = float(payment.amount) - float(existing_refunds)
+        max_refundable = float(RefundService.refundable_amount(payment))
         if float(data['amount']) > max_refundable:
             return Response({
                 'success': False,
@@ -342,33 +343,74 @@ class RefundViewSet(viewsets.ModelViewSet):
             }, status=status.HTTP_400_BAD_REQUEST)
         
         if data['action'] == 'approve':
-            refund.status = 'completed'
-            refund.gateway_refund_id = data.get('gateway_refund_id', '')
-            
-            # Update payment/order status if fully refunded
-            payment = refund.payment
-            total_refunded = payment.refunds.filter(status='completed').aggregate(
-                total=Sum('amount')
-            )['total'] or 0
-            total_refunded += float(refund.amount)
-            
-            if total_refunded >= float(payment.amount):
-                payment.status = PaymentStatus.REFUNDED
-                payment.save(update_fields=['status', 'updated_at'])
-                
-                order = payment.sales_order
-                order.payment_status = PaymentStatus.REFUNDED
-                order.save(update_fields=['payment_status', 'updated_at'])
+            # A gateway refund id means the refund was already made at the
+            # gateway; otherwise the refund worker sends it
+            if data.get('gateway_refund_id'):
+                RefundService.complete_manually(refund, data['gateway_refund_id'], request.user)
+            else:
+                RefundService.enqueue(refund, request.user)
         else:
             refund.status = 'rejected'
-        
-        refund.processed_by = request.user
-        refund.processed_at = timezone.now()
-        refund.save(update_fields=[
-            'status', 'gateway_refund_id', 'processed_by', 'processed_at', 'updated_at'
-        ])
+            refund.processed_by = request.user
+            refund.processed_at = timezone.now()
+            refund.save(update_fields=['status', 'processed_by', 'processed_at', 'updated_at'])
         
         return Response({
             'success': True,
             'data': RefundSerializer(refund).data
         })
+
+    @extend_schema(tags=['Refunds (Admin)'], request=None)
+    @action(detail=True, methods=['post'])
+    def retry(self, request, pk=None):
+        """Requeue a failed refund for the gateway."""
+        refund = self.get_object()
+        if refund.status != 'failed':
+            return Response({
+                'success': False,
+                'error': {'message': f'Cannot retry refund in {refund.status} status.'}
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        refund = RefundService.retry(refund, request.user)
+
+        return Response({
+            'success': True,
+            'data': RefundSerializer(refund).data
+        })
+
+
+class PaymentWebhookView(APIView):
+    """
+    Gateway webhook receiver.
+
+    Verifies the X-Webhook-Signature header (hex HMAC-SHA256 of the raw
+    body) and stores the event in the inbox; events are applied by the
+    process_payment_webhooks worker, so bursts never tie up web workers.
+    """
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    @extend_schema(tags=['Payments'])
+    def post(self, request, gateway):
+        """Receive a payment gateway event."""
+        body = request.body
+        if not PaymentWebhookService.verify_signature(body, request.headers.get('X-Webhook-Signature', '')):
+            return Response({
+                'success': False,
+                'error': {'message': 'Invalid signature.'}
+            }, status=status.HTTP_401_UNAUTHORIZED)
+
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            return Response({
+                'success': False,
+                'error': {'message': 'Invalid JSON payload.'}
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        created = PaymentWebhookService.receive(gateway, payload)
+
+        return Response({
+            'success': True,
+            'data': {'duplicate': not created}
+        })
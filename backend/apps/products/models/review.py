@@ -86,7 +86,7 @@ class ProductReview(BaseModel):
         self.is_approved = True
         self.approved_by = approved_by
         self.approved_at = timezone.now()
-        self.save(update_fields=['is_approved', 'approved_by', 'approved_at'])
+        self.save(update_fields=['is_approved', 'approved_by', 'approved_at', 'updated_at'])
         self.product.update_rating()
     
     def mark_helpful(self):
@@ -98,7 +98,7 @@ class ProductService:
         
         product.status = ProductStatus.ACTIVE
         product.published_at = timezone.now()
-        product.save(update_fields=['status', 'published_at'])
+        product.save(update_fields=['status', 'published_at', 'updated_at'])
         
         logger.info(f"Product published: {product.name}")
         
@@ -108,7 +108,7 @@ class ProductService:
     def unpublish_product(product: Product) -> Product:
         """Unpublish a product."""
         product.status = ProductStatus.INACTIVE
-        product.save(update_fields=['status'])
+        product.save(update_fields=['status', 'updated_at'])
         
         logger.info(f"Product unpublished: {product.name}")
         
@@ -119,7 +119,7 @@ class ProductService:
         """Archive a product."""
         product.status = ProductStatus.ARCHIVED
         product.is_active = False
-        product.save(update_fields=['status', 'is_active'])
+        product.save(update_fields=['status', 'is_active', 'updated_at'])
         
         logger.info(f"Product archived: {product.name}")
         
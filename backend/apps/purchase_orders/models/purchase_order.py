@@ -5,7 +5,7 @@ from django.db import models
 from django.conf import settings
 from core.models import BaseModel
 from core.utils.constants import POStatus, PaymentStatus
-from decimal import Decimal
+from core.utils.pricing import LINE_OUTPUT_FIELDS, line_from_instance, order_totals, price_line
 
 
 class PurchaseOrder(BaseModel):
@@ -107,18 +107,16 @@ class PurchaseOrder(BaseModel):
     
     def calculate_totals(self):
         """Calculate order totals from items."""
-        items = self.items.all()
-        self.subtotal = sum(item.total for item in items)
-        
-        if self.discount_type == 'percentage':
-            self.discount_amount = self.subtotal * (self.discount_value / 100)
-        elif self.discount_type == 'amount':
-            self.discount_amount = self.discount_value
-        else:
-            self.discount_amount = sum(item.discount_amount for item in items)
-        
-        self.tax_amount = sum(item.tax_amount for item in items)
-        self.total_amount = self.subtotal - self.discount_amount + self.tax_amount + self.shipping_amount
+        totals = order_totals(
+            self.items.values(*LINE_OUTPUT_FIELDS),
+            discount_type=self.discount_type,
+            discount_value=self.discount_value,
+            shipping_amount=self.shipping_amount,
+        )
+        self.subtotal = totals['subtotal']
+        self.discount_amount = totals['discount_amount']
+        self.tax_amount = totals['tax_amount']
+        self.total_amount = totals['total_amount']
         self.save(update_fields=['subtotal', 'discount_amount', 'tax_amount', 'total_amount'])
 
 
@@ -174,28 +172,9 @@ class PurchaseOrderItem(BaseModel):
         return f"{self.product.name} x {self.quantity_ordered}"
     
     def save(self, *args, **kwargs):
-        qty = self.quantity_ordered or 0
-        unit_price = self.unit_price or Decimal("0")
-        discount_value = self.discount_value or Decimal("0")
-        tax_percent = self.tax_percentage or Decimal("0")
-
-        # Subtotal
-        self.subtotal = (unit_price * qty).quantize(Decimal("0.01"))
-
-        # Discount
-        if self.discount_type == "percentage":
-            self.discount_amount = (self.subtotal * discount_value / Decimal("100")).quantize(Decimal("0.01"))
-        elif self.discount_type == "amount":
-            self.discount_amount = discount_value
-        else:
-            self.discount_amount = Decimal("0.00")
-
-        # Tax
-        taxable_amount = self.subtotal - self.discount_amount
-        self.tax_amount = (taxable_amount * tax_percent / Decimal("100")).quantize(Decimal("0.01"))
-
-        # Final Total
-        self.total = (taxable_amount + self.tax_amount).quantize(Decimal("0.01"))
+        priced = price_line(line_from_instance(self))
+        for field in LINE_OUTPUT_FIELDS:
+            setattr(self, field, priced[field])
 
         super().save(*args, **kwargs)
     
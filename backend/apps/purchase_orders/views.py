@@ -10,7 +10,6 @@ from rest_framework.filters import SearchFilter, OrderingFilter
 from drf_spectacular.utils import extend_schema
 from django.utils import timezone
 from django.db import transaction
-import uuid
 
 from apps.purchase_orders.models import PurchaseOrder, PurchaseOrderItem, POStatusLog
 from apps.purchase_orders.serializers import (
@@ -30,11 +29,12 @@ from apps.products.models import Product
 from apps.inventory.models import Inventory, InventoryLog
 from core.permissions import IsVendorOrAdmin
 from core.utils.constants import POStatus, MovementType
+from core.utils.sequences import SequenceService
 
 
 def generate_po_number():
     """Generate unique PO number."""
-    return f"PO-{timezone.now().strftime('%Y%m%d')}-{uuid.uuid4().hex[:6].upper()}"
+    return SequenceService.next_number('PO')
 
 
 def log_status_change(po, old_status, new_status, user, notes=None):
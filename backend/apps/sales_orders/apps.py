@@ -5,3 +5,6 @@ class SalesOrdersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.sales_orders'
     verbose_name = 'Sales Orders'
+
+    def ready(self):
+        import apps.sales_orders.signals  # noqa
@@ -0,0 +1,45 @@
+"""
+Management command to auto-cancel orders stuck waiting for online payment.
+
+Intended to run from cron every few minutes.
+
+Usage:
+    python manage.py cancel_unpaid_orders
+    python manage.py cancel_unpaid_orders --older-than 45 --batch-size 200
+    python manage.py cancel_unpaid_orders --dry-run
+"""
+from django.core.management.base import BaseCommand
+
+from apps.sales_orders.services import OrderCancellationService
+
+
+class Command(BaseCommand):
+    help = 'Cancel prepaid orders still pending payment beyond the timeout'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than',
+            type=int,
+            help='Payment timeout in minutes (default: PENDING_PAYMENT_TIMEOUT_MINUTES)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=OrderCancellationService.BATCH_SIZE,
+            help='Orders cancelled per transaction',
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Only report matching orders')
+
+    def handle(self, *args, **options):
+        result = OrderCancellationService.cancel_unpaid_orders(
+            older_than_minutes=options['older_than'],
+            batch_size=options['batch_size'],
+            dry_run=options['dry_run'],
+        )
+
+        if options['dry_run']:
+            self.stdout.write(f"{result['matched']} orders would be cancelled.")
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f"Cancelled {result['cancelled']} of {result['matched']} unpaid orders."
+            ))
@@ -0,0 +1,73 @@
+"""
+Management command to export sales order lines for accounting and GST returns.
+
+Usage:
+    python manage.py export_sales_orders --from 2024-04-01 --to 2024-04-30 --output april.csv
+    python manage.py export_sales_orders --vendor 12 --status delivered --status completed
+    python manage.py export_sales_orders --from 2024-04-01 --format xlsx --output april.xlsx
+"""
+import sys
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.sales_orders.services import OrderExportService
+from core.utils.constants import SOStatus
+
+
+def _parse_date(value):
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise CommandError(f"Invalid date '{value}', expected YYYY-MM-DD.")
+
+
+class Command(BaseCommand):
+    help = 'Export sales order lines with HSN and tax fields as CSV or XLSX'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='date_from', help='First order date (YYYY-MM-DD)')
+        parser.add_argument('--to', dest='date_to', help='Last order date (YYYY-MM-DD)')
+        parser.add_argument('--vendor', type=int, help='Only export lines sold by this vendor ID')
+        parser.add_argument(
+            '--status',
+            action='append',
+            choices=SOStatus.LIST,
+            help='Order status to include (repeatable)',
+        )
+        parser.add_argument('--format', dest='file_format', choices=['csv', 'xlsx'], default='csv')
+        parser.add_argument('--output', help='Output file path (CSV defaults to stdout)')
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=OrderExportService.CHUNK_SIZE,
+            help='Rows fetched per query',
+        )
+
+    def handle(self, *args, **options):
+        date_from = _parse_date(options['date_from']) if options['date_from'] else None
+        date_to = _parse_date(options['date_to']) if options['date_to'] else None
+        if date_from and date_to and date_from > date_to:
+            raise CommandError('--to must be on or after --from.')
+
+        queryset = OrderExportService.get_queryset(
+            date_from=date_from,
+            date_to=date_to,
+            vendor_id=options['vendor'],
+            statuses=options['status'],
+        )
+        output = options['output']
+        chunk_size = options['chunk_size']
+
+        if options['file_format'] == 'xlsx':
+            if not output:
+                raise CommandError('--output is required for XLSX exports.')
+            with open(output, 'wb') as fileobj:
+                count = OrderExportService.write_xlsx(queryset, fileobj, chunk_size)
+        elif output:
+            with open(output, 'w', newline='', encoding='utf-8') as fileobj:
+                count = OrderExportService.write_csv(queryset, fileobj, chunk_size)
+        else:
+            count = OrderExportService.write_csv(queryset, sys.stdout, chunk_size)
+
+        self.stderr.write(self.style.SUCCESS(f'Exported {count} order lines.'))
@@ -0,0 +1,57 @@
+"""
+Management command to generate single-use coupon codes in bulk from a
+template coupon.
+
+Usage:
+    python manage.py generate_coupon_codes --template DIWALI --count 1000000 --prefix DW-
+    python manage.py generate_coupon_codes --template DIWALI --count 50000 --output codes.csv
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.sales_orders.models import Coupon
+from apps.sales_orders.services import CouponCodeGenerator
+from core.exceptions import ValidationException
+
+
+class Command(BaseCommand):
+    help = 'Generate unique single-use coupons cloned from a template coupon'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--template', required=True, help='Code of the template coupon')
+        parser.add_argument('--count', type=int, required=True, help='Number of codes to generate')
+        parser.add_argument('--prefix', default='', help='Prefix for every code')
+        parser.add_argument('--length', type=int, default=10, help='Random characters per code')
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=CouponCodeGenerator.CHUNK_SIZE,
+            help='Coupons inserted per transaction',
+        )
+        parser.add_argument('--output', help='Write the generated codes to this CSV file')
+
+    def handle(self, *args, **options):
+        template = Coupon.objects.filter(code__iexact=options['template']).first()
+        if template is None:
+            raise CommandError(f"Coupon {options['template']} not found")
+
+        def progress(created):
+            self.stdout.write(f"  {created}/{options['count']}")
+
+        try:
+            result = CouponCodeGenerator.generate(
+                template,
+                options['count'],
+                prefix=options['prefix'],
+                length=options['length'],
+                chunk_size=options['chunk_size'],
+                progress=progress,
+            )
+        except ValidationException as exc:
+            raise CommandError(exc.detail)
+
+        if options['output']:
+            with open(options['output'], 'w', newline='') as output:
+                for chunk in CouponCodeGenerator.iter_csv(result['batch']):
+                    output.write(chunk)
+
+        self.stdout.write(self.style.SUCCESS(f"Generated {result['created']} coupons in batch {result['batch']}."))
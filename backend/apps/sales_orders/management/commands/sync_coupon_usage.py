@@ -0,0 +1,24 @@
+"""
+Management command to rebuild coupon usage counters from usage records.
+
+Run once after deploying per-user counters, and whenever counters need
+repair.
+
+Usage:
+    python manage.py sync_coupon_usage
+    python manage.py sync_coupon_usage --coupon 12 --coupon 15
+"""
+from django.core.management.base import BaseCommand
+
+from apps.sales_orders.services import CouponUsageService
+
+
+class Command(BaseCommand):
+    help = 'Rebuild coupon usage_count and per-user usage counters'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--coupon', type=int, action='append', help='Only this coupon id (repeatable)')
+
+    def handle(self, *args, **options):
+        written = CouponUsageService.sync_counters(coupon_ids=options['coupon'])
+        self.stdout.write(self.style.SUCCESS(f"Synced {written} per-user coupon counters."))
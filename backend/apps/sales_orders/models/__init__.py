@@ -1,11 +1,11 @@
 from .sales_order import SalesOrder, SalesOrderItem, SOStatusLog
 from .vendor_order import VendorOrder, VendorOrderItem, VendorOrderStatusLog
 from .returns import ReturnRequest, ReturnItem, ReturnStatusLog
-from .coupon import Coupon, CouponUsage
+from .coupon import Coupon, CouponUsage, CouponUserUsage
 
 __all__ = [
     'SalesOrder', 'SalesOrderItem', 'SOStatusLog',
     'VendorOrder', 'VendorOrderItem', 'VendorOrderStatusLog',
     'ReturnRequest', 'ReturnItem', 'ReturnStatusLog',
-    'Coupon', 'CouponUsage',
+    'Coupon', 'CouponUsage', 'CouponUserUsage',
 ]
@@ -145,6 +145,9 @@ class Coupon(BaseModel):
     # Metadata
     terms_and_conditions = models.TextField(blank=True, null=True)
 
+    # Bulk generation run this coupon was created in (see CouponCodeGenerator)
+    batch = models.CharField(max_length=32, blank=True, null=True, db_index=True)
+
     class Meta:
         verbose_name = 'coupon'
         verbose_name_plural = 'coupons'
@@ -171,46 +174,16 @@ class Coupon(BaseModel):
 
     def can_use(self, user, cart_total):
         """Check if user can use this coupon."""
-        if not self.is_valid:
-            return False, "Coupon is not valid"
-
-        if self.min_order_value and cart_total < self.min_order_value:
-            return False, f"Minimum order value is ₹{self.min_order_value}"
-
-        # Check per-user limit
-        user_usage = CouponUsage.objects.filter(
-            coupon=self,
-            user=user
-        ).count()
-        if user_usage >= self.per_user_limit:
-            return False, "You have already used this coupon"
-
-        # Check new users only
-        if self.new_users_only:
-            from apps.sales_orders.models import SalesOrder
-            if SalesOrder.objects.filter(customer__user=user).exists():
-                return False, "This coupon is for new users only"
-
-        # Check target users
-        if self.target_user_ids and user.id not in self.target_user_ids:
-            return False, "This coupon is not available for you"
-
-        return True, "Coupon can be applied"
+        from apps.sales_orders.services import CouponEngine
+        compiled = CouponEngine.compile(self)
+        return CouponEngine.check_eligibility(
+            compiled, CouponEngine.user_context(user, [compiled]), cart_total
+        )
 
     def calculate_discount(self, cart_total):
         """Calculate discount amount."""
-        if self.coupon_type == 'percentage':
-            discount = cart_total * (self.value / 100)
-            if self.max_discount:
-                discount = min(discount, self.max_discount)
-        elif self.coupon_type == 'fixed':
-            discount = min(self.value, cart_total)
-        elif self.coupon_type == 'free_shipping':
-            discount = 0  # Handled separately
-        else:
-            discount = 0
-
-        return discount
+        from apps.sales_orders.services import CouponEngine
+        return CouponEngine.evaluate(CouponEngine.compile(self), cart_total=cart_total)['discount_amount']
 
 
 class CouponUsage(BaseModel):
@@ -249,8 +222,33 @@ class CouponUsage(BaseModel):
     def __str__(self):
         return f"{self.coupon.code} used by {self.user.email}"
 
-    def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        # Update usage count
-        self.coupon.usage_count = CouponUsage.objects.filter(coupon=self.coupon).count()
-        self.coupon.save(update_fields=['usage_count'])
+
+class CouponUserUsage(BaseModel):
+    """
+    Per-user redemption counter for a coupon.
+
+    Maintained by CouponUsageService with conditional UPDATEs so per-user
+    limits are checked on one indexed row instead of counting usages.
+    """
+    coupon = models.ForeignKey(
+        Coupon,
+        on_delete=models.CASCADE,
+        related_name='user_usages'
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='coupon_user_usages'
+    )
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = 'coupon user usage'
+        verbose_name_plural = 'coupon user usages'
+        unique_together = ['coupon', 'user']
+        indexes = [
+            models.Index(fields=['user', 'coupon']),
+        ]
+
+    def __str__(self):
+        return f"{self.coupon_id} x{self.count} by {self.user_id}"
@@ -189,8 +189,8 @@ class ReturnRequest(BaseModel):
 
     def generate_return_number(self):
         """Generate unique return number."""
-        import uuid
-        return f"RET-{uuid.uuid4().hex[:8].upper()}"
+        from core.utils.sequences import SequenceService
+        return SequenceService.next_number('RET')
 
 
 class ReturnItem(BaseModel):
@@ -6,6 +6,7 @@ from django.conf import settings
 from core.models import BaseModel
 from core.utils.constants import SOStatus, PaymentStatus
 from core.utils.choices import OrderSourceChoices, PaymentMethodChoices
+from core.utils.pricing import LINE_OUTPUT_FIELDS, line_from_instance, order_totals, price_line
 
 
 class SalesOrder(BaseModel):
@@ -156,16 +157,16 @@ class SalesOrder(BaseModel):
     
     def calculate_totals(self):
         """Calculate order totals from items."""
-        items = self.items.all()
-        self.subtotal = sum(item.total for item in items)
-        
-        if self.discount_type == 'percentage':
-            self.discount_amount = self.subtotal * (self.discount_value / 100)
-        elif self.discount_type == 'amount':
-            self.discount_amount = self.discount_value
-        
-        self.tax_amount = sum(item.tax_amount for item in items)
-        self.total_amount = self.subtotal - self.discount_amount + self.tax_amount + self.shipping_amount
+        totals = order_totals(
+            self.items.values(*LINE_OUTPUT_FIELDS),
+            discount_type=self.discount_type,
+            discount_value=self.discount_value,
+            shipping_amount=self.shipping_amount,
+        )
+        self.subtotal = totals['subtotal']
+        self.discount_amount = totals['discount_amount']
+        self.tax_amount = totals['tax_amount']
+        self.total_amount = totals['total_amount']
         self.save(update_fields=['subtotal', 'discount_amount', 'tax_amount', 'total_amount'])
 
 
@@ -240,15 +241,9 @@ class SalesOrderItem(BaseModel):
             self.product_image = self.product.primary_image
         
         # Calculate amounts
-        self.subtotal = self.unit_price * self.quantity_ordered
-        
-        if self.discount_type == 'percentage':
-            self.discount_amount = self.subtotal * (self.discount_value / 100)
-        elif self.discount_type == 'amount':
-            self.discount_amount = self.discount_value
-        
-        self.tax_amount = (self.subtotal - self.discount_amount) * (self.tax_percentage / 100)
-        self.total = self.subtotal - self.discount_amount + self.tax_amount
+        priced = price_line(line_from_instance(self))
+        for field in LINE_OUTPUT_FIELDS:
+            setattr(self, field, priced[field])
         
         super().save(*args, **kwargs)
 
@@ -5,6 +5,7 @@ from django.db import models
 from django.conf import settings
 from core.models import BaseModel
 from core.utils.constants import SOStatus, PaymentStatus
+from core.utils.pricing import LINE_OUTPUT_FIELDS, line_from_instance, order_totals, price_line
 
 
 class VendorOrder(BaseModel):
@@ -107,15 +108,20 @@ class VendorOrder(BaseModel):
 
     def calculate_totals(self):
         """Calculate totals from items."""
-        items = self.items.all()
-        self.subtotal = sum(item.total for item in items)
-        self.tax_amount = sum(item.tax_amount for item in items)
-        self.total_amount = self.subtotal - self.discount_amount + self.tax_amount + self.shipping_amount
-
-        # Calculate commission
+        # discount_amount holds this vendor's share of the order discount
         self.commission_rate = self.vendor.commission_rate or 0
-        self.commission_amount = self.total_amount * (self.commission_rate / 100)
-        self.vendor_earning = self.total_amount - self.commission_amount
+        totals = order_totals(
+            self.items.values(*LINE_OUTPUT_FIELDS),
+            discount_type='amount',
+            discount_value=self.discount_amount,
+            shipping_amount=self.shipping_amount,
+            commission_rate=self.commission_rate,
+        )
+        self.subtotal = totals['subtotal']
+        self.tax_amount = totals['tax_amount']
+        self.total_amount = totals['total_amount']
+        self.commission_amount = totals['commission_amount']
+        self.vendor_earning = totals['vendor_earning']
 
         self.save(update_fields=[
             'subtotal', 'tax_amount', 'total_amount',
@@ -124,9 +130,8 @@ class VendorOrder(BaseModel):
 
     def generate_order_number(self):
         """Generate unique vendor order number."""
-        import uuid
-        prefix = self.vendor.store_slug[:3].upper() if self.vendor.store_slug else 'VO'
-        return f"{prefix}-{self.sales_order.order_number}-{uuid.uuid4().hex[:6].upper()}"
+        from core.utils.sequences import SequenceService
+        return SequenceService.next_number('VO')
 
 
 class VendorOrderItem(BaseModel):
@@ -214,19 +219,11 @@ class VendorOrderItem(BaseModel):
             if not self.variant_attributes:
                 self.variant_attributes = self.variant.attributes
 
-        # Calculate amounts
-        self.subtotal = self.unit_price * self.quantity_ordered
-
-        if self.discount_type == 'percentage':
-            self.discount_amount = self.subtotal * (self.discount_value / 100)
-        elif self.discount_type == 'amount':
-            self.discount_amount = self.discount_value
-
-        self.tax_amount = (self.subtotal - self.discount_amount) * (self.tax_percentage / 100)
-        self.total = self.subtotal - self.discount_amount + self.tax_amount
-
-        # Calculate commission
-        self.commission_amount = self.total * (self.commission_rate / 100)
+        # Calculate amounts and item-level commission
+        priced = price_line(line_from_instance(self))
+        for field in LINE_OUTPUT_FIELDS:
+            setattr(self, field, priced[field])
+        self.commission_amount = priced['commission_amount']
 
         super().save(*args, **kwargs)
 
@@ -5,6 +5,8 @@ from .sales_order import (
     SalesOrderItemSerializer,
     SOStatusLogSerializer,
     SalesOrderCreateSerializer,
+    SalesOrderExportSerializer,
+    SalesOrderBulkCancelSerializer,
 )
 from .vendor_order import (
     VendorOrderSerializer,
@@ -28,6 +30,9 @@ from .coupon import (
     CouponCreateSerializer,
     CouponUsageSerializer,
     CouponValidateSerializer,
+    CompiledCouponSerializer,
+    BestCouponSerializer,
+    CouponGenerateSerializer,
 )
 
 __all__ = [
@@ -38,6 +43,8 @@ __all__ = [
     'SalesOrderItemSerializer',
     'SOStatusLogSerializer',
     'SalesOrderCreateSerializer',
+    'SalesOrderExportSerializer',
+    'SalesOrderBulkCancelSerializer',
     # Vendor Order
     'VendorOrderSerializer',
     'VendorOrderListSerializer',
@@ -58,4 +65,7 @@ __all__ = [
     'CouponCreateSerializer',
     'CouponUsageSerializer',
     'CouponValidateSerializer',
+    'CompiledCouponSerializer',
+    'BestCouponSerializer',
+    'CouponGenerateSerializer',
 ]
@@ -113,15 +113,50 @@ class CouponUsageSerializer(serializers.ModelSerializer):
 
 
 class CouponValidateSerializer(serializers.Serializer):
-    """Serializer for validating coupon codes."""
+    """
+    Serializer for validating coupon codes.
+
+    Without cart_total the coupon is checked line by line against the
+    caller's cart.
+    """
     code = serializers.CharField(max_length=50)
-    cart_total = serializers.DecimalField(max_digits=12, decimal_places=2)
-
-    def validate(self, attrs):
-        code = attrs.get('code')
-        try:
-            coupon = Coupon.objects.get(code__iexact=code)
-            attrs['coupon'] = coupon
-        except Coupon.DoesNotExist:
-            raise serializers.ValidationError({'code': 'Invalid coupon code'})
-        return attrs
+    cart_total = serializers.DecimalField(max_digits=12, decimal_places=2, required=False)
+
+
+class CompiledCouponSerializer(serializers.Serializer):
+    """Read-only view of a compiled coupon from the coupon engine."""
+    id = serializers.IntegerField()
+    code = serializers.CharField()
+    name = serializers.CharField()
+    coupon_type = serializers.CharField()
+    value = serializers.DecimalField(max_digits=10, decimal_places=2)
+    min_order_value = serializers.DecimalField(max_digits=10, decimal_places=2, allow_null=True)
+    max_discount = serializers.DecimalField(max_digits=10, decimal_places=2, allow_null=True)
+    valid_from = serializers.DateTimeField()
+    valid_until = serializers.DateTimeField()
+    applicability = serializers.CharField()
+
+
+class BestCouponSerializer(serializers.Serializer):
+    """A ranked coupon option for the caller's cart."""
+    coupon = CompiledCouponSerializer()
+    discount_amount = serializers.DecimalField(max_digits=12, decimal_places=2)
+    eligible_subtotal = serializers.DecimalField(max_digits=12, decimal_places=2)
+    free_shipping = serializers.BooleanField()
+    final_total = serializers.DecimalField(max_digits=12, decimal_places=2)
+
+
+class CouponGenerateSerializer(serializers.Serializer):
+    """Serializer for generating single-use codes from a template coupon."""
+    count = serializers.IntegerField(min_value=1)
+    prefix = serializers.RegexField(r'^[A-Za-z0-9-]*$', max_length=20, required=False, allow_blank=True, default='')
+    length = serializers.IntegerField(min_value=6, max_value=30, default=10)
+
+    def validate_count(self, value):
+        from apps.sales_orders.services import CouponCodeGenerator
+        limit = CouponCodeGenerator.max_per_request()
+        if value > limit:
+            raise serializers.ValidationError(
+                f'At most {limit} codes per request; use the generate_coupon_codes command for larger runs.'
+            )
+        return value
@@ -3,6 +3,7 @@ Sales Order serializers.
 """
 from rest_framework import serializers
 from apps.sales_orders.models import SalesOrder, SalesOrderItem, SOStatusLog
+from core.utils.constants import SOStatus
 
 
 class SalesOrderItemSerializer(serializers.ModelSerializer):
@@ -191,3 +192,29 @@ class AssignDeliverySerializer(serializers.Serializer):
     agent_id = serializers.IntegerField(required=True)
     estimated_delivery_time = serializers.DateTimeField(required=False)
     notes = serializers.CharField(required=False, allow_blank=True)
+
+
+class SalesOrderExportSerializer(serializers.Serializer):
+    """Serializer for sales order export filters."""
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    vendor = serializers.IntegerField(required=False)
+    status = serializers.MultipleChoiceField(choices=SOStatus.CHOICES, required=False)
+    file_format = serializers.ChoiceField(choices=['csv', 'xlsx'], default='csv')
+
+    def validate(self, attrs):
+        date_from = attrs.get('date_from')
+        date_to = attrs.get('date_to')
+        if date_from and date_to and date_from > date_to:
+            raise serializers.ValidationError({'date_to': 'date_to must be on or after date_from'})
+        return attrs
+
+
+class SalesOrderBulkCancelSerializer(serializers.Serializer):
+    """Serializer for cancelling several orders at once."""
+    order_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=1000,
+    )
+    reason = serializers.CharField(required=True, max_length=500)
@@ -0,0 +1,13 @@
+from .order_export_service import OrderExportService
+from .order_cancellation_service import OrderCancellationService
+from .coupon_engine import CouponEngine
+from .coupon_usage_service import CouponUsageService
+from .coupon_generation_service import CouponCodeGenerator
+
+__all__ = [
+    'OrderExportService',
+    'OrderCancellationService',
+    'CouponEngine',
+    'CouponUsageService',
+    'CouponCodeGenerator',
+]
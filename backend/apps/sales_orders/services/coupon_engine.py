@@ -0,0 +1,498 @@
+"""
+Coupon evaluation engine.
+
+Each coupon is compiled once into a plain dict of frozensets (products,
+category subtree, vendors, brands, target users) and cached, so checking a
+coupon against a whole cart is an in-memory pass over the cart lines with
+no per-coupon queries. Compiled coupons are dropped from the cache by the
+signals in apps.sales_orders.signals whenever a coupon or its applicability
+changes.
+
+A cart line is a dict with:
+    product_id, variant_id, vendor_id, category_id, brand_id,
+    quantity, unit_price
+"""
+import logging
+from datetime import timedelta
+from decimal import Decimal
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+from apps.customers.models import CartItem
+from apps.products.models import Category
+from apps.sales_orders.models import Coupon, CouponUserUsage, SalesOrder
+from core.utils.pricing import HUNDRED, ZERO, quantize, to_decimal
+
+logger = logging.getLogger(__name__)
+
+CACHE_VERSION = 1
+
+# (compiled key, M2M field on Coupon, column on the through table)
+RESTRICTIONS = (
+    ('product_ids', 'applicable_products', 'product_id'),
+    ('category_ids', 'applicable_categories', 'category_id'),
+    ('vendor_ids', 'applicable_vendors', 'vendor_id'),
+    ('brand_ids', 'applicable_brands', 'brand_id'),
+)
+
+# Which line attribute each restriction set is matched against
+LINE_KEYS = {
+    'product_ids': 'product_id',
+    'category_ids': 'category_id',
+    'vendor_ids': 'vendor_id',
+    'brand_ids': 'brand_id',
+}
+
+
+class CouponEngine:
+    """Service class for compiling coupons and evaluating them against carts."""
+
+    @staticmethod
+    def timeout() -> int:
+        return getattr(settings, 'COUPON_CACHE_TIMEOUT', 300)
+
+    @staticmethod
+    def generation_key() -> str:
+        return f"coupon:v{CACHE_VERSION}:generation"
+
+    @staticmethod
+    def generation() -> int:
+        """
+        Current generation of compiled coupons.
+
+        It is part of every compiled-coupon key, so bumping it (see
+        invalidate_category_tree) drops all compiled coupons at once.
+        """
+        return cache.get_or_set(CouponEngine.generation_key(), 1, None)
+
+    @staticmethod
+    def code_key(code: str, generation: int = None) -> str:
+        """Cache key for a compiled coupon."""
+        generation = generation or CouponEngine.generation()
+        return f"coupon:v{CACHE_VERSION}:g{generation}:code:{code.upper()}"
+
+    @staticmethod
+    def category_tree_key() -> str:
+        return f"coupon:v{CACHE_VERSION}:category_tree"
+
+    @staticmethod
+    def active_index_key(generation: int = None) -> str:
+        generation = generation or CouponEngine.generation()
+        return f"coupon:v{CACHE_VERSION}:g{generation}:active_public"
+
+    @staticmethod
+    def compile_many(coupons) -> list:
+        """
+        Compile coupons into cacheable dicts.
+
+        Costs one query per applicability relation for the whole batch,
+        plus the (cached) category tree.
+        """
+        coupons = list(coupons)
+        if not coupons:
+            return []
+        ids = [coupon.id for coupon in coupons]
+
+        restrictions = {coupon.id: {key: set() for key, _, _ in RESTRICTIONS} for coupon in coupons}
+        for key, field, column in RESTRICTIONS:
+            through = getattr(Coupon, field).through
+            for coupon_id, value in through.objects.filter(coupon_id__in=ids).values_list('coupon_id', column):
+                restrictions[coupon_id][key].add(value)
+
+        children = None
+        compiled = []
+        for coupon in coupons:
+            sets = restrictions[coupon.id]
+            if sets['category_ids']:
+                if children is None:
+                    children = CouponEngine._category_children()
+                sets['category_ids'] = CouponEngine._expand_categories(sets['category_ids'], children)
+
+            compiled.append({
+                'id': coupon.id,
+                'code': coupon.code,
+                'name': coupon.name,
+                'coupon_type': coupon.coupon_type,
+                'value': coupon.value,
+                'min_order_value': coupon.min_order_value,
+                'max_discount': coupon.max_discount,
+                'valid_from': coupon.valid_from,
+                'valid_until': coupon.valid_until,
+                'usage_limit': coupon.usage_limit,
+                'usage_count': coupon.usage_count,
+                'per_user_limit': coupon.per_user_limit,
+                'applicability': coupon.applicability,
+                'new_users_only': coupon.new_users_only or coupon.applicability == 'first_order',
+                'target_user_ids': frozenset(coupon.target_user_ids) if coupon.target_user_ids else None,
+                'is_active': coupon.is_active,
+                'is_public': coupon.is_public,
+                'buy_quantity': coupon.buy_quantity,
+                'get_quantity': coupon.get_quantity,
+                'get_product_id': coupon.get_product_id,
+                **{key: frozenset(values) for key, values in sets.items()},
+            })
+        return compiled
+
+    @staticmethod
+    def compile(coupon) -> dict:
+        """Compile a single coupon."""
+        return CouponEngine.compile_many([coupon])[0]
+
+    @staticmethod
+    def get_compiled(code: str):
+        """
+        Compiled coupon for a code (case-insensitive), or None.
+
+        Served from the cache; a miss compiles the coupon and caches it.
+        Unknown codes are not cached.
+        """
+        key = CouponEngine.code_key(code)
+        compiled = cache.get(key)
+        if compiled is None:
+            coupon = Coupon.objects.filter(code__iexact=code).first()
+            if coupon is None:
+                return None
+            compiled = CouponEngine.compile(coupon)
+            cache.set(key, compiled, CouponEngine.timeout())
+        return compiled
+
+    @staticmethod
+    def invalidate(*codes: str):
+        """Drop compiled coupons, and the active coupon index, from the cache."""
+        generation = CouponEngine.generation()
+        cache.delete_many([
+            *(CouponEngine.code_key(code, generation) for code in codes if code),
+            CouponEngine.active_index_key(generation),
+        ])
+
+    @staticmethod
+    def active_public_coupons(now=None) -> list:
+        """
+        Compiled public coupons that are active right now.
+
+        The index holds every active public coupon whose validity window
+        overlaps the next cache period. It is built with one range query on
+        the (is_active, valid_from, valid_until) index plus the batch
+        compile, and cached. Each call then filters it in memory by the
+        current time, so coupons that start or expire while it is cached
+        are still handled correctly.
+        """
+        now = now or timezone.now()
+        key = CouponEngine.active_index_key()
+        index = cache.get(key)
+        if index is None:
+            timeout = CouponEngine.timeout()
+            coupons = Coupon.objects.filter(
+                is_active=True,
+                is_public=True,
+                valid_from__lte=now + timedelta(seconds=timeout),
+                valid_until__gte=now,
+            ).order_by('valid_until')
+            index = CouponEngine.compile_many(coupons)
+            cache.set(key, index, timeout)
+        return [coupon for coupon in index if coupon['valid_from'] <= now <= coupon['valid_until']]
+
+    @staticmethod
+    def invalidate_category_tree():
+        """
+        Drop the category tree and every compiled coupon.
+
+        Compiled coupons hold expanded category subtrees, so they are all
+        stale after a category move; bumping the generation retires them
+        without having to know their codes.
+        """
+        cache.delete(CouponEngine.category_tree_key())
+        try:
+            cache.incr(CouponEngine.generation_key())
+        except ValueError:
+            cache.set(CouponEngine.generation_key(), 2, None)
+
+    @staticmethod
+    def _category_children() -> dict:
+        """Map of parent category id to child ids, cached."""
+        key = CouponEngine.category_tree_key()
+        children = cache.get(key)
+        if children is None:
+            children = {}
+            for category_id, parent_id in Category.objects.filter(parent__isnull=False).values_list('id', 'parent_id'):
+                children.setdefault(parent_id, []).append(category_id)
+            cache.set(key, children, CouponEngine.timeout())
+        return children
+
+    @staticmethod
+    def _expand_categories(category_ids, children: dict) -> set:
+        """The given categories plus all of their descendants."""
+        result = set()
+        stack = list(category_ids)
+        while stack:
+            category_id = stack.pop()
+            if category_id in result:
+                continue
+            result.add(category_id)
+            stack.extend(children.get(category_id, ()))
+        return result
+
+    @staticmethod
+    def cart_lines(cart) -> list:
+        """Cart lines in engine format, with one query."""
+        return list(
+            CartItem.objects.filter(cart_id=cart.pk).order_by('id').values(
+                'product_id', 'variant_id', 'quantity', 'unit_price',
+                vendor_id=F('product__vendor_id'),
+                category_id=F('product__category_id'),
+                brand_id=F('product__brand_id'),
+            )
+        )
+
+    @staticmethod
+    def user_context(user, coupons) -> dict:
+        """
+        Per-user facts needed to evaluate `coupons` for `user`.
+
+        At most two queries regardless of how many coupons are checked: one
+        read of the user's per-coupon counters and, only if a coupon is for
+        new users, one EXISTS on the user's orders.
+        """
+        context = {'user_id': None, 'usage': {}, 'has_orders': False}
+        if user is None or not user.is_authenticated:
+            return context
+        context['user_id'] = user.id
+
+        ids = [coupon['id'] for coupon in coupons]
+        if ids:
+            context['usage'] = dict(
+                CouponUserUsage.objects.filter(user=user, coupon_id__in=ids).values_list('coupon_id', 'count')
+            )
+        if any(coupon['new_users_only'] for coupon in coupons):
+            context['has_orders'] = SalesOrder.objects.filter(customer__user=user).exists()
+        return context
+
+    @staticmethod
+    def check_eligibility(coupon: dict, user_context: dict = None, cart_total=None, now=None):
+        """
+        Check coupon-level and user-level conditions.
+
+        Returns:
+            Tuple (ok, message)
+        """
+        now = now or timezone.now()
+        if not coupon['is_active'] or now < coupon['valid_from'] or now > coupon['valid_until']:
+            return False, "Coupon is not valid"
+        if coupon['usage_limit'] and coupon['usage_count'] >= coupon['usage_limit']:
+            return False, "Coupon is not valid"
+
+        if coupon['min_order_value'] and cart_total is not None and cart_total < coupon['min_order_value']:
+            return False, f"Minimum order value is ₹{coupon['min_order_value']}"
+
+        if user_context is not None:
+            user_id = user_context['user_id']
+            if coupon['target_user_ids'] is not None and user_id not in coupon['target_user_ids']:
+                return False, "This coupon is not available for you"
+            if user_context['usage'].get(coupon['id'], 0) >= coupon['per_user_limit']:
+                return False, "You have already used this coupon"
+            if coupon['new_users_only'] and user_context['has_orders']:
+                return False, "This coupon is for new users only"
+
+        return True, "Coupon can be applied"
+
+    @staticmethod
+    def line_matches(coupon: dict, line: dict) -> bool:
+        """A line is eligible when it matches every non-empty restriction set."""
+        for key, line_key in LINE_KEYS.items():
+            values = coupon[key]
+            if values and line.get(line_key) not in values:
+                return False
+        return True
+
+    @staticmethod
+    def evaluate(coupon: dict, lines: list = None, user_context: dict = None,
+                 cart_total=None, now=None, line_totals: list = None) -> dict:
+        """
+        Evaluate a compiled coupon against cart lines or a plain cart total.
+
+        Args:
+            coupon: Compiled coupon
+            lines: Cart lines; when omitted the whole `cart_total` is eligible
+            user_context: Result of user_context(); user checks are skipped
+                when omitted
+            cart_total: Cart total used when `lines` is omitted
+            now: Evaluation time (defaults to now)
+            line_totals: Precomputed line totals when evaluating many coupons
+
+        Returns:
+            Dict with coupon_id, code, valid, message, cart_total,
+            discount_amount, eligible_subtotal, free_shipping and
+            line_discounts (one amount per line, in line order)
+        """
+        if lines is not None:
+            if line_totals is None:
+                line_totals = CouponEngine.line_totals(lines)
+            cart_total = sum(line_totals, ZERO)
+        else:
+            cart_total = quantize(cart_total)
+
+        result = {
+            'coupon_id': coupon['id'],
+            'code': coupon['code'],
+            'valid': False,
+            'message': '',
+            'cart_total': cart_total,
+            'discount_amount': ZERO,
+            'eligible_subtotal': ZERO,
+            'free_shipping': False,
+            'line_discounts': [ZERO] * len(lines) if lines is not None else [],
+        }
+
+        ok, message = CouponEngine.check_eligibility(coupon, user_context, cart_total, now)
+        result['message'] = message
+        if not ok:
+            return result
+
+        if lines is None:
+            eligible = cart_total
+            eligible_indexes = []
+        else:
+            eligible_indexes = [i for i, line in enumerate(lines) if CouponEngine.line_matches(coupon, line)]
+            eligible = sum((line_totals[i] for i in eligible_indexes), ZERO)
+            if not eligible_indexes:
+                result['message'] = "Coupon is not applicable to items in your cart"
+                return result
+
+        result['eligible_subtotal'] = eligible
+        coupon_type = coupon['coupon_type']
+        if coupon_type == 'percentage':
+            discount = quantize(eligible * to_decimal(coupon['value']) / HUNDRED)
+            if coupon['max_discount']:
+                discount = min(discount, coupon['max_discount'])
+        elif coupon_type == 'fixed':
+            discount = min(quantize(coupon['value']), eligible)
+        elif coupon_type == 'free_shipping':
+            discount = ZERO
+            result['free_shipping'] = True
+        elif coupon_type == 'buy_x_get_y' and lines is not None:
+            discount = CouponEngine._buy_x_get_y_discount(coupon, lines, eligible_indexes)
+        else:
+            discount = ZERO
+
+        result['valid'] = True
+        result['discount_amount'] = discount
+        if lines is not None and discount:
+            result['line_discounts'] = CouponEngine._allocate(discount, line_totals, eligible_indexes)
+        return result
+
+    @staticmethod
+    def evaluate_many(coupons: list, lines: list, user_context: dict = None, now=None) -> list:
+        """Evaluate several compiled coupons against the same cart lines."""
+        now = now or timezone.now()
+        totals = CouponEngine.line_totals(lines)
+        return [
+            CouponEngine.evaluate(coupon, lines, user_context, now=now, line_totals=totals)
+            for coupon in coupons
+        ]
+
+    @staticmethod
+    def line_totals(lines: list) -> list:
+        return [quantize(to_decimal(line['unit_price']) * line['quantity']) for line in lines]
+
+    @staticmethod
+    def check_code(code: str, user, lines: list = None, cart_total=None):
+        """
+        Evaluate a coupon code for a user's cart lines or cart total.
+
+        This is the single entry point for coupon checks (coupon APIs,
+        checkout), so every caller applies the same rules.
+
+        Returns:
+            Tuple (compiled coupon or None, evaluation dict or None); both
+            are None for an unknown code
+        """
+        coupon = CouponEngine.get_compiled(code)
+        if coupon is None:
+            return None, None
+        result = CouponEngine.evaluate(
+            coupon, lines, CouponEngine.user_context(user, [coupon]), cart_total=cart_total
+        )
+        return coupon, result
+
+    @staticmethod
+    def best_coupons(user, lines: list, limit: int = 5) -> list:
+        """
+        Rank the active public coupons that apply to a cart.
+
+        Costs the user-context queries only (the coupon index is cached);
+        every coupon is evaluated in memory.
+
+        Returns:
+            Up to `limit` (compiled coupon, evaluation) pairs, best first:
+            largest discount, then free shipping, then earliest expiry
+        """
+        now = timezone.now()
+        coupons = CouponEngine.active_public_coupons(now)
+        if not coupons or not lines:
+            return []
+
+        context = CouponEngine.user_context(user, coupons)
+        ranked = [
+            (coupon, result)
+            for coupon, result in zip(coupons, CouponEngine.evaluate_many(coupons, lines, context, now))
+            if result['valid'] and (result['discount_amount'] > 0 or result['free_shipping'])
+        ]
+        ranked.sort(key=lambda pair: (-pair[1]['discount_amount'], not pair[1]['free_shipping'], pair[0]['valid_until']))
+        return ranked[:limit]
+
+    @staticmethod
+    def _buy_x_get_y_discount(coupon: dict, lines: list, eligible_indexes: list) -> Decimal:
+        """
+        Buy X get Y free.
+
+        With a get_product, that product's units are free (up to Y per X
+        eligible units bought). Otherwise the cheapest eligible units are
+        free, Y for every X + Y units in the cart.
+        """
+        buy = coupon['buy_quantity'] or 0
+        get = coupon['get_quantity'] or 0
+        if buy <= 0 or get <= 0:
+            return ZERO
+
+        if coupon['get_product_id']:
+            bought = sum(lines[i]['quantity'] for i in eligible_indexes)
+            free_units = (bought // buy) * get
+            discount = ZERO
+            for line in lines:
+                if free_units <= 0:
+                    break
+                if line['product_id'] == coupon['get_product_id']:
+                    units = min(free_units, line['quantity'])
+                    discount += to_decimal(line['unit_price']) * units
+                    free_units -= units
+            return quantize(discount)
+
+        # Cheapest lines first, taking whole runs of units per line
+        total_units = sum(lines[i]['quantity'] for i in eligible_indexes)
+        free_units = (total_units // (buy + get)) * get
+        discount = ZERO
+        for price, quantity in sorted(
+            (to_decimal(lines[i]['unit_price']), lines[i]['quantity']) for i in eligible_indexes
+        ):
+            if free_units <= 0:
+                break
+            units = min(free_units, quantity)
+            discount += price * units
+            free_units -= units
+        return quantize(discount)
+
+    @staticmethod
+    def _allocate(discount: Decimal, line_totals: list, eligible_indexes: list) -> list:
+        """Spread a discount over eligible lines pro rata; the last line takes the rounding."""
+        allocation = [ZERO] * len(line_totals)
+        base = sum((line_totals[i] for i in eligible_indexes), ZERO)
+        if not base:
+            return allocation
+        remaining = discount
+        for i in eligible_indexes[:-1]:
+            share = min(quantize(discount * line_totals[i] / base), remaining)
+            allocation[i] = share
+            remaining -= share
+        allocation[eligible_indexes[-1]] = remaining
+        return allocation
@@ -0,0 +1,181 @@
+"""
+Bulk coupon code generation.
+
+Creates large runs of single-use coupons cloned from a template coupon.
+Codes are drawn at random in memory, checked against existing codes one
+chunk at a time through the unique index on Coupon.code, and inserted with
+bulk_create. Every coupon in a run shares a `batch` id, which is used to
+stream the codes back out as CSV.
+"""
+import logging
+import re
+import secrets
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from apps.sales_orders.models import Coupon
+from core.exceptions import ValidationException
+
+logger = logging.getLogger(__name__)
+
+# No 0/O or 1/I/L, so codes survive being read out or typed in
+ALPHABET = 'ABCDEFGHJKMNPQRSTUVWXYZ23456789'
+PREFIX_PATTERN = re.compile(r'^[A-Z0-9-]*$')
+
+# Template fields copied onto every generated coupon
+CLONE_FIELDS = (
+    'name', 'description', 'coupon_type', 'value', 'min_order_value', 'max_discount',
+    'valid_from', 'valid_until', 'applicability', 'target_user_ids', 'new_users_only',
+    'buy_quantity', 'get_quantity', 'get_product_id', 'terms_and_conditions', 'is_active',
+)
+
+APPLICABILITY_FIELDS = (
+    ('applicable_categories', 'category_id'),
+    ('applicable_products', 'product_id'),
+    ('applicable_vendors', 'vendor_id'),
+    ('applicable_brands', 'brand_id'),
+)
+
+
+class CouponCodeGenerator:
+    """Service class for generating single-use coupon codes in bulk."""
+
+    CHUNK_SIZE = 5000
+    MAX_RETRIES = 5
+
+    @staticmethod
+    def max_per_request() -> int:
+        return getattr(settings, 'COUPON_BULK_MAX_PER_REQUEST', 100000)
+
+    @staticmethod
+    def random_codes(count: int, prefix: str = '', length: int = 10) -> set:
+        """`count` distinct random codes (duplicates are drawn again)."""
+        choice = secrets.choice
+        codes = set()
+        while len(codes) < count:
+            codes.add(prefix + ''.join(choice(ALPHABET) for _ in range(length)))
+        return codes
+
+    @staticmethod
+    def generate(template, count: int, prefix: str = '', length: int = 10,
+                 chunk_size: int = None, progress=None) -> dict:
+        """
+        Create `count` single-use coupons cloned from `template`.
+
+        Args:
+            template: Coupon whose terms and applicability are copied
+            count: Number of coupons to create
+            prefix: Upper-case prefix for every code
+            length: Random characters after the prefix
+            chunk_size: Coupons inserted per transaction
+            progress: Optional callable receiving the running total
+
+        Returns:
+            Dict with batch (id of this run) and created count
+
+        Raises:
+            ValidationException: If the parameters cannot produce the codes
+        """
+        prefix = (prefix or '').upper()
+        chunk_size = chunk_size or CouponCodeGenerator.CHUNK_SIZE
+        CouponCodeGenerator._validate(count, prefix, length)
+
+        batch = f"{timezone.now():%Y%m%d%H%M%S}-{secrets.token_hex(4).upper()}"
+        fields = {field: getattr(template, field) for field in CLONE_FIELDS}
+        applicability = {
+            field: list(getattr(template, field).values_list('id', flat=True))
+            for field, _ in APPLICABILITY_FIELDS
+        }
+
+        created = 0
+        retries = 0
+        while created < count:
+            codes = CouponCodeGenerator._unique_chunk(min(chunk_size, count - created), prefix, length)
+            try:
+                with transaction.atomic():
+                    Coupon.objects.bulk_create([
+                        Coupon(
+                            code=code,
+                            batch=batch,
+                            usage_limit=1,
+                            per_user_limit=1,
+                            is_public=False,
+                            **fields,
+                        )
+                        for code in codes
+                    ], batch_size=1000)
+                    CouponCodeGenerator._copy_applicability(batch, codes, applicability)
+            except IntegrityError:
+                # A code was taken between the lookup and the insert
+                retries += 1
+                if retries > CouponCodeGenerator.MAX_RETRIES:
+                    raise
+                continue
+
+            created += len(codes)
+            if progress:
+                progress(created)
+
+        logger.info(f"Generated {created} coupons from {template.code} in batch {batch}")
+        return {'batch': batch, 'created': created}
+
+    @staticmethod
+    def iter_csv(batch: str):
+        """Yield CSV lines with the codes of a batch, in primary-key chunks."""
+        yield 'code,valid_from,valid_until\r\n'
+        coupons = Coupon.objects.filter(batch=batch)
+        last_id = 0
+        while True:
+            rows = list(
+                coupons.filter(id__gt=last_id)
+                .order_by('id')
+                .values_list('id', 'code', 'valid_from', 'valid_until')[:CouponCodeGenerator.CHUNK_SIZE]
+            )
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            # Codes only contain [A-Z0-9-], so no CSV quoting is needed
+            yield ''.join(
+                f"{code},{valid_from.isoformat()},{valid_until.isoformat()}\r\n"
+                for _, code, valid_from, valid_until in rows
+            )
+
+    @staticmethod
+    def _validate(count: int, prefix: str, length: int):
+        if count < 1:
+            raise ValidationException('Count must be at least 1.')
+        if not PREFIX_PATTERN.match(prefix):
+            raise ValidationException('Prefix may only contain letters, digits and hyphens.')
+        if length < 6 or len(prefix) + length > Coupon._meta.get_field('code').max_length:
+            raise ValidationException('Code length must be at least 6 and fit the code field.')
+        # Keep the space sparse so random codes rarely collide
+        if len(ALPHABET) ** length < count * 1000:
+            raise ValidationException('Code length is too short for this many codes.')
+
+    @staticmethod
+    def _unique_chunk(size: int, prefix: str, length: int) -> list:
+        """Random codes not yet used by any coupon (one indexed lookup per round)."""
+        codes = set()
+        while len(codes) < size:
+            candidates = CouponCodeGenerator.random_codes(size - len(codes), prefix, length) - codes
+            taken = set(Coupon.objects.filter(code__in=candidates).values_list('code', flat=True))
+            codes |= candidates - taken
+        return list(codes)
+
+    @staticmethod
+    def _copy_applicability(batch: str, codes: list, applicability: dict):
+        """Copy the template's M2M applicability onto the new coupons in bulk."""
+        if not any(applicability.values()):
+            return
+        # bulk_create does not return primary keys on every backend (MySQL)
+        coupon_ids = list(Coupon.objects.filter(batch=batch, code__in=codes).values_list('id', flat=True))
+        for field, column in APPLICABILITY_FIELDS:
+            target_ids = applicability[field]
+            if not target_ids:
+                continue
+            through = getattr(Coupon, field).through
+            through.objects.bulk_create(
+                [through(coupon_id=coupon_id, **{column: target_id})
+                 for coupon_id in coupon_ids for target_id in target_ids],
+                batch_size=5000,
+            )
@@ -0,0 +1,163 @@
+"""
+Coupon usage service.
+
+Redemptions enforce the global and per-user limits with conditional
+UPDATEs, so the database decides atomically whether another use fits:
+
+    UPDATE coupon SET usage_count = usage_count + 1
+    WHERE id = %s AND (usage_limit IS NULL OR usage_limit = 0 OR usage_count < usage_limit)
+
+Zero rows updated means the limit is reached, however many checkouts race
+for the last use. Each check touches one indexed row. As in Coupon.can_use
+and CouponEngine.check_eligibility, a usage_limit of 0 means unlimited.
+"""
+import logging
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, F, Q
+from apps.sales_orders.models import Coupon, CouponUsage, CouponUserUsage
+from apps.sales_orders.services.coupon_engine import CouponEngine
+from core.exceptions import BusinessLogicError
+
+logger = logging.getLogger(__name__)
+
+
+class CouponUsageService:
+    """Service class for redeeming and releasing coupon uses."""
+
+    @staticmethod
+    def redeem(coupon, user, discount_amount, sales_order=None):
+        """
+        Record one use of a coupon by a user.
+
+        Args:
+            coupon: Coupon being redeemed
+            user: Redeeming user
+            discount_amount: Discount granted by this use
+            sales_order: Order the coupon was applied to
+
+        Returns:
+            The created CouponUsage
+
+        Raises:
+            BusinessLogicError: If the coupon or per-user limit is reached
+        """
+        with transaction.atomic():
+            if not CouponUsageService._increment_coupon(coupon):
+                # The cached compiled coupon still shows the old count
+                CouponEngine.invalidate(coupon.code)
+                raise BusinessLogicError('Coupon usage limit has been reached.')
+
+            if not CouponUsageService._increment_user(coupon, user):
+                # Raising rolls back the coupon increment above
+                raise BusinessLogicError('You have already used this coupon.')
+
+            usage = CouponUsage.objects.create(
+                coupon=coupon,
+                user=user,
+                sales_order=sales_order,
+                discount_amount=discount_amount,
+            )
+            CouponUsageService._invalidate_count(coupon)
+
+        logger.info(f"Coupon {coupon.code} redeemed by user {user.id}")
+        return usage
+
+    @staticmethod
+    def release(usage):
+        """
+        Undo a redemption (e.g. the order was cancelled) and give the use back.
+        """
+        with transaction.atomic():
+            Coupon.objects.filter(pk=usage.coupon_id, usage_count__gt=0).update(
+                usage_count=F('usage_count') - 1
+            )
+            CouponUserUsage.objects.filter(
+                coupon_id=usage.coupon_id, user_id=usage.user_id, count__gt=0
+            ).update(count=F('count') - 1)
+            usage.delete()
+            CouponUsageService._invalidate_count(usage.coupon)
+
+    @staticmethod
+    def _increment_coupon(coupon) -> bool:
+        """Conditionally take one use from the coupon's global limit."""
+        return Coupon.objects.filter(pk=coupon.pk).filter(
+            Q(usage_limit__isnull=True) | Q(usage_limit=0) | Q(usage_count__lt=F('usage_limit'))
+        ).update(usage_count=F('usage_count') + 1) == 1
+
+    @staticmethod
+    def _invalidate_count(coupon):
+        """
+        Drop the compiled coupon once the transaction commits, so its cached
+        usage_count is refreshed. Only limited coupons check the count.
+        """
+        if coupon.usage_limit:
+            code = coupon.code
+            transaction.on_commit(lambda: CouponEngine.invalidate(code))
+
+    @staticmethod
+    def _increment_user(coupon, user) -> bool:
+        """Conditionally take one use from the user's per-coupon limit."""
+        counter = CouponUserUsage.objects.filter(
+            coupon_id=coupon.pk, user_id=user.pk, count__lt=coupon.per_user_limit
+        )
+        if counter.update(count=F('count') + 1):
+            return True
+        if coupon.per_user_limit < 1:
+            return False
+
+        # No counter row yet, or the limit is reached
+        try:
+            with transaction.atomic():
+                CouponUserUsage.objects.create(coupon_id=coupon.pk, user_id=user.pk, count=1)
+            return True
+        except IntegrityError:
+            # A concurrent first redemption created the row; retry the update
+            return counter.update(count=F('count') + 1) == 1
+
+    @staticmethod
+    def sync_counters(coupon_ids=None) -> int:
+        """
+        Rebuild usage_count and per-user counters from CouponUsage rows.
+
+        Used once to backfill the counters and for periodic repair. Costs
+        two grouped queries plus bulk writes.
+
+        Returns:
+            Number of per-user counters written
+        """
+        usages = CouponUsage.objects.all()
+        coupons = Coupon.objects.all()
+        if coupon_ids is not None:
+            usages = usages.filter(coupon_id__in=coupon_ids)
+            coupons = coupons.filter(id__in=coupon_ids)
+
+        totals = dict(usages.values('coupon_id').annotate(total=Count('id')).values_list('coupon_id', 'total'))
+        per_user = [
+            CouponUserUsage(coupon_id=coupon_id, user_id=user_id, count=count)
+            for coupon_id, user_id, count in usages.values('coupon_id', 'user_id')
+            .annotate(count=Count('id'))
+            .values_list('coupon_id', 'user_id', 'count')
+        ]
+
+        with transaction.atomic():
+            changed = []
+            for coupon in coupons.only('id', 'code', 'usage_count'):
+                total = totals.get(coupon.id, 0)
+                if coupon.usage_count != total:
+                    coupon.usage_count = total
+                    changed.append(coupon)
+            Coupon.objects.bulk_update(changed, ['usage_count'], batch_size=1000)
+            CouponUserUsage.objects.bulk_create(
+                per_user,
+                batch_size=1000,
+                update_conflicts=True,
+                # MySQL upserts on any unique key and rejects an explicit target
+                unique_fields=(
+                    ['coupon', 'user'] if connection.features.supports_update_conflicts_with_target else None
+                ),
+                update_fields=['count'],
+            )
+
+        for coupon in changed:
+            CouponEngine.invalidate(coupon.code)
+        return len(per_user)
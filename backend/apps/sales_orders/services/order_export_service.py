@@ -0,0 +1,184 @@
+"""
+Order export service for accounting and GST filings.
+"""
+import csv
+import logging
+from datetime import datetime, time, timedelta
+
+from django.db.models import DecimalField, ExpressionWrapper, F
+from django.utils import timezone
+
+from apps.sales_orders.models import SalesOrderItem
+from core.exceptions import ValidationException
+
+logger = logging.getLogger(__name__)
+
+
+# (header, queryset lookup) pairs, in output column order
+EXPORT_COLUMNS = [
+    ('Order Number', 'sales_order__order_number'),
+    ('Order Date', 'sales_order__order_date'),
+    ('Order Status', 'sales_order__status'),
+    ('Payment Status', 'sales_order__payment_status'),
+    ('Payment Method', 'sales_order__payment_method'),
+    ('Vendor ID', 'product__vendor_id'),
+    ('Vendor', 'product__vendor__store_name'),
+    ('Vendor GSTIN', 'product__vendor__tax_id'),
+    ('Vendor State', 'product__vendor__state'),
+    ('Customer Email', 'sales_order__customer__user__email'),
+    ('Place of Supply', 'sales_order__shipping_address_snapshot__state'),
+    ('Line ID', 'id'),
+    ('SKU', 'product_sku'),
+    ('Product', 'product_name'),
+    ('HSN Code', 'product__hsn_code'),
+    ('Quantity', 'quantity_ordered'),
+    ('Unit Price', 'unit_price'),
+    ('Gross Amount', 'subtotal'),
+    ('Discount', 'discount_amount'),
+    ('Taxable Value', 'taxable_value'),
+    ('Tax Rate', 'tax_percentage'),
+    ('Tax Amount', 'tax_amount'),
+    ('Line Total', 'total'),
+]
+
+EXPORT_FORMATS = ('csv', 'xlsx')
+
+
+class _EchoBuffer:
+    """File-like object that hands back whatever is written to it."""
+
+    def write(self, value):
+        return value
+
+
+class OrderExportService:
+    """Service class for streaming sales order line exports."""
+
+    CHUNK_SIZE = 2000
+
+    @staticmethod
+    def get_queryset(date_from=None, date_to=None, vendor_id=None, statuses=None):
+        """
+        Build the flat line-level export queryset.
+
+        Args:
+            date_from: First order date to include (inclusive)
+            date_to: Last order date to include (inclusive)
+            vendor_id: Restrict to lines sold by this vendor
+            statuses: Iterable of sales order statuses to include
+
+        Returns:
+            Unevaluated SalesOrderItem queryset annotated with taxable value
+        """
+        queryset = SalesOrderItem.objects.all()
+
+        # Compare against day boundaries rather than `__date` so the
+        # order_date range stays sargable.
+        if date_from:
+            start = timezone.make_aware(datetime.combine(date_from, time.min))
+            queryset = queryset.filter(sales_order__order_date__gte=start)
+        if date_to:
+            end = timezone.make_aware(datetime.combine(date_to + timedelta(days=1), time.min))
+            queryset = queryset.filter(sales_order__order_date__lt=end)
+        if vendor_id:
+            queryset = queryset.filter(product__vendor_id=vendor_id)
+        if statuses:
+            queryset = queryset.filter(sales_order__status__in=list(statuses))
+
+        return queryset.annotate(
+            taxable_value=ExpressionWrapper(
+                F('subtotal') - F('discount_amount'),
+                output_field=DecimalField(max_digits=12, decimal_places=2),
+            )
+        )
+
+    @staticmethod
+    def iter_rows(queryset, chunk_size: int = None):
+        """
+        Yield export rows as tuples in EXPORT_COLUMNS order.
+
+        Rows are fetched in keyset-paginated chunks on the item primary key,
+        so memory stays bounded regardless of export size and regardless of
+        whether the database driver supports server-side cursors.
+        """
+        chunk_size = chunk_size or OrderExportService.CHUNK_SIZE
+        lookups = [lookup for _, lookup in EXPORT_COLUMNS]
+        id_index = lookups.index('id')
+
+        last_id = 0
+        while True:
+            chunk = list(
+                queryset.filter(id__gt=last_id)
+                .order_by('id')
+                .values_list(*lookups)[:chunk_size]
+            )
+            if not chunk:
+                break
+            yield from chunk
+            last_id = chunk[-1][id_index]
+
+    @staticmethod
+    def headers():
+        """Return the export column headers."""
+        return [header for header, _ in EXPORT_COLUMNS]
+
+    @staticmethod
+    def iter_csv(queryset, chunk_size: int = None):
+        """Yield the export as CSV-encoded lines."""
+        writer = csv.writer(_EchoBuffer())
+        yield writer.writerow(OrderExportService.headers())
+        for row in OrderExportService.iter_rows(queryset, chunk_size):
+            yield writer.writerow(OrderExportService._format_row(row))
+
+    @staticmethod
+    def write_csv(queryset, fileobj, chunk_size: int = None) -> int:
+        """
+        Write the export as CSV to an open text file.
+
+        Returns:
+            Number of data rows written
+        """
+        writer = csv.writer(fileobj)
+        writer.writerow(OrderExportService.headers())
+
+        count = 0
+        for row in OrderExportService.iter_rows(queryset, chunk_size):
+            writer.writerow(OrderExportService._format_row(row))
+            count += 1
+        return count
+
+    @staticmethod
+    def write_xlsx(queryset, fileobj, chunk_size: int = None) -> int:
+        """
+        Write the export as an XLSX workbook to an open binary file.
+
+        Uses openpyxl's write-only mode, which streams rows to disk
+        instead of holding the sheet in memory.
+
+        Returns:
+            Number of data rows written
+        """
+        try:
+            from openpyxl import Workbook
+        except ImportError:
+            raise ValidationException("XLSX export requires the openpyxl package.")
+
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet('Sales Orders')
+        sheet.append(OrderExportService.headers())
+
+        count = 0
+        for row in OrderExportService.iter_rows(queryset, chunk_size):
+            sheet.append(OrderExportService._format_row(row))
+            count += 1
+
+        workbook.save(fileobj)
+        return count
+
+    @staticmethod
+    def _format_row(row):
+        """Render timezone-aware datetimes in local time for spreadsheets."""
+        return [
+            timezone.localtime(value).replace(tzinfo=None, microsecond=0) if isinstance(value, datetime) else value
+            for value in row
+        ]
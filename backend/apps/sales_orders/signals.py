@@ -0,0 +1,45 @@
+"""
+Signals for the sales_orders app.
+"""
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+from apps.products.models import Category
+from apps.sales_orders.models import Coupon
+from apps.sales_orders.services.coupon_engine import CouponEngine
+
+
+@receiver(pre_save, sender=Coupon)
+def remember_coupon_code(sender, instance, **kwargs):
+    """Keep the stored code so a renamed coupon's old code is invalidated too."""
+    instance._previous_code = None
+    if instance.pk:
+        instance._previous_code = Coupon.objects.filter(pk=instance.pk).values_list('code', flat=True).first()
+
+
+@receiver(post_save, sender=Coupon)
+@receiver(post_delete, sender=Coupon)
+def invalidate_compiled_coupon(sender, instance, **kwargs):
+    """Drop the cached compiled coupon when the coupon changes."""
+    CouponEngine.invalidate(instance.code, getattr(instance, '_previous_code', None))
+
+
+@receiver(m2m_changed, sender=Coupon.applicable_categories.through)
+@receiver(m2m_changed, sender=Coupon.applicable_products.through)
+@receiver(m2m_changed, sender=Coupon.applicable_vendors.through)
+@receiver(m2m_changed, sender=Coupon.applicable_brands.through)
+def invalidate_coupon_applicability(sender, instance, action, reverse, **kwargs):
+    """Drop the cached compiled coupon when its applicability changes."""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if reverse:
+        codes = Coupon.objects.filter(id__in=kwargs['pk_set'] or ()).values_list('code', flat=True)
+        CouponEngine.invalidate(*codes)
+    else:
+        CouponEngine.invalidate(instance.code)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_tree(sender, **kwargs):
+    """Recompile every coupon so category restrictions pick up category moves."""
+    CouponEngine.invalidate_category_tree()
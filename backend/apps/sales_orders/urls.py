@@ -7,6 +7,8 @@ from apps.sales_orders.views import SalesOrderViewSet
 from apps.sales_orders.views.vendor_order_views import VendorOrderViewSet
 from apps.sales_orders.views.return_views import ReturnRequestViewSet
 from apps.sales_orders.views.coupon_views import CouponViewSet, CouponUsageViewSet
+from apps.sales_orders.views.export_views import SalesOrderExportView
+from apps.sales_orders.views.cancellation_views import SalesOrderBulkCancelView
 
 router = DefaultRouter()
 router.register('', SalesOrderViewSet, basename='sales-orders')
@@ -24,6 +26,8 @@ coupon_usage_router = DefaultRouter()
 coupon_usage_router.register('coupon-usage', CouponUsageViewSet, basename='coupon-usage')
 
 urlpatterns = [
+    path('export/', SalesOrderExportView.as_view(), name='sales-order-export'),
+    path('bulk-cancel/', SalesOrderBulkCancelView.as_view(), name='sales-order-bulk-cancel'),
     path('', include(router.urls)),
     path('', include(vendor_order_router.urls)),
     path('', include(return_router.urls)),
@@ -10,7 +10,6 @@ from rest_framework.filters import SearchFilter, OrderingFilter
 from drf_spectacular.utils import extend_schema
 from django.utils import timezone
 from django.db import transaction
-import uuid
 
 from apps.sales_orders.models import SalesOrder, SalesOrderItem, SOStatusLog
 from apps.sales_orders.serializers import (
@@ -26,13 +25,15 @@ from apps.sales_orders.serializers import (
 from apps.customers.models import Customer, CustomerAddress
 from apps.products.models import Product
 from apps.delivery_agents.models import DeliveryAgent, DeliveryAssignment
+from apps.sales_orders.services import OrderCancellationService
 from core.permissions import IsAdmin, IsVendorOrAdmin, IsCustomer
 from core.utils.constants import SOStatus, PaymentStatus, DeliveryStatus
+from core.utils.sequences import SequenceService
 
 
 def generate_order_number():
     """Generate unique order number."""
-    return f"SO-{timezone.now().strftime('%Y%m%d')}-{uuid.uuid4().hex[:6].upper()}"
+    return SequenceService.next_number('SO')
 
 
 def log_status_change(order, old_status, new_status, user, notes=None):
@@ -323,21 +324,11 @@ class SalesOrderViewSet(viewsets.ModelViewSet):
                 'error': {'message': f'Cannot cancel order in {order.status} status.'}
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        old_status = order.status
-        order.status = SOStatus.CANCELLED
-        order.cancelled_by = request.user
-        order.cancelled_at = timezone.now()
-        order.cancellation_reason = serializer.validated_data['reason']
-        order.save(update_fields=['status', 'cancelled_by', 'cancelled_at', 
-                                   'cancellation_reason', 'updated_at'])
-        
-        log_status_change(order, old_status, SOStatus.CANCELLED, request.user,
-                         serializer.validated_data['reason'])
-        
-        # Release inventory reservations
-        for item in order.items.all():
-            if item.inventory:
-                item.inventory.unreserve(item.quantity_ordered)
+        # Cancels, logs and releases inventory reservations in bulk
+        OrderCancellationService.cancel_orders(
+            [order.id], serializer.validated_data['reason'], user=request.user
+        )
+        order.refresh_from_db()
         
         return Response({
             'success': True,
@@ -1,10 +1,14 @@
 from .vendor_order_views import VendorOrderViewSet
 from .return_views import ReturnRequestViewSet
 from .coupon_views import CouponViewSet, CouponUsageViewSet
+from .export_views import SalesOrderExportView
+from .cancellation_views import SalesOrderBulkCancelView
 
 __all__ = [
     'VendorOrderViewSet',
     'ReturnRequestViewSet',
     'CouponViewSet',
     'CouponUsageViewSet',
+    'SalesOrderExportView',
+    'SalesOrderBulkCancelView',
 ]
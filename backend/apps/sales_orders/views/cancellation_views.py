@@ -0,0 +1,44 @@
+"""
+Sales order bulk cancellation views.
+"""
+from rest_framework import status
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+from drf_spectacular.utils import extend_schema
+
+from apps.sales_orders.serializers import SalesOrderBulkCancelSerializer
+from apps.sales_orders.services import OrderCancellationService
+from core.permissions import IsVendorOrAdmin
+
+
+class SalesOrderBulkCancelView(APIView):
+    """
+    Cancel many sales orders in one request (e.g. after a gateway outage).
+
+    Vendors can only cancel their own single-vendor orders; orders that are
+    not cancellable are reported back as skipped.
+    """
+    permission_classes = [IsAuthenticated, IsVendorOrAdmin]
+
+    @extend_schema(request=SalesOrderBulkCancelSerializer, tags=['Sales Orders'])
+    def post(self, request):
+        """Cancel a list of orders and release their reserved stock."""
+        serializer = SalesOrderBulkCancelSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        vendor_id = None
+        if request.user.role == 'vendor':
+            vendor_id = request.user.vendor.id
+
+        result = OrderCancellationService.cancel_orders(
+            serializer.validated_data['order_ids'],
+            serializer.validated_data['reason'],
+            user=request.user,
+            vendor_id=vendor_id,
+        )
+
+        return Response({
+            'success': True,
+            'data': result
+        }, status=status.HTTP_200_OK)
@@ -1,14 +1,17 @@
 """
 Coupon views.
 """
+from django.http import StreamingHttpResponse
 from rest_framework import status, viewsets
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
-from drf_spectacular.utils import extend_schema
+from drf_spectacular.utils import extend_schema, OpenApiParameter
 
+from apps.customers.services import CartService
 from apps.sales_orders.models import Coupon, CouponUsage
 from apps.sales_orders.serializers import (
     CouponSerializer,
@@ -17,7 +20,12 @@ from apps.sales_orders.serializers import (
     CouponCreateSerializer,
     CouponUsageSerializer,
     CouponValidateSerializer,
+    CompiledCouponSerializer,
+    BestCouponSerializer,
+    CouponGenerateSerializer,
 )
+from apps.sales_orders.services import CouponEngine, CouponCodeGenerator
+from core.exceptions import NotFoundError
 from core.permissions import IsAdmin
 
 
@@ -30,7 +38,7 @@ class CouponViewSet(viewsets.ModelViewSet):
     filterset_fields = ['coupon_type', 'applicability', 'is_active', 'is_public']
 
     def get_permissions(self):
-        if self.action in ['list', 'retrieve', 'validate']:
+        if self.action in ['list', 'retrieve', 'validate', 'best']:
             return [IsAuthenticated()]
         return [IsAuthenticated(), IsAdmin()]
 
@@ -86,32 +94,78 @@ class CouponViewSet(viewsets.ModelViewSet):
     @extend_schema(tags=['Coupons'])
     @action(detail=False, methods=['post'])
     def validate(self, request):
-        """Validate a coupon code."""
+        """
+        Validate a coupon code.
+
+        Checks against `cart_total` when given, otherwise line by line
+        against the caller's cart (honouring product, category, vendor and
+        brand restrictions).
+        """
         serializer = CouponValidateSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        coupon = serializer.validated_data['coupon']
-        cart_total = serializer.validated_data['cart_total']
+        cart_total = serializer.validated_data.get('cart_total')
+
+        lines = None
+        if cart_total is None:
+            cart = CartService.find_cart(user=request.user)
+            lines = CouponEngine.cart_lines(cart) if cart else []
 
-        can_use, message = coupon.can_use(request.user, cart_total)
+        coupon, result = CouponEngine.check_code(
+            serializer.validated_data['code'], request.user, lines, cart_total=cart_total
+        )
+        if coupon is None:
+            raise ValidationError({'code': ['Invalid coupon code']})
 
-        if not can_use:
+        if not result['valid']:
             return Response({
                 'success': False,
-                'error': {'message': message}
+                'error': {'message': result['message']}
             }, status=status.HTTP_400_BAD_REQUEST)
 
-        discount = coupon.calculate_discount(cart_total)
-
         return Response({
             'success': True,
             'data': {
-                'coupon': CouponSerializer(coupon).data,
-                'discount_amount': discount,
-                'final_total': cart_total - discount,
+                'coupon': CompiledCouponSerializer(coupon).data,
+                'discount_amount': result['discount_amount'],
+                'eligible_subtotal': result['eligible_subtotal'],
+                'free_shipping': result['free_shipping'],
+                'final_total': result['cart_total'] - result['discount_amount'],
             }
         })
 
+    @extend_schema(
+        parameters=[OpenApiParameter('limit', int, description='Number of options (default 5, max 20)')],
+        responses={200: BestCouponSerializer(many=True)},
+        tags=['Coupons']
+    )
+    @action(detail=False, methods=['get'])
+    def best(self, request):
+        """Best applicable public coupons for the caller's cart, ranked by discount."""
+        try:
+            limit = max(1, min(int(request.query_params.get('limit', 5)), 20))
+        except ValueError:
+            limit = 5
+
+        cart = CartService.find_cart(user=request.user)
+        lines = CouponEngine.cart_lines(cart) if cart else []
+
+        options = [
+            {
+                'coupon': coupon,
+                'discount_amount': result['discount_amount'],
+                'eligible_subtotal': result['eligible_subtotal'],
+                'free_shipping': result['free_shipping'],
+                'final_total': result['cart_total'] - result['discount_amount'],
+            }
+            for coupon, result in CouponEngine.best_coupons(request.user, lines, limit)
+        ]
+
+        return Response({
+            'success': True,
+            'data': BestCouponSerializer(options, many=True).data
+        })
+
     @extend_schema(tags=['Coupons'])
     @action(detail=True, methods=['post'])
     def activate(self, request, pk=None):
@@ -138,6 +192,36 @@ class CouponViewSet(viewsets.ModelViewSet):
             'data': CouponDetailSerializer(coupon).data
         })
 
+    @extend_schema(request=CouponGenerateSerializer, tags=['Coupons'])
+    @action(detail=True, methods=['post'], url_path='generate-codes')
+    def generate_codes(self, request, pk=None):
+        """Generate single-use codes cloned from this coupon."""
+        template = self.get_object()
+        serializer = CouponGenerateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        result = CouponCodeGenerator.generate(template, **serializer.validated_data)
+
+        return Response({
+            'success': True,
+            'data': result
+        }, status=status.HTTP_201_CREATED)
+
+    @extend_schema(
+        parameters=[OpenApiParameter('batch', str, required=True, description='Batch id from generate-codes')],
+        tags=['Coupons']
+    )
+    @action(detail=False, methods=['get'], url_path='generated-codes')
+    def generated_codes(self, request):
+        """Download the codes of a generated batch as CSV."""
+        batch = request.query_params.get('batch')
+        if not batch or not Coupon.objects.filter(batch=batch).exists():
+            raise NotFoundError('Coupon batch not found.')
+
+        response = StreamingHttpResponse(CouponCodeGenerator.iter_csv(batch), content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="coupons-{batch}.csv"'
+        return response
+
     @extend_schema(tags=['Coupons'])
     @action(detail=True, methods=['get'])
     def usage(self, request, pk=None):
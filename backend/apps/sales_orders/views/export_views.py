@@ -0,0 +1,64 @@
+"""
+Sales order export views.
+"""
+import tempfile
+
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils import timezone
+from rest_framework.views import APIView
+from rest_framework.permissions import IsAuthenticated
+from drf_spectacular.utils import extend_schema
+
+from apps.sales_orders.serializers import SalesOrderExportSerializer
+from apps.sales_orders.services import OrderExportService
+from core.permissions import IsVendorOrAdmin
+
+
+class SalesOrderExportView(APIView):
+    """
+    Stream sales order lines with HSN and tax fields for accounting.
+
+    Vendors are always restricted to their own lines; admins may filter
+    by any vendor or export everything.
+    """
+    permission_classes = [IsAuthenticated, IsVendorOrAdmin]
+
+    @extend_schema(parameters=[SalesOrderExportSerializer], tags=['Sales Orders'])
+    def get(self, request):
+        """Export sales order lines as CSV or XLSX."""
+        serializer = SalesOrderExportSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        vendor_id = data.get('vendor')
+        if request.user.role == 'vendor':
+            vendor_id = request.user.vendor.id
+
+        queryset = OrderExportService.get_queryset(
+            date_from=data.get('date_from'),
+            date_to=data.get('date_to'),
+            vendor_id=vendor_id,
+            statuses=data.get('status'),
+        )
+
+        filename = f"sales-orders-{timezone.now().strftime('%Y%m%d%H%M%S')}"
+
+        if data['file_format'] == 'xlsx':
+            # XLSX is a zip container and cannot be emitted incrementally,
+            # so spool it to a temp file and stream that back.
+            output = tempfile.TemporaryFile()
+            OrderExportService.write_xlsx(queryset, output)
+            output.seek(0)
+            return FileResponse(
+                output,
+                as_attachment=True,
+                filename=f"{filename}.xlsx",
+                content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+            )
+
+        response = StreamingHttpResponse(
+            OrderExportService.iter_csv(queryset),
+            content_type='text/csv',
+        )
+        response['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
+        return response
@@ -10,6 +10,7 @@ from rest_framework.filters import SearchFilter, OrderingFilter
 from drf_spectacular.utils import extend_schema
 from django.utils import timezone
 
+from apps.payments.services import RefundService
 from apps.sales_orders.models import ReturnRequest, ReturnItem, ReturnStatusLog
 from apps.sales_orders.serializers import (
     ReturnRequestSerializer,
@@ -19,6 +20,7 @@ from apps.sales_orders.serializers import (
     ReturnStatusLogSerializer,
 )
 from core.permissions import IsAdmin, IsVendorOrAdmin
+from core.utils.stats import StatsBuilder
 
 
 def log_return_status(return_request, old_status, new_status, user, notes=None):
@@ -317,6 +319,9 @@ class ReturnRequestViewSet(viewsets.ModelViewSet):
         return_request.save(update_fields=['status', 'refund_amount', 'refund_method', 'updated_at'])
         log_return_status(return_request, old_status, 'refund_initiated', request.user)
 
+        # Refunds to the original payment go through the refund queue
+        RefundService.queue_return_refund(return_request, request.user)
+
         return Response({
             'success': True,
             'data': ReturnRequestDetailSerializer(return_request).data
@@ -326,16 +331,16 @@ class ReturnRequestViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def stats(self, request):
         """Get return statistics."""
-        queryset = self.get_queryset()
-
-        stats = {
-            'total': queryset.count(),
-            'requested': queryset.filter(status='requested').count(),
-            'approved': queryset.filter(status='approved').count(),
-            'in_progress': queryset.filter(status__in=['pickup_scheduled', 'pickup_completed', 'in_transit', 'received', 'inspecting']).count(),
-            'completed': queryset.filter(status__in=['refund_completed', 'replacement_shipped', 'completed']).count(),
-            'rejected': queryset.filter(status='rejected').count(),
-        }
+        stats = (
+            StatsBuilder(self.get_queryset())
+            .count('total')
+            .count('requested', status='requested')
+            .count('approved', status='approved')
+            .count('in_progress', status__in=['pickup_scheduled', 'pickup_completed', 'in_transit', 'received', 'inspecting'])
+            .count('completed', status__in=['refund_completed', 'replacement_shipped', 'completed'])
+            .count('rejected', status='rejected')
+            .build(name='returns', user=request.user)
+        )
 
         return Response({
             'success': True,
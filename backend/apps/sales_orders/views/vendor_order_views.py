@@ -19,6 +19,7 @@ from apps.sales_orders.serializers import (
 )
 from core.permissions import IsAdmin, IsVendorOrAdmin
 from core.utils.constants import SOStatus
+from core.utils.stats import StatsBuilder
 
 
 def log_vendor_order_status(vendor_order, old_status, new_status, user, notes=None):
@@ -188,16 +189,16 @@ class VendorOrderViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def stats(self, request):
         """Get vendor order statistics."""
-        queryset = self.get_queryset()
-
-        stats = {
-            'total': queryset.count(),
-            'pending': queryset.filter(status=SOStatus.PENDING).count(),
-            'processing': queryset.filter(status=SOStatus.PROCESSING).count(),
-            'shipped': queryset.filter(status=SOStatus.SHIPPED).count(),
-            'delivered': queryset.filter(status=SOStatus.DELIVERED).count(),
-            'unsettled': queryset.filter(is_settled=False).count(),
-        }
+        stats = (
+            StatsBuilder(self.get_queryset())
+            .count('total')
+            .count('pending', status=SOStatus.PENDING)
+            .count('processing', status=SOStatus.PROCESSING)
+            .count('shipped', status=SOStatus.OUT_FOR_DELIVERY)
+            .count('delivered', status=SOStatus.DELIVERED)
+            .count('unsettled', is_settled=False)
+            .build(name='vendor_orders', user=request.user)
+        )
 
         return Response({
             'success': True,
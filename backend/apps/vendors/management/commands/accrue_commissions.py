@@ -0,0 +1,42 @@
+"""
+Management command to accrue commission records for delivered vendor orders.
+
+Picks up where the previous run stopped; intended to run from cron.
+
+Usage:
+    python manage.py accrue_commissions
+    python manage.py accrue_commissions --chunk-size 5000
+    python manage.py accrue_commissions --reset
+"""
+from django.core.management.base import BaseCommand
+
+from apps.vendors.services import CommissionService
+from core.models import JobWatermark
+
+
+class Command(BaseCommand):
+    help = 'Create commission records for vendor orders delivered since the last run'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=CommissionService.CHUNK_SIZE,
+            help='Orders accrued per transaction',
+        )
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Rescan all delivered orders (orders already accrued are skipped)',
+        )
+
+    def handle(self, *args, **options):
+        if options['reset']:
+            JobWatermark.objects.filter(name=CommissionService.WATERMARK).delete()
+
+        result = CommissionService.accrue(chunk_size=options['chunk_size'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Accrued {result['created']} commission records: "
+            f"{result['commission_amount']} commission, {result['tax_amount']} GST."
+        ))
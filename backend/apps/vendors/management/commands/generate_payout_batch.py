@@ -0,0 +1,53 @@
+"""
+Management command to pay all approved settlements through a bank upload file.
+
+Usage:
+    python manage.py generate_payout_batch
+    python manage.py generate_payout_batch --method imps --chunk-size 1000
+    python manage.py generate_payout_batch --rewrite PB-20260119-000001
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.vendors.models import PayoutBatch
+from apps.vendors.services import PayoutService
+
+
+class Command(BaseCommand):
+    help = 'Create payouts for approved settlements and write the NEFT/IMPS bulk-upload file'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--method',
+            choices=[choice for choice, _ in PayoutBatch.PAYMENT_METHOD_CHOICES],
+            default='neft',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=PayoutService.CHUNK_SIZE,
+            help='Settlements handled per transaction',
+        )
+        parser.add_argument(
+            '--rewrite',
+            metavar='BATCH_NUMBER',
+            help='Rewrite the upload file of an existing batch from its payouts',
+        )
+
+    def handle(self, *args, **options):
+        if options['rewrite']:
+            batch = PayoutBatch.objects.filter(batch_number=options['rewrite']).first()
+            if batch is None:
+                raise CommandError(f"Payout batch {options['rewrite']} not found")
+            path = PayoutService.write_upload_file(batch)
+            self.stdout.write(self.style.SUCCESS(f"Batch {batch.batch_number} written to {path}"))
+            return
+
+        batch = PayoutService.create_batch(
+            payment_method=options['method'],
+            chunk_size=options['chunk_size'],
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Batch {batch.batch_number}: {batch.payouts_count} payouts totalling {batch.total_amount} "
+            f"({batch.skipped_count} skipped without bank details) written to {batch.file_path}"
+        ))
@@ -0,0 +1,55 @@
+"""
+Management command to generate settlements for all vendors for a period.
+
+Running it again for the same period resumes an interrupted run from its
+last committed checkpoint.
+
+Usage:
+    python manage.py generate_settlements --period-start 2024-01-01 --period-end 2024-01-07
+    python manage.py generate_settlements --period-start 2024-01-01 --period-end 2024-01-31 --frequency monthly
+"""
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.vendors.models import VendorSettlement
+from apps.vendors.services import SettlementService
+from core.exceptions import ConflictError
+
+
+class Command(BaseCommand):
+    help = 'Generate draft settlements for every vendor with unsettled delivered orders'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--period-start', type=date.fromisoformat, required=True, help='YYYY-MM-DD')
+        parser.add_argument('--period-end', type=date.fromisoformat, required=True, help='YYYY-MM-DD')
+        parser.add_argument(
+            '--frequency',
+            choices=[choice for choice, _ in VendorSettlement.FREQUENCY_CHOICES],
+            default='weekly',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=SettlementService.CHUNK_SIZE,
+            help='Vendors settled per transaction',
+        )
+
+    def handle(self, *args, **options):
+        if options['period_start'] > options['period_end']:
+            raise CommandError('--period-start must not be after --period-end')
+
+        try:
+            run = SettlementService.generate_batch(
+                period_start=options['period_start'],
+                period_end=options['period_end'],
+                frequency=options['frequency'],
+                chunk_size=options['chunk_size'],
+            )
+        except ConflictError as exc:
+            raise CommandError(str(exc.detail))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Run {run.id}: created {run.settlements_created} settlements "
+            f"covering {run.orders_linked} orders."
+        ))
@@ -0,0 +1,34 @@
+"""
+Management command to import a bank payout response file.
+
+Usage:
+    python manage.py import_payout_response /path/to/response.csv
+    python manage.py import_payout_response /path/to/response.csv --chunk-size 2000
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.vendors.services import PayoutService
+
+
+class Command(BaseCommand):
+    help = 'Apply a bank response file to processing payouts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Response CSV (CUST_REF, STATUS, UTR, TXN_DATE, REASON)')
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=PayoutService.CHUNK_SIZE,
+            help='Response lines applied per transaction',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            result = PayoutService.import_response(options['path'], chunk_size=options['chunk_size'])
+        except FileNotFoundError:
+            raise CommandError(f"File not found: {options['path']}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{result['completed']} payouts completed, {result['failed']} failed, "
+            f"{result['ignored']} lines ignored."
+        ))
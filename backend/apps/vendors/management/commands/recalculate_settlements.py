@@ -0,0 +1,29 @@
+"""
+Management command to recalculate totals of all open settlements.
+
+Usage:
+    python manage.py recalculate_settlements
+    python manage.py recalculate_settlements --chunk-size 500
+"""
+from django.core.management.base import BaseCommand
+
+from apps.vendors.services import SettlementService
+
+
+class Command(BaseCommand):
+    help = 'Recalculate order totals of draft and pending settlements'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=SettlementService.CHUNK_SIZE,
+            help='Settlements recalculated per chunk',
+        )
+
+    def handle(self, *args, **options):
+        result = SettlementService.recalculate_open(chunk_size=options['chunk_size'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Recalculated {result['checked']} open settlements, {result['updated']} changed."
+        ))
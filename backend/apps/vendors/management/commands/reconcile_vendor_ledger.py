@@ -0,0 +1,47 @@
+"""
+Management command to recompute vendor ledger running balances.
+
+Rewrites balance_after on entries that disagree with the running total of
+the ledger and resets each vendor's current_balance to match.
+
+Usage:
+    python manage.py reconcile_vendor_ledger
+    python manage.py reconcile_vendor_ledger --vendor 12 --vendor 15
+    python manage.py reconcile_vendor_ledger --dry-run
+"""
+from django.core.management.base import BaseCommand
+
+from apps.vendors.services import LedgerService
+
+
+class Command(BaseCommand):
+    help = 'Recompute running balances of vendor ledgers'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--vendor',
+            type=int,
+            action='append',
+            dest='vendor_ids',
+            help='Vendor id to reconcile (repeatable, default: all vendors)',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=LedgerService.CHUNK_SIZE,
+            help='Entries rewritten per bulk update',
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Only report differences')
+
+    def handle(self, *args, **options):
+        result = LedgerService.reconcile(
+            vendor_ids=options['vendor_ids'],
+            chunk_size=options['chunk_size'],
+            dry_run=options['dry_run'],
+        )
+
+        verb = 'would be fixed' if options['dry_run'] else 'fixed'
+        self.stdout.write(self.style.SUCCESS(
+            f"Checked {result['checked']} ledger entries: {result['fixed']} {verb}, "
+            f"{result['vendors_fixed']} vendor balances {verb}."
+        ))
@@ -0,0 +1,36 @@
+"""
+Management command to update vendor daily metrics and vendor counters.
+
+Only days touched since the previous run are recomputed; intended to run
+from cron every few minutes.
+
+Usage:
+    python manage.py rollup_vendor_metrics
+    python manage.py rollup_vendor_metrics --rebuild
+"""
+from django.core.management.base import BaseCommand
+
+from apps.vendors.services import VendorMetricsService
+
+
+class Command(BaseCommand):
+    help = 'Roll up vendor order metrics per day and refresh vendor counters'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=VendorMetricsService.CHUNK_SIZE,
+            help='Vendors recomputed per transaction',
+        )
+        parser.add_argument('--rebuild', action='store_true', help='Recompute all days from scratch')
+
+    def handle(self, *args, **options):
+        result = VendorMetricsService.rollup(
+            chunk_size=options['chunk_size'],
+            rebuild=options['rebuild'],
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Recomputed {result['days']} vendor-days across {result['vendors']} vendors."
+        ))
@@ -1,8 +1,10 @@
 from .vendor import Vendor
 from .supplier import Supplier
-from .settlement import VendorLedger, VendorSettlement, VendorPayout, CommissionRecord
+from .metrics import VendorDailyMetrics
+from .settlement import VendorLedger, VendorSettlement, SettlementRun, PayoutBatch, VendorPayout, CommissionRecord
 
 __all__ = [
-    'Vendor', 'Supplier',
-    'VendorLedger', 'VendorSettlement', 'VendorPayout', 'CommissionRecord',
+    'Vendor', 'Supplier', 'VendorDailyMetrics',
+    'VendorLedger', 'VendorSettlement', 'SettlementRun', 'PayoutBatch', 'VendorPayout',
+    'CommissionRecord',
 ]
@@ -0,0 +1,56 @@
+"""
+Vendor performance rollups.
+"""
+from django.db import models
+
+
+class VendorDailyMetrics(models.Model):
+    """
+    Per-vendor, per-day order metrics, maintained by VendorMetricsService.
+
+    Orders, GMV, items and cancellations are counted on the day the order
+    was placed, deliveries on the day they were delivered and returns on the
+    day they were requested. Delivery time is kept as a total so days can be
+    summed into longer periods before averaging.
+    """
+    vendor = models.ForeignKey(
+        'vendors.Vendor',
+        on_delete=models.CASCADE,
+        related_name='daily_metrics'
+    )
+    date = models.DateField()
+
+    orders_count = models.PositiveIntegerField(default=0)
+    gmv = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        help_text='Value of orders placed, excluding cancelled orders'
+    )
+    items_count = models.PositiveIntegerField(default=0)
+    cancelled_count = models.PositiveIntegerField(default=0)
+    returns_count = models.PositiveIntegerField(default=0)
+    delivered_count = models.PositiveIntegerField(default=0)
+    delivery_seconds = models.PositiveBigIntegerField(
+        default=0,
+        help_text='Total order-to-delivery time of orders delivered this day'
+    )
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'vendor daily metrics'
+        verbose_name_plural = 'vendor daily metrics'
+        ordering = ['-date']
+        constraints = [
+            models.UniqueConstraint(fields=['vendor', 'date'], name='uniq_vendor_daily_metrics'),
+        ]
+
+    def __str__(self):
+        return f"{self.vendor_id} {self.date}: {self.orders_count} orders"
+
+    @property
+    def avg_delivery_hours(self):
+        if not self.delivered_count:
+            return None
+        return round(self.delivery_seconds / self.delivered_count / 3600, 2)
@@ -49,6 +49,7 @@ class VendorLedger(BaseModel):
         verbose_name_plural = 'vendor ledger entries'
         ordering = ['-created_at']
         indexes = [
+            models.Index(fields=['vendor', 'id']),
             models.Index(fields=['vendor', 'created_at']),
             models.Index(fields=['vendor', 'entry_type']),
             models.Index(fields=['reference_type', 'reference_id']),
@@ -215,23 +216,61 @@ class VendorSettlement(BaseModel):
     def __str__(self):
         return f"{self.settlement_number} - {self.vendor.store_name}"
 
-    def calculate_totals(self):
-        """Calculate settlement totals from vendor orders."""
-        from apps.sales_orders.models import VendorOrder
+    OPEN_STATUSES = ('draft', 'pending')
+
+    @staticmethod
+    def aggregate_totals(settlement_ids) -> dict:
+        """
+        Order and item totals for many settlements in two grouped queries.
+
+        Order amounts are summed on VendorOrder and items are counted
+        separately, so joining items never multiplies order amounts.
+
+        Returns:
+            Dict of settlement id -> dict with orders_count, items_count,
+            gross_amount and commission_amount
+        """
+        from apps.sales_orders.models import VendorOrder, VendorOrderItem
 
         orders = VendorOrder.objects.filter(
-            vendor=self.vendor,
-            settlement=self,
+            settlement_id__in=settlement_ids,
+            vendor_id=models.F('settlement__vendor_id'),
             status='delivered'
         )
-
-        self.orders_count = orders.count()
-        self.items_count = sum(o.items.count() for o in orders)
-        self.gross_amount = sum(o.total_amount for o in orders)
-        self.commission_amount = sum(o.commission_amount for o in orders)
+        totals = {
+            row['settlement_id']: {
+                'orders_count': row['orders_count'],
+                'items_count': 0,
+                'gross_amount': row['gross_amount'] or 0,
+                'commission_amount': row['commission_amount'] or 0,
+            }
+            for row in orders.values('settlement_id').annotate(
+                orders_count=models.Count('id'),
+                gross_amount=models.Sum('total_amount'),
+                commission_amount=models.Sum('commission_amount'),
+            )
+        }
+        items = VendorOrderItem.objects.filter(
+            vendor_order__settlement_id__in=settlement_ids,
+            vendor_order__vendor_id=models.F('vendor_order__settlement__vendor_id'),
+            vendor_order__status='delivered'
+        ).values('vendor_order__settlement_id').annotate(count=models.Count('id'))
+        for row in items:
+            totals[row['vendor_order__settlement_id']]['items_count'] = row['count']
+        return totals
+
+    def apply_totals(self, totals: dict = None):
+        """Set order totals (from aggregate_totals) and recompute net payable."""
+        from core.utils.pricing import HUNDRED, ZERO, quantize
+
+        totals = totals or {}
+        self.orders_count = totals.get('orders_count', 0)
+        self.items_count = totals.get('items_count', 0)
+        self.gross_amount = totals.get('gross_amount', ZERO)
+        self.commission_amount = totals.get('commission_amount', ZERO)
 
         if self.gross_amount > 0:
-            self.commission_rate = (self.commission_amount / self.gross_amount) * 100
+            self.commission_rate = quantize(self.commission_amount * HUNDRED / self.gross_amount)
 
         self.net_payable = (
             self.gross_amount
@@ -244,13 +283,103 @@ class VendorSettlement(BaseModel):
             - self.tds_amount
         )
 
+    def calculate_totals(self):
+        """Calculate settlement totals from vendor orders."""
+        self.apply_totals(VendorSettlement.aggregate_totals([self.pk]).get(self.pk))
         self.save()
 
     def generate_settlement_number(self):
         """Generate unique settlement number."""
-        import uuid
-        prefix = self.vendor.store_slug[:3].upper() if self.vendor.store_slug else 'STL'
-        return f"{prefix}-{self.period_end.strftime('%Y%m%d')}-{uuid.uuid4().hex[:6].upper()}"
+        from core.utils.sequences import SequenceService
+        return SequenceService.next_number('SET')
+
+
+class SettlementRun(BaseModel):
+    """
+    A batch settlement run for one period across all vendors.
+
+    `last_vendor_id` is the checkpoint: vendors are settled in id order and
+    the checkpoint is committed with each chunk, so an interrupted run
+    resumes after the last vendor it finished.
+    """
+    STATUS_CHOICES = [
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+
+    period_start = models.DateField()
+    period_end = models.DateField()
+    frequency = models.CharField(
+        max_length=20,
+        choices=VendorSettlement.FREQUENCY_CHOICES,
+        default='weekly'
+    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='running')
+
+    last_vendor_id = models.PositiveIntegerField(default=0)
+    settlements_created = models.PositiveIntegerField(default=0)
+    orders_linked = models.PositiveIntegerField(default=0)
+
+    started_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='settlement_runs'
+    )
+    completed_at = models.DateTimeField(null=True, blank=True)
+    error = models.TextField(blank=True, null=True)
+
+    class Meta:
+        verbose_name = 'settlement run'
+        verbose_name_plural = 'settlement runs'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['period_start', 'period_end', 'status']),
+        ]
+
+    def __str__(self):
+        return f"Settlement run {self.period_start} - {self.period_end} ({self.status})"
+
+
+class PayoutBatch(BaseModel):
+    """
+    A bank bulk-upload file paying many approved settlements at once.
+
+    The file is written when the batch is created; the bank's response file
+    is imported later and settles or fails each payout in the batch.
+    """
+    STATUS_CHOICES = [
+        ('generated', 'File Generated'),
+        ('completed', 'Response Imported'),
+    ]
+
+    PAYMENT_METHOD_CHOICES = [
+        ('neft', 'NEFT'),
+        ('imps', 'IMPS'),
+    ]
+
+    batch_number = models.CharField(max_length=50, unique=True)
+    payment_method = models.CharField(max_length=10, choices=PAYMENT_METHOD_CHOICES, default='neft')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='generated')
+
+    file_path = models.CharField(max_length=500)
+    payouts_count = models.PositiveIntegerField(default=0)
+    total_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    skipped_count = models.PositiveIntegerField(default=0)
+
+    completed_count = models.PositiveIntegerField(default=0)
+    failed_count = models.PositiveIntegerField(default=0)
+    response_imported_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'payout batch'
+        verbose_name_plural = 'payout batches'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.batch_number} - {self.payouts_count} payouts - {self.total_amount}"
 
 
 class VendorPayout(BaseModel):
@@ -284,6 +413,13 @@ class VendorPayout(BaseModel):
         on_delete=models.CASCADE,
         related_name='payouts'
     )
+    batch = models.ForeignKey(
+        PayoutBatch,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='payouts'
+    )
 
     payout_number = models.CharField(max_length=50, unique=True)
     amount = models.DecimalField(max_digits=12, decimal_places=2)
@@ -98,6 +98,12 @@ class Vendor(BaseModel):
         decimal_places=2,
         default=0
     )
+    # Balance after the latest ledger entry, maintained by LedgerService
+    current_balance = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=0
+    )
     
     class Meta:
         verbose_name = 'vendor'
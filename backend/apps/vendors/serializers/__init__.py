@@ -6,6 +6,10 @@ from .settlement import (
     VendorPayoutListSerializer,
     VendorLedgerSerializer,
     CommissionRecordSerializer,
+    SettlementBatchSerializer,
+    SettlementRunSerializer,
+    PayoutBatchSerializer,
+    PayoutBatchCreateSerializer,
 )
 
 __all__ = [
@@ -16,4 +20,8 @@ __all__ = [
     'VendorPayoutListSerializer',
     'VendorLedgerSerializer',
     'CommissionRecordSerializer',
+    'SettlementBatchSerializer',
+    'SettlementRunSerializer',
+    'PayoutBatchSerializer',
+    'PayoutBatchCreateSerializer',
 ]
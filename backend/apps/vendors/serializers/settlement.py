@@ -2,7 +2,7 @@
 Vendor Settlement serializers.
 """
 from rest_framework import serializers
-from apps.vendors.models import VendorSettlement, VendorPayout, VendorLedger, CommissionRecord
+from apps.vendors.models import VendorSettlement, VendorPayout, VendorLedger, CommissionRecord, SettlementRun, PayoutBatch
 
 
 class VendorLedgerSerializer(serializers.ModelSerializer):
@@ -38,6 +38,17 @@ class VendorSettlementSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'settlement_number', 'created_at', 'updated_at']
 
 
+class VendorSettlementDetailSerializer(VendorSettlementSerializer):
+    """Settlement serializer with approval and payout details."""
+    payouts = serializers.SerializerMethodField()
+
+    class Meta(VendorSettlementSerializer.Meta):
+        fields = VendorSettlementSerializer.Meta.fields + ['approved_by', 'payouts']
+
+    def get_payouts(self, obj):
+        return VendorPayoutSerializer(obj.payouts.all(), many=True).data
+
+
 class VendorSettlementListSerializer(serializers.ModelSerializer):
     """Minimal settlement serializer for lists."""
     vendor_name = serializers.CharField(source='vendor.store_name', read_only=True)
@@ -71,6 +82,31 @@ class VendorPayoutSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'payout_number', 'created_at']
 
 
+class VendorPayoutListSerializer(serializers.ModelSerializer):
+    """Minimal payout serializer for lists."""
+    vendor_name = serializers.CharField(source='vendor.store_name', read_only=True)
+
+    class Meta:
+        model = VendorPayout
+        fields = [
+            'id', 'vendor', 'vendor_name', 'settlement', 'payout_number',
+            'amount', 'payment_method', 'status', 'created_at',
+        ]
+
+
+class PayoutBatchSerializer(serializers.ModelSerializer):
+    """Serializer for bank payout batches."""
+
+    class Meta:
+        model = PayoutBatch
+        fields = [
+            'id', 'batch_number', 'payment_method', 'status',
+            'payouts_count', 'total_amount', 'skipped_count',
+            'completed_count', 'failed_count', 'response_imported_at', 'created_at'
+        ]
+        read_only_fields = fields
+
+
 class CommissionRecordSerializer(serializers.ModelSerializer):
     """Commission record serializer."""
     vendor_name = serializers.CharField(source='vendor.store_name', read_only=True)
@@ -95,3 +131,33 @@ class PayoutInitiateSerializer(serializers.Serializer):
     """Serializer for initiating payout."""
     payment_method = serializers.ChoiceField(choices=VendorPayout.PAYMENT_METHOD_CHOICES)
     notes = serializers.CharField(required=False, allow_blank=True)
+
+
+class SettlementBatchSerializer(serializers.Serializer):
+    """Serializer for generating settlements for all vendors."""
+    period_start = serializers.DateField()
+    period_end = serializers.DateField()
+    frequency = serializers.ChoiceField(choices=VendorSettlement.FREQUENCY_CHOICES, default='weekly')
+
+    def validate(self, attrs):
+        if attrs['period_start'] > attrs['period_end']:
+            raise serializers.ValidationError({'period_end': 'Must be on or after period_start.'})
+        return attrs
+
+
+class SettlementRunSerializer(serializers.ModelSerializer):
+    """Serializer for batch settlement runs."""
+
+    class Meta:
+        model = SettlementRun
+        fields = [
+            'id', 'period_start', 'period_end', 'frequency', 'status',
+            'last_vendor_id', 'settlements_created', 'orders_linked',
+            'started_by', 'completed_at', 'error', 'created_at'
+        ]
+        read_only_fields = fields
+
+
+class PayoutBatchCreateSerializer(serializers.Serializer):
+    """Serializer for creating a bank payout batch."""
+    payment_method = serializers.ChoiceField(choices=PayoutBatch.PAYMENT_METHOD_CHOICES, default='neft')
@@ -0,0 +1,11 @@
+from .vendor_service import VendorService, SupplierService
+from .settlement_service import SettlementService
+from .ledger_service import LedgerService
+from .commission_service import CommissionService
+from .payout_service import PayoutService
+from .metrics_service import VendorMetricsService
+
+__all__ = [
+    'VendorService', 'SupplierService', 'SettlementService', 'LedgerService',
+    'CommissionService', 'PayoutService', 'VendorMetricsService',
+]
@@ -0,0 +1,237 @@
+"""
+Vendor ledger service.
+
+Entries are appended under a row lock on the vendor, so concurrent credits
+and debits for one vendor are serialized and each entry's balance_after is
+the previous balance plus its signed amount. The latest balance is kept on
+Vendor.current_balance, so reading it is a single-row lookup instead of a
+sum over the whole ledger.
+"""
+import logging
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, Sum, When, Window
+
+from apps.vendors.models import Vendor, VendorLedger
+from core.exceptions import ValidationException
+from core.utils.pricing import quantize
+
+logger = logging.getLogger(__name__)
+
+
+class LedgerService:
+    """Service class for vendor ledger entries and balances."""
+
+    CHUNK_SIZE = 1000
+    # Vendors locked and reconciled per transaction
+    VENDOR_CHUNK_SIZE = 100
+
+    @staticmethod
+    def signed_amount():
+        """Expression for an entry's amount, negative for debits."""
+        return Case(
+            When(entry_type='credit', then=F('amount')),
+            default=-F('amount'),
+            output_field=DecimalField(max_digits=12, decimal_places=2),
+        )
+
+    @staticmethod
+    def append(vendor, entry_type: str, amount, reference_type: str, reference_id: int = None,
+               reference_number: str = None, description: str = None, notes: str = None) -> VendorLedger:
+        """
+        Append a ledger entry and update the vendor's running balance.
+
+        Args:
+            vendor: Vendor (or vendor id) the entry belongs to
+            entry_type: 'credit' or 'debit'
+            amount: Positive amount of the entry
+            reference_type: What the entry is for (order, payout, ...)
+            reference_id: Id of the referenced object
+            reference_number: Human-readable reference (e.g. settlement number)
+            description: Entry description
+            notes: Internal notes
+
+        Returns:
+            The created VendorLedger entry
+
+        Raises:
+            ValidationException: If the entry type or amount is invalid
+        """
+        if entry_type not in dict(VendorLedger.ENTRY_TYPE_CHOICES):
+            raise ValidationException(f"Invalid ledger entry type: {entry_type}")
+        amount = Decimal(amount)
+        if amount <= 0:
+            raise ValidationException('Ledger amount must be positive.')
+
+        vendor_id = getattr(vendor, 'pk', vendor)
+        with transaction.atomic():
+            balance = Vendor.objects.select_for_update().values_list(
+                'current_balance', flat=True
+            ).get(pk=vendor_id)
+            balance += amount if entry_type == 'credit' else -amount
+
+            entry = VendorLedger.objects.create(
+                vendor_id=vendor_id,
+                entry_type=entry_type,
+                amount=amount,
+                balance_after=balance,
+                reference_type=reference_type,
+                reference_id=reference_id,
+                reference_number=reference_number,
+                description=description,
+                notes=notes,
+            )
+            Vendor.objects.filter(pk=vendor_id).update(current_balance=balance)
+
+        if isinstance(vendor, Vendor):
+            vendor.current_balance = balance
+        return entry
+
+    @staticmethod
+    def append_many(entries: list) -> list:
+        """
+        Append many ledger entries at once.
+
+        All affected vendors are locked in one query (in id order, so
+        concurrent batches cannot deadlock), balances are carried forward in
+        memory, and the entries and new vendor balances are written with one
+        bulk insert and one bulk update.
+
+        Args:
+            entries: Dicts with vendor_id, entry_type, amount, reference_type
+                and optional reference_id, reference_number, description, notes
+
+        Returns:
+            The created VendorLedger entries (without primary keys on MySQL)
+        """
+        if not entries:
+            return []
+
+        with transaction.atomic():
+            balances = dict(
+                Vendor.objects.select_for_update()
+                .filter(id__in={entry['vendor_id'] for entry in entries})
+                .order_by('id')
+                .values_list('id', 'current_balance')
+            )
+            ledger = []
+            for entry in entries:
+                amount = Decimal(entry['amount'])
+                if entry['entry_type'] not in dict(VendorLedger.ENTRY_TYPE_CHOICES) or amount <= 0:
+                    raise ValidationException(f"Invalid ledger entry for vendor {entry['vendor_id']}.")
+                balance = balances[entry['vendor_id']]
+                balance += amount if entry['entry_type'] == 'credit' else -amount
+                balances[entry['vendor_id']] = balance
+                ledger.append(VendorLedger(**{**entry, 'amount': amount, 'balance_after': balance}))
+
+            VendorLedger.objects.bulk_create(ledger, batch_size=LedgerService.CHUNK_SIZE)
+            Vendor.objects.bulk_update(
+                [Vendor(id=vendor_id, current_balance=balance) for vendor_id, balance in balances.items()],
+                ['current_balance'],
+                batch_size=LedgerService.CHUNK_SIZE,
+            )
+        return ledger
+
+    @staticmethod
+    def credit(vendor, amount, reference_type: str, **kwargs) -> VendorLedger:
+        return LedgerService.append(vendor, 'credit', amount, reference_type, **kwargs)
+
+    @staticmethod
+    def debit(vendor, amount, reference_type: str, **kwargs) -> VendorLedger:
+        return LedgerService.append(vendor, 'debit', amount, reference_type, **kwargs)
+
+    @staticmethod
+    def get_balance(vendor) -> Decimal:
+        """Current balance of a vendor (one indexed row, no ledger scan)."""
+        return Vendor.objects.values_list('current_balance', flat=True).get(pk=getattr(vendor, 'pk', vendor))
+
+    @staticmethod
+    def reconcile(vendor_ids=None, chunk_size: int = None, dry_run: bool = False) -> dict:
+        """
+        Recompute running balances from the ledger history.
+
+        Vendors are reconciled a chunk at a time, each chunk in one
+        transaction holding the same vendor row locks append() takes, so no
+        entry can be appended between reading the history and writing the
+        balances. A window function sums each vendor's signed amounts in
+        entry order in one streamed query per chunk. Only entries whose
+        stored balance_after differs are rewritten, and each vendor's
+        current_balance is set to its final running total.
+
+        Args:
+            vendor_ids: Vendors to reconcile (default: all vendors)
+            chunk_size: Entries rewritten per bulk update
+            dry_run: Only count the differences (without taking locks)
+
+        Returns:
+            Dict with entries checked and fixed, and vendors whose balance was fixed
+        """
+        chunk_size = chunk_size or LedgerService.CHUNK_SIZE
+        vendors = Vendor.objects.all()
+        if vendor_ids is not None:
+            vendors = vendors.filter(id__in=vendor_ids)
+
+        result = {'checked': 0, 'fixed': 0, 'vendors_fixed': 0}
+        last_id = 0
+        while True:
+            chunk = list(
+                vendors.filter(id__gt=last_id).order_by('id')
+                .values_list('id', flat=True)[:LedgerService.VENDOR_CHUNK_SIZE]
+            )
+            if not chunk:
+                break
+            last_id = chunk[-1]
+            with transaction.atomic():
+                LedgerService._reconcile_vendors(chunk, chunk_size, dry_run, result)
+
+        logger.info(
+            f"Ledger reconciled: {result['checked']} entries checked, {result['fixed']} fixed, "
+            f"{result['vendors_fixed']} vendor balances fixed"
+        )
+        return result
+
+    @staticmethod
+    def _reconcile_vendors(vendor_ids: list, chunk_size: int, dry_run: bool, result: dict):
+        """Reconcile the ledger of a chunk of vendors; caller holds a transaction."""
+        vendors = Vendor.objects.filter(id__in=vendor_ids).order_by('id')
+        if not dry_run:
+            # Same lock as append(), taken in id order so chunks cannot deadlock
+            vendors = vendors.select_for_update()
+        current = dict(vendors.values_list('id', 'current_balance'))
+
+        history = VendorLedger.objects.filter(vendor_id__in=vendor_ids).annotate(
+            running=Window(
+                expression=Sum(LedgerService.signed_amount()),
+                partition_by=[F('vendor_id')],
+                order_by=F('id').asc(),
+            )
+        ).order_by('vendor_id', 'id').values_list('id', 'vendor_id', 'balance_after', 'running')
+
+        balances = {}
+        stale = []
+        for entry_id, vendor_id, balance_after, running in history.iterator(chunk_size=chunk_size):
+            result['checked'] += 1
+            running = quantize(running)
+            balances[vendor_id] = running
+            if balance_after != running:
+                stale.append(VendorLedger(id=entry_id, balance_after=running))
+            if len(stale) >= chunk_size:
+                result['fixed'] += LedgerService._write_balances(stale, dry_run)
+                stale = []
+        result['fixed'] += LedgerService._write_balances(stale, dry_run)
+
+        # Final balance is the last running total (zero without entries)
+        changed = [
+            Vendor(id=vendor_id, current_balance=balances.get(vendor_id, Decimal('0')))
+            for vendor_id, balance in current.items()
+            if balance != balances.get(vendor_id, Decimal('0'))
+        ]
+        if changed and not dry_run:
+            Vendor.objects.bulk_update(changed, ['current_balance'])
+        result['vendors_fixed'] += len(changed)
+
+    @staticmethod
+    def _write_balances(entries: list, dry_run: bool) -> int:
+        if entries and not dry_run:
+            VendorLedger.objects.bulk_update(entries, ['balance_after'])
+        return len(entries)
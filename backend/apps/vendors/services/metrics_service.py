@@ -0,0 +1,244 @@
+"""
+Vendor metrics rollup.
+
+Maintains VendorDailyMetrics incrementally. Each run finds the
+(vendor, day) buckets touched since the JobWatermark (orders, returns and
+reviews updated since then), recomputes just those buckets with a few
+grouped queries and upserts them. Recomputing whole buckets keeps runs
+idempotent, so overlapping windows or re-runs never double count.
+
+The denormalized Vendor.total_orders, total_revenue, total_products and
+rating are refreshed for the touched vendors from the rollup rows.
+"""
+import logging
+from datetime import datetime, time, timedelta
+from django.db import connection, transaction
+from django.db.models import Avg, Count, DurationField, ExpressionWrapper, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from apps.vendors.models import Vendor, VendorDailyMetrics
+from core.models import JobWatermark
+from core.utils.constants import SOStatus
+
+logger = logging.getLogger(__name__)
+
+METRIC_FIELDS = [
+    'orders_count', 'gmv', 'items_count', 'cancelled_count',
+    'returns_count', 'delivered_count', 'delivery_seconds',
+]
+
+
+class VendorMetricsService:
+    """Service class for vendor performance rollups."""
+
+    WATERMARK = 'vendor_daily_metrics'
+    CHUNK_SIZE = 200
+    # Re-read a little before the watermark to catch rows committed late
+    LOOKBACK = timedelta(minutes=5)
+
+    @staticmethod
+    def rollup(chunk_size: int = None, rebuild: bool = False) -> dict:
+        """
+        Bring the daily metrics up to date.
+
+        Args:
+            chunk_size: Vendors recomputed per transaction
+            rebuild: Recompute every bucket from scratch
+
+        Returns:
+            Dict with the number of vendors and day buckets recomputed
+        """
+        chunk_size = chunk_size or VendorMetricsService.CHUNK_SIZE
+        watermark = JobWatermark.for_job(VendorMetricsService.WATERMARK)
+        started = timezone.now()
+        since = None if rebuild or watermark.position is None else watermark.position - VendorMetricsService.LOOKBACK
+
+        buckets = VendorMetricsService.dirty_buckets(since)
+        if since is None:
+            vendor_ids = sorted(set(buckets) | set(Vendor.objects.values_list('id', flat=True)))
+        else:
+            vendor_ids = sorted(set(buckets) | VendorMetricsService.dirty_vendors(since))
+
+        for start in range(0, len(vendor_ids), chunk_size):
+            chunk = vendor_ids[start:start + chunk_size]
+            with transaction.atomic():
+                if since is None:
+                    VendorDailyMetrics.objects.filter(vendor_id__in=chunk).delete()
+                VendorMetricsService._recompute({vendor_id: buckets.get(vendor_id, set()) for vendor_id in chunk})
+                VendorMetricsService.refresh_vendor_counters(chunk)
+
+        watermark.advance(started, 0)
+        days = sum(len(dates) for dates in buckets.values())
+        logger.info(f"Vendor metrics rolled up: {len(vendor_ids)} vendors, {days} days")
+        return {'vendors': len(vendor_ids), 'days': days}
+
+    @staticmethod
+    def dirty_buckets(since=None) -> dict:
+        """Vendor id -> set of days whose metrics may have changed since `since`."""
+        from apps.sales_orders.models import ReturnRequest, VendorOrder
+
+        orders = VendorOrder.objects.all()
+        returns = ReturnRequest.objects.all()
+        if since is not None:
+            orders = orders.filter(updated_at__gte=since)
+            returns = returns.filter(updated_at__gte=since)
+
+        buckets = {}
+        # order_by() clears Meta.ordering, which would otherwise join the DISTINCT columns
+        for vendor_id, placed, delivered in orders.order_by().values_list(
+            'vendor_id', TruncDate('created_at'), TruncDate('delivered_at')
+        ).distinct().iterator():
+            days = buckets.setdefault(vendor_id, set())
+            days.add(placed)
+            if delivered:
+                days.add(delivered)
+        for vendor_id, requested in returns.order_by().values_list(
+            'vendor_order__vendor_id', TruncDate('created_at')
+        ).distinct().iterator():
+            buckets.setdefault(vendor_id, set()).add(requested)
+        return buckets
+
+    @staticmethod
+    def dirty_vendors(since) -> set:
+        """Vendors whose products or approved reviews changed (rating, product count)."""
+        from apps.products.models import Product, ProductReview
+
+        return set(
+            Product.objects.filter(updated_at__gte=since).order_by().values_list('vendor_id', flat=True).distinct()
+        ) | set(
+            ProductReview.objects.filter(updated_at__gte=since).order_by()
+            .values_list('product__vendor_id', flat=True).distinct()
+        )
+
+    @staticmethod
+    def _recompute(buckets: dict):
+        """Recompute and upsert the given vendor -> days buckets."""
+        from apps.sales_orders.models import ReturnRequest, VendorOrder, VendorOrderItem
+
+        vendor_ids = [vendor_id for vendor_id, days in buckets.items() if days]
+        days = set().union(*buckets.values()) if buckets else set()
+        if not vendor_ids:
+            return
+
+        rows = {(vendor_id, day): dict.fromkeys(METRIC_FIELDS, 0)
+                for vendor_id in vendor_ids for day in buckets[vendor_id]}
+        # Plain datetime bounds keep the (vendor, created_at) index usable;
+        # rows on days outside the dirty buckets are read but not written
+        start = timezone.make_aware(datetime.combine(min(days), time.min))
+        end = timezone.make_aware(datetime.combine(max(days) + timedelta(days=1), time.min))
+
+        def collect(queryset, vendor_field, day_field, **aggregates):
+            grouped = queryset.annotate(day=TruncDate(day_field)).values(vendor_field, 'day').annotate(**aggregates)
+            for row in grouped.order_by():
+                key = (row[vendor_field], row['day'])
+                if key in rows:
+                    rows[key].update({name: row[name] or 0 for name in aggregates})
+
+        placed = VendorOrder.objects.filter(vendor_id__in=vendor_ids, created_at__gte=start, created_at__lt=end)
+        collect(
+            placed, 'vendor_id', 'created_at',
+            orders_count=Count('id'),
+            gmv=Sum('total_amount', filter=~Q(status=SOStatus.CANCELLED)),
+            cancelled_count=Count('id', filter=Q(status=SOStatus.CANCELLED)),
+        )
+        collect(
+            VendorOrderItem.objects.filter(
+                vendor_order__vendor_id__in=vendor_ids,
+                vendor_order__created_at__gte=start, vendor_order__created_at__lt=end,
+            ),
+            'vendor_order__vendor_id', 'vendor_order__created_at',
+            items_count=Sum('quantity_ordered'),
+        )
+        collect(
+            VendorOrder.objects.filter(vendor_id__in=vendor_ids, delivered_at__gte=start, delivered_at__lt=end),
+            'vendor_id', 'delivered_at',
+            delivered_count=Count('id'),
+            delivery_time=Sum(ExpressionWrapper(F('delivered_at') - F('created_at'), output_field=DurationField())),
+        )
+        collect(
+            ReturnRequest.objects.filter(
+                vendor_order__vendor_id__in=vendor_ids, created_at__gte=start, created_at__lt=end
+            ),
+            'vendor_order__vendor_id', 'created_at',
+            returns_count=Count('id'),
+        )
+
+        metrics = []
+        for (vendor_id, day), values in rows.items():
+            delivery_time = values.pop('delivery_time', 0)
+            values['delivery_seconds'] = int(delivery_time.total_seconds()) if delivery_time else 0
+            metrics.append(VendorDailyMetrics(vendor_id=vendor_id, date=day, **values))
+
+        VendorDailyMetrics.objects.bulk_create(
+            metrics,
+            batch_size=1000,
+            update_conflicts=True,
+            # MySQL upserts on any unique key and rejects an explicit target
+            unique_fields=(
+                ['vendor', 'date'] if connection.features.supports_update_conflicts_with_target else None
+            ),
+            update_fields=METRIC_FIELDS + ['updated_at'],
+        )
+
+    @staticmethod
+    def refresh_vendor_counters(vendor_ids: list):
+        """Set the denormalized Vendor counters from the rollup and reviews."""
+        from apps.products.models import Product, ProductReview
+
+        totals = {
+            row['vendor_id']: row
+            for row in VendorDailyMetrics.objects.filter(vendor_id__in=vendor_ids)
+            .values('vendor_id')
+            .annotate(orders=Sum('orders_count'), revenue=Sum('gmv'))
+        }
+        products = dict(
+            Product.objects.filter(vendor_id__in=vendor_ids, is_active=True)
+            .values('vendor_id').annotate(count=Count('id')).values_list('vendor_id', 'count')
+        )
+        ratings = dict(
+            ProductReview.objects.filter(product__vendor_id__in=vendor_ids, is_approved=True)
+            .values('product__vendor_id').annotate(avg=Avg('rating'))
+            .values_list('product__vendor_id', 'avg')
+        )
+
+        vendors = []
+        for vendor_id in vendor_ids:
+            row = totals.get(vendor_id, {})
+            rating = ratings.get(vendor_id)
+            vendors.append(Vendor(
+                id=vendor_id,
+                total_orders=row.get('orders') or 0,
+                total_revenue=row.get('revenue') or 0,
+                total_products=products.get(vendor_id, 0),
+                rating=round(rating, 2) if rating else 0,
+            ))
+        Vendor.objects.bulk_update(vendors, ['total_orders', 'total_revenue', 'total_products', 'rating'])
+
+    @staticmethod
+    def summary(vendor, days: int = 30) -> dict:
+        """
+        Totals and daily series for the last `days` days from the rollup rows.
+        """
+        since = timezone.localdate() - timedelta(days=days - 1)
+        rows = list(
+            VendorDailyMetrics.objects.filter(vendor=vendor, date__gte=since)
+            .order_by('date')
+            .values('date', *METRIC_FIELDS)
+        )
+        totals = {field: sum(row[field] for row in rows) for field in METRIC_FIELDS}
+        delivered = totals.pop('delivered_count')
+        delivery_seconds = totals.pop('delivery_seconds')
+        totals['delivered_count'] = delivered
+        totals['avg_delivery_hours'] = round(delivery_seconds / delivered / 3600, 2) if delivered else None
+        totals['daily'] = [
+            {
+                'date': row['date'],
+                'orders_count': row['orders_count'],
+                'gmv': row['gmv'],
+                'cancelled_count': row['cancelled_count'],
+                'returns_count': row['returns_count'],
+            }
+            for row in rows
+        ]
+        return totals
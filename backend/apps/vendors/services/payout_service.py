@@ -0,0 +1,318 @@
+"""
+Vendor payout batches.
+
+Approved settlements are paid through the bank's bulk-upload channel
+instead of one manual payout at a time. A batch reads approved settlements
+in primary-key chunks together with the vendors' bank details (one joined
+query per chunk) and bulk-creates the payouts with those details as the
+snapshot. The NEFT/IMPS upload file is then written from the committed
+payouts, so it always matches the database and can be regenerated if
+writing it fails.
+
+The bank's response file is imported the same way: streamed in chunks,
+each chunk updating payouts, settlements, orders and the vendor ledger in
+bulk.
+
+Upload file columns:
+    PYMT_MODE, BENE_ACC_NO, BENE_IFSC, BENE_NAME, AMOUNT, CUST_REF, PYMT_DATE, REMARKS
+
+Response file columns (CUST_REF is the payout number):
+    CUST_REF, STATUS, UTR, TXN_DATE, REASON
+"""
+import csv
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from apps.vendors.models import CommissionRecord, PayoutBatch, VendorPayout, VendorSettlement
+from apps.vendors.services.ledger_service import LedgerService
+from core.exceptions import ValidationException
+from core.utils.sequences import SequenceService
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_HEADER = ['PYMT_MODE', 'BENE_ACC_NO', 'BENE_IFSC', 'BENE_NAME', 'AMOUNT', 'CUST_REF', 'PYMT_DATE', 'REMARKS']
+
+# Bank response statuses; anything else leaves the payout processing
+RESPONSE_STATUSES = {
+    'SUCCESS': 'completed',
+    'PAID': 'completed',
+    'COMPLETED': 'completed',
+    'FAILED': 'failed',
+    'REJECTED': 'failed',
+    'RETURNED': 'failed',
+}
+
+RESPONSE_DATE_FORMATS = ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d', '%d-%m-%Y %H:%M:%S', '%d-%m-%Y', '%d/%m/%Y')
+
+
+class PayoutService:
+    """Service class for bank payout batches."""
+
+    CHUNK_SIZE = 500
+
+    @staticmethod
+    def files_dir() -> Path:
+        directory = getattr(settings, 'PAYOUT_FILES_DIR', None)
+        if not directory:
+            raise ImproperlyConfigured('PAYOUT_FILES_DIR must be set to write payout files.')
+        return Path(directory)
+
+    @staticmethod
+    def create_batch(payment_method: str = 'neft', user=None, chunk_size: int = None) -> PayoutBatch:
+        """
+        Create payouts for all approved settlements and write the upload file.
+
+        Settlements whose vendor has no bank account or IFSC are skipped and
+        stay approved. Paid settlements move to 'processing' until the bank
+        response is imported.
+
+        Args:
+            payment_method: 'neft' or 'imps'
+            user: Admin initiating the payouts
+            chunk_size: Settlements handled per transaction
+
+        Returns:
+            The PayoutBatch
+        """
+        if payment_method not in dict(PayoutBatch.PAYMENT_METHOD_CHOICES):
+            raise ValidationException(f"Unsupported batch payment method: {payment_method}")
+        chunk_size = chunk_size or PayoutService.CHUNK_SIZE
+
+        directory = PayoutService.files_dir()
+        directory.mkdir(parents=True, exist_ok=True)
+        batch_number = SequenceService.next_number('PB')
+        batch = PayoutBatch.objects.create(
+            batch_number=batch_number,
+            payment_method=payment_method,
+            file_path=str(directory / f'{batch_number}.csv'),
+            created_by=user,
+        )
+
+        settlements = VendorSettlement.objects.filter(status='approved', net_payable__gt=0)
+
+        last_id = 0
+        while True:
+            with transaction.atomic():
+                rows = list(
+                    settlements.filter(id__gt=last_id)
+                    .select_for_update()
+                    .order_by('id')
+                    .values(
+                        'id', 'vendor_id', 'settlement_number', 'net_payable',
+                        'vendor__bank_name', 'vendor__bank_account_number',
+                        'vendor__bank_ifsc', 'vendor__bank_account_holder', 'vendor__store_name',
+                    )[:chunk_size]
+                )
+                if not rows:
+                    break
+                last_id = rows[-1]['id']
+
+                payable = [row for row in rows if row['vendor__bank_account_number'] and row['vendor__bank_ifsc']]
+                batch.skipped_count += len(rows) - len(payable)
+                payouts = PayoutService._build_payouts(batch, payable, user)
+                VendorPayout.objects.bulk_create(payouts)
+                VendorSettlement.objects.filter(id__in=[row['id'] for row in payable]).update(
+                    status='processing', updated_at=timezone.now()
+                )
+
+                batch.payouts_count += len(payouts)
+                batch.total_amount += sum(payout.amount for payout in payouts)
+                batch.save(update_fields=['payouts_count', 'total_amount', 'skipped_count', 'updated_at'])
+
+        PayoutService.write_upload_file(batch)
+        logger.info(
+            f"Payout batch {batch.batch_number}: {batch.payouts_count} payouts, "
+            f"{batch.total_amount} total, {batch.skipped_count} skipped"
+        )
+        return batch
+
+    @staticmethod
+    def write_upload_file(batch: PayoutBatch) -> str:
+        """
+        Write (or rewrite) a batch's bank upload file from its payouts.
+
+        The payouts are streamed in id order and the file is written under a
+        temporary name and then renamed, so a half-written file never
+        replaces a complete one.
+
+        Returns:
+            Path of the upload file
+        """
+        directory = Path(batch.file_path).parent
+        directory.mkdir(parents=True, exist_ok=True)
+        mode = batch.payment_method.upper()
+        payment_date = timezone.localtime(batch.created_at).strftime('%d-%m-%Y')
+        partial = f'{batch.file_path}.part'
+
+        with open(partial, 'w', newline='') as upload:
+            writer = csv.writer(upload)
+            writer.writerow(UPLOAD_HEADER)
+            writer.writerows(
+                [mode, account, ifsc, holder, f'{amount:.2f}', payout_number, payment_date, notes]
+                for account, ifsc, holder, amount, payout_number, notes in batch.payouts.order_by('id').values_list(
+                    'bank_account_number', 'bank_ifsc', 'bank_account_holder', 'amount', 'payout_number', 'notes',
+                ).iterator(chunk_size=PayoutService.CHUNK_SIZE)
+            )
+            upload.flush()
+            os.fsync(upload.fileno())
+        os.replace(partial, batch.file_path)
+        return batch.file_path
+
+    @staticmethod
+    def _build_payouts(batch: PayoutBatch, rows: list, user=None) -> list:
+        """Payouts for settlement rows, with the joined bank details as the snapshot."""
+        now = timezone.now()
+        return [
+            VendorPayout(
+                vendor_id=row['vendor_id'],
+                settlement_id=row['id'],
+                batch=batch,
+                payout_number=SequenceService.next_number('PAY'),
+                amount=row['net_payable'],
+                payment_method=batch.payment_method,
+                bank_name=row['vendor__bank_name'],
+                bank_account_number=row['vendor__bank_account_number'],
+                bank_ifsc=row['vendor__bank_ifsc'],
+                bank_account_holder=row['vendor__bank_account_holder'] or row['vendor__store_name'],
+                status='processing',
+                initiated_by=user,
+                initiated_at=now,
+                notes=f"Settlement #{row['settlement_number']}",
+            )
+            for row in rows
+        ]
+
+    @staticmethod
+    def import_response(path, chunk_size: int = None) -> dict:
+        """
+        Apply a bank response file to processing payouts.
+
+        Completed payouts mark their settlement paid, its orders and
+        commission records settled, and credit the vendor ledger. Failed
+        payouts return their settlement to 'approved' so the next batch
+        picks it up again. Unknown or already-final payouts are ignored,
+        so importing the same file twice is harmless.
+
+        Args:
+            path: Path of the response CSV
+            chunk_size: Response lines applied per transaction
+
+        Returns:
+            Dict with completed, failed and ignored line counts
+        """
+        chunk_size = chunk_size or PayoutService.CHUNK_SIZE
+        result = {'completed': 0, 'failed': 0, 'ignored': 0}
+        batch_ids = set()
+
+        with open(path, newline='') as response:
+            chunk = []
+            for line in csv.DictReader(response):
+                chunk.append(line)
+                if len(chunk) >= chunk_size:
+                    PayoutService._apply_response_chunk(chunk, result, batch_ids)
+                    chunk = []
+            if chunk:
+                PayoutService._apply_response_chunk(chunk, result, batch_ids)
+
+        PayoutService._close_batches(batch_ids)
+        logger.info(f"Imported payout response {os.path.basename(str(path))}: {result}")
+        return result
+
+    @staticmethod
+    def _apply_response_chunk(lines: list, result: dict, batch_ids: set):
+        from apps.sales_orders.models import VendorOrder
+
+        now = timezone.now()
+        with transaction.atomic():
+            payouts = {
+                payout.payout_number: payout
+                for payout in VendorPayout.objects.select_for_update().filter(
+                    payout_number__in=[(line.get('CUST_REF') or '').strip() for line in lines],
+                    status='processing',
+                ).only('id', 'payout_number', 'vendor_id', 'settlement_id', 'batch_id', 'amount', 'notes')
+            }
+
+            changed = []
+            for line in lines:
+                payout = payouts.pop((line.get('CUST_REF') or '').strip(), None)
+                status = RESPONSE_STATUSES.get((line.get('STATUS') or '').strip().upper())
+                if payout is None or status is None:
+                    result['ignored'] += 1
+                    continue
+
+                payout.status = status
+                payout.bank_reference = (line.get('UTR') or '').strip() or None
+                payout.transaction_id = payout.bank_reference
+                payout.transaction_date = PayoutService._parse_date(line.get('TXN_DATE')) or now
+                if status == 'completed':
+                    payout.completed_at = now
+                else:
+                    payout.failure_reason = (line.get('REASON') or '').strip() or 'Rejected by bank'
+                changed.append(payout)
+                result[status] += 1
+                batch_ids.add(payout.batch_id)
+
+            VendorPayout.objects.bulk_update(changed, [
+                'status', 'bank_reference', 'transaction_id', 'transaction_date',
+                'completed_at', 'failure_reason',
+            ])
+
+            paid = [payout for payout in changed if payout.status == 'completed']
+            paid_ids = [payout.settlement_id for payout in paid]
+            failed_ids = [payout.settlement_id for payout in changed if payout.status == 'failed']
+
+            VendorSettlement.objects.filter(id__in=paid_ids).update(
+                status='paid', paid_at=now, net_paid=F('net_payable'), updated_at=now
+            )
+            VendorSettlement.objects.filter(id__in=failed_ids).update(status='approved', updated_at=now)
+            VendorOrder.objects.filter(settlement_id__in=paid_ids).update(is_settled=True)
+            CommissionRecord.objects.filter(settlement_id__in=paid_ids).update(is_settled=True)
+
+            LedgerService.append_many([
+                {
+                    'vendor_id': payout.vendor_id,
+                    'entry_type': 'credit',
+                    'amount': payout.amount,
+                    'reference_type': 'payout',
+                    'reference_id': payout.id,
+                    'reference_number': payout.payout_number,
+                    'description': payout.notes,
+                }
+                for payout in paid
+            ])
+
+    @staticmethod
+    def _close_batches(batch_ids: set):
+        """Refresh batch counters and complete batches with no payouts left processing."""
+        batch_ids.discard(None)
+        now = timezone.now()
+        for batch in PayoutBatch.objects.filter(id__in=batch_ids).annotate(
+            completed=Count('payouts', filter=Q(payouts__status='completed')),
+            failed=Count('payouts', filter=Q(payouts__status='failed')),
+            processing=Count('payouts', filter=Q(payouts__status='processing')),
+        ):
+            batch.completed_count = batch.completed
+            batch.failed_count = batch.failed
+            batch.response_imported_at = now
+            if not batch.processing:
+                batch.status = 'completed'
+            batch.save(update_fields=[
+                'completed_count', 'failed_count', 'response_imported_at', 'status', 'updated_at'
+            ])
+
+    @staticmethod
+    def _parse_date(value):
+        value = (value or '').strip()
+        for fmt in RESPONSE_DATE_FORMATS:
+            try:
+                return timezone.make_aware(datetime.strptime(value, fmt))
+            except ValueError:
+                continue
+        return None
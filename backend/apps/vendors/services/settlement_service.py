@@ -0,0 +1,257 @@
+"""
+Vendor settlement service.
+"""
+import logging
+from datetime import timedelta
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery, Sum
+from django.utils import timezone
+
+from apps.vendors.models import CommissionRecord, VendorSettlement, SettlementRun
+from core.exceptions import ConflictError
+from core.utils.constants import SOStatus
+from core.utils.pricing import HUNDRED, quantize
+from core.utils.sequences import SequenceService
+
+logger = logging.getLogger(__name__)
+
+
+class SettlementService:
+    """Service class for generating vendor settlements in bulk."""
+
+    CHUNK_SIZE = 200
+    # A running run not touched for this long belongs to a process that died
+    STALE_AFTER = timedelta(minutes=15)
+
+    @staticmethod
+    def unsettled_orders(period_start, period_end):
+        """Delivered vendor orders in the period not yet on any settlement."""
+        from apps.sales_orders.models import VendorOrder
+
+        return VendorOrder.objects.filter(
+            is_settled=False,
+            settlement__isnull=True,
+            status=SOStatus.DELIVERED,
+            delivered_at__date__gte=period_start,
+            delivered_at__date__lte=period_end,
+        )
+
+    @staticmethod
+    def start_or_resume_run(period_start, period_end, frequency='weekly', user=None) -> SettlementRun:
+        """
+        Return the unfinished run for the period marked running, or start a new one.
+
+        Raises:
+            ConflictError: If another process is still working on the run
+        """
+        with transaction.atomic():
+            run = SettlementRun.objects.select_for_update().filter(
+                period_start=period_start,
+                period_end=period_end,
+                status__in=['running', 'failed'],
+            ).order_by('-created_at').first()
+            if run is None:
+                return SettlementRun.objects.create(
+                    period_start=period_start,
+                    period_end=period_end,
+                    frequency=frequency,
+                    started_by=user,
+                )
+
+            # Every committed chunk touches updated_at, so a recent one means a live run
+            if run.status == 'running' and run.updated_at > timezone.now() - SettlementService.STALE_AFTER:
+                raise ConflictError(f"Settlement run {run.id} for this period is already in progress.")
+            logger.info(f"Resuming settlement run {run.id} after vendor {run.last_vendor_id}")
+            run.status = 'running'
+            run.error = None
+            run.save(update_fields=['status', 'error', 'updated_at'])
+            return run
+
+    @staticmethod
+    def generate_batch(period_start, period_end, frequency='weekly', user=None,
+                       chunk_size: int = None) -> SettlementRun:
+        """
+        Create draft settlements for every vendor with unsettled orders.
+
+        Vendors with unsettled orders are settled in id-ordered chunks, each
+        in its own transaction: lock the chunk's unsettled orders, total
+        them with one grouped query, bulk_create the settlements, link
+        exactly the totalled orders with a single correlated UPDATE and
+        advance the run checkpoint. If the run is interrupted, calling this
+        again resumes after the last committed chunk.
+
+        Args:
+            period_start: First delivery date in the period
+            period_end: Last delivery date in the period
+            frequency: Settlement frequency recorded on the settlements
+            user: Admin starting the run
+            chunk_size: Vendors settled per transaction
+
+        Returns:
+            The SettlementRun
+        """
+        chunk_size = chunk_size or SettlementService.CHUNK_SIZE
+        run = SettlementService.start_or_resume_run(period_start, period_end, frequency, user)
+
+        vendor_ids = list(
+            SettlementService.unsettled_orders(period_start, period_end)
+            .filter(vendor_id__gt=run.last_vendor_id)
+            .order_by('vendor_id')
+            .values_list('vendor_id', flat=True)
+            .distinct()
+        )
+
+        try:
+            for start in range(0, len(vendor_ids), chunk_size):
+                SettlementService._settle_chunk(run, vendor_ids[start:start + chunk_size])
+        except Exception as exc:
+            run.refresh_from_db()
+            run.status = 'failed'
+            run.error = str(exc)
+            run.save(update_fields=['status', 'error', 'updated_at'])
+            logger.exception(f"Settlement run {run.id} failed after vendor {run.last_vendor_id}")
+            raise
+
+        run.refresh_from_db()
+        run.status = 'completed'
+        run.completed_at = timezone.now()
+        run.save(update_fields=['status', 'completed_at', 'updated_at'])
+        logger.info(
+            f"Settlement run {run.id} completed: {run.settlements_created} settlements, "
+            f"{run.orders_linked} orders"
+        )
+        return run
+
+    @staticmethod
+    def recalculate_open(chunk_size: int = None) -> dict:
+        """
+        Recalculate totals of all open (draft or pending) settlements.
+
+        Settlements are walked in primary-key chunks; each chunk costs two
+        grouped aggregate queries and one bulk update.
+
+        Args:
+            chunk_size: Settlements recalculated per chunk
+
+        Returns:
+            Dict with checked and updated settlement counts
+        """
+        chunk_size = chunk_size or SettlementService.CHUNK_SIZE
+        fields = [
+            'orders_count', 'items_count', 'gross_amount', 'commission_amount',
+            'commission_rate', 'net_payable',
+        ]
+        settlements = VendorSettlement.objects.filter(status__in=VendorSettlement.OPEN_STATUSES)
+
+        checked = updated = 0
+        last_id = 0
+        while True:
+            chunk = list(settlements.filter(id__gt=last_id).order_by('id')[:chunk_size])
+            if not chunk:
+                break
+            last_id = chunk[-1].id
+            checked += len(chunk)
+
+            totals = VendorSettlement.aggregate_totals([settlement.id for settlement in chunk])
+            changed = []
+            for settlement in chunk:
+                before = [getattr(settlement, field) for field in fields]
+                settlement.apply_totals(totals.get(settlement.id))
+                if [getattr(settlement, field) for field in fields] != before:
+                    changed.append(settlement)
+            VendorSettlement.objects.bulk_update(changed, fields)
+            updated += len(changed)
+
+        logger.info(f"Recalculated {checked} open settlements, {updated} changed")
+        return {'checked': checked, 'updated': updated}
+
+    @staticmethod
+    def _settle_chunk(run: SettlementRun, vendor_ids: list):
+        """
+        Create and link the settlements for one chunk of vendors.
+
+        The totals and the linking UPDATE use the same locked order ids, so
+        an order delivered while the run is going is either counted and
+        linked, or left for the next run.
+        """
+        from apps.sales_orders.models import VendorOrder, VendorOrderItem
+
+        with transaction.atomic():
+            # Serializes chunk commits against anything else writing the run
+            SettlementRun.objects.select_for_update().get(pk=run.pk)
+            order_ids = list(
+                SettlementService.unsettled_orders(run.period_start, run.period_end)
+                .filter(vendor_id__in=vendor_ids)
+                .select_for_update()
+                .values_list('id', flat=True)
+            )
+            orders = VendorOrder.objects.filter(id__in=order_ids)
+            rows = (
+                orders.values('vendor_id')
+                .annotate(
+                    orders_count=Count('id'),
+                    gross=Sum('total_amount'),
+                    commission=Sum('commission_amount'),
+                    earning=Sum('vendor_earning'),
+                )
+                .order_by('vendor_id')
+            )
+            items = dict(
+                VendorOrderItem.objects.filter(vendor_order_id__in=order_ids)
+                .values('vendor_order__vendor_id')
+                .annotate(count=Count('id'))
+                .values_list('vendor_order__vendor_id', 'count')
+            )
+
+            settlements = []
+            for row in rows:
+                gross = row['gross'] or Decimal('0')
+                commission = row['commission'] or Decimal('0')
+                settlements.append(VendorSettlement(
+                    vendor_id=row['vendor_id'],
+                    settlement_number=SequenceService.next_number('SET'),
+                    period_start=run.period_start,
+                    period_end=run.period_end,
+                    frequency=run.frequency,
+                    orders_count=row['orders_count'],
+                    items_count=items.get(row['vendor_id'], 0),
+                    gross_amount=gross,
+                    commission_amount=commission,
+                    commission_rate=quantize(commission * HUNDRED / gross) if gross else Decimal('0'),
+                    net_payable=row['earning'] or Decimal('0'),
+                    status='draft',
+                ))
+            VendorSettlement.objects.bulk_create(settlements)
+
+            # bulk_create does not return primary keys on MySQL
+            numbers = [settlement.settlement_number for settlement in settlements]
+            settlement_ids = list(
+                VendorSettlement.objects.filter(settlement_number__in=numbers).values_list('id', flat=True)
+            )
+
+            linked = orders.update(
+                settlement_id=Subquery(
+                    VendorSettlement.objects.filter(
+                        id__in=settlement_ids, vendor_id=OuterRef('vendor_id')
+                    ).values('id')[:1]
+                )
+            )
+
+            # Commission records accrued before the settlement follow their orders
+            CommissionRecord.objects.filter(
+                settlement__isnull=True,
+                vendor_id__in=vendor_ids,
+                vendor_order__settlement_id__in=settlement_ids,
+            ).update(
+                settlement_id=Subquery(
+                    VendorOrder.objects.filter(pk=OuterRef('vendor_order_id')).values('settlement_id')[:1]
+                )
+            )
+
+            SettlementRun.objects.filter(pk=run.pk).update(
+                last_vendor_id=vendor_ids[-1],
+                settlements_created=F('settlements_created') + len(settlements),
+                orders_linked=F('orders_linked') + linked,
+                updated_at=timezone.now(),
+            )
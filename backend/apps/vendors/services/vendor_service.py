@@ -147,19 +147,22 @@ class VendorService:
         return vendor
     
     @staticmethod
-    def get_vendor_stats(vendor: Vendor) -> dict:
-        """Get vendor statistics."""
-        from apps.products.models import Product
-        from apps.sales_orders.models import SalesOrder
-        
-        total_products = Product.objects.filter(vendor=vendor, is_active=True).count()
-        total_orders = SalesOrder.objects.filter(vendor=vendor).count()
-        
+    def get_vendor_stats(vendor: Vendor, days: int = 30) -> dict:
+        """
+        Get vendor statistics.
+
+        Reads the denormalized counters and the last `days` daily rollup
+        rows (see VendorMetricsService) instead of scanning order tables.
+        """
+        from apps.vendors.services.metrics_service import VendorMetricsService
+
         return {
-            'total_products': total_products,
-            'total_orders': total_orders,
+            'total_products': vendor.total_products,
+            'total_orders': vendor.total_orders,
             'total_revenue': vendor.total_revenue,
             'rating': vendor.rating,
+            'period_days': days,
+            'period': VendorMetricsService.summary(vendor, days),
         }
 
 
@@ -10,7 +10,6 @@ from rest_framework.filters import SearchFilter, OrderingFilter
 from drf_spectacular.utils import extend_schema
 from django.utils import timezone
 from django.db.models import Sum
-import uuid
 
 from apps.vendors.models import VendorSettlement, VendorPayout, VendorLedger, CommissionRecord
 from apps.vendors.serializers import (
@@ -21,8 +20,15 @@ from apps.vendors.serializers import (
     VendorPayoutListSerializer,
     VendorLedgerSerializer,
     CommissionRecordSerializer,
+    SettlementBatchSerializer,
+    SettlementRunSerializer,
+    PayoutBatchSerializer,
+    PayoutBatchCreateSerializer,
 )
+from apps.vendors.services import LedgerService, PayoutService, SettlementService
 from core.permissions import IsAdmin, IsVendorOrAdmin
+from core.utils.sequences import SequenceService
+from core.utils.stats import StatsBuilder
 
 
 class VendorSettlementViewSet(viewsets.ModelViewSet):
@@ -34,6 +40,8 @@ class VendorSettlementViewSet(viewsets.ModelViewSet):
     filterset_fields = ['status', 'vendor']
 
     def get_permissions(self):
+        if self.action == 'generate_batch':
+            return [IsAuthenticated(), IsAdmin()]
         return [IsAuthenticated(), IsVendorOrAdmin()]
 
     def get_queryset(self):
@@ -117,7 +125,7 @@ class VendorSettlementViewSet(viewsets.ModelViewSet):
         # Create settlement
         settlement = VendorSettlement.objects.create(
             vendor=vendor,
-            settlement_number=f"SET-{uuid.uuid4().hex[:8].upper()}",
+            settlement_number=SequenceService.next_number('SET'),
             period_start=period_start,
             period_end=period_end,
             gross_amount=totals['gross'] or 0,
@@ -134,6 +142,27 @@ class VendorSettlementViewSet(viewsets.ModelViewSet):
             'data': VendorSettlementDetailSerializer(settlement).data
         }, status=status.HTTP_201_CREATED)
 
+    @extend_schema(tags=['Vendor Settlements'], request=SettlementBatchSerializer)
+    @action(detail=False, methods=['post'], url_path='generate-batch')
+    def generate_batch(self, request):
+        """
+        Generate settlements for every vendor with unsettled orders in a period.
+
+        Re-posting the same period resumes an interrupted run.
+        """
+        serializer = SettlementBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        run = SettlementService.generate_batch(
+            user=request.user,
+            **serializer.validated_data
+        )
+
+        return Response({
+            'success': True,
+            'data': SettlementRunSerializer(run).data
+        }, status=status.HTTP_201_CREATED)
+
     @extend_schema(tags=['Vendor Settlements'])
     @action(detail=True, methods=['post'])
     def approve(self, request, pk=None):
@@ -173,7 +202,7 @@ class VendorSettlementViewSet(viewsets.ModelViewSet):
         payout = VendorPayout.objects.create(
             vendor=settlement.vendor,
             settlement=settlement,
-            payout_number=f"PAY-{uuid.uuid4().hex[:8].upper()}",
+            payout_number=SequenceService.next_number('PAY'),
             amount=settlement.net_payable,
             payment_method=payment_method,
             status='processing'
@@ -191,16 +220,16 @@ class VendorSettlementViewSet(viewsets.ModelViewSet):
 
         # Mark orders as settled
         settlement.vendor_orders.update(is_settled=True)
+        settlement.commission_records.update(is_settled=True)
 
         # Create ledger entry
-        VendorLedger.objects.create(
-            vendor=settlement.vendor,
-            entry_type='credit',
-            amount=settlement.net_payable,
-            balance_after=0,  # Would need to calculate running balance
+        LedgerService.credit(
+            settlement.vendor,
+            settlement.net_payable,
+            reference_type='payout',
+            reference_id=payout.id,
+            reference_number=settlement.settlement_number,
             description=f"Settlement #{settlement.settlement_number}",
-            settlement=settlement,
-            payout=payout
         )
 
         return Response({
@@ -212,20 +241,18 @@ class VendorSettlementViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def stats(self, request):
         """Get settlement statistics."""
-        from django.db.models import Sum
-
-        queryset = self.get_queryset()
-
-        stats = {
-            'total': queryset.count(),
-            'draft': queryset.filter(status='draft').count(),
-            'approved': queryset.filter(status='approved').count(),
-            'paid': queryset.filter(status='paid').count(),
-            'total_gross': queryset.aggregate(total=Sum('gross_amount'))['total'] or 0,
-            'total_commission': queryset.aggregate(total=Sum('commission_amount'))['total'] or 0,
-            'total_paid': queryset.filter(status='paid').aggregate(total=Sum('net_payable'))['total'] or 0,
-            'pending_payment': queryset.filter(status='approved').aggregate(total=Sum('net_payable'))['total'] or 0,
-        }
+        stats = (
+            StatsBuilder(self.get_queryset())
+            .count('total')
+            .count('draft', status='draft')
+            .count('approved', status='approved')
+            .count('paid', status='paid')
+            .sum('total_gross', 'gross_amount')
+            .sum('total_commission', 'commission_amount')
+            .sum('total_paid', 'net_payable', status='paid')
+            .sum('pending_payment', 'net_payable', status='approved')
+            .build(name='settlements', user=request.user)
+        )
 
         return Response({
             'success': True,
@@ -242,6 +269,8 @@ class VendorPayoutViewSet(viewsets.ReadOnlyModelViewSet):
     filterset_fields = ['status', 'payment_method', 'vendor']
 
     def get_permissions(self):
+        if self.action == 'create_batch':
+            return [IsAuthenticated(), IsAdmin()]
         return [IsAuthenticated(), IsVendorOrAdmin()]
 
     def get_queryset(self):
@@ -266,6 +295,23 @@ class VendorPayoutViewSet(viewsets.ReadOnlyModelViewSet):
         """List vendor payouts."""
         return super().list(request, *args, **kwargs)
 
+    @extend_schema(tags=['Vendor Payouts'], request=PayoutBatchCreateSerializer)
+    @action(detail=False, methods=['post'], url_path='batch')
+    def create_batch(self, request):
+        """Create payouts for all approved settlements and write the bank upload file."""
+        serializer = PayoutBatchCreateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        batch = PayoutService.create_batch(
+            payment_method=serializer.validated_data['payment_method'],
+            user=request.user,
+        )
+
+        return Response({
+            'success': True,
+            'data': PayoutBatchSerializer(batch).data
+        }, status=status.HTTP_201_CREATED)
+
 
 class VendorLedgerViewSet(viewsets.ReadOnlyModelViewSet):
     """ViewSet for vendor ledger entries."""
@@ -280,7 +326,7 @@ class VendorLedgerViewSet(viewsets.ReadOnlyModelViewSet):
 
     def get_queryset(self):
         user = self.request.user
-        queryset = VendorLedger.objects.select_related('vendor', 'settlement', 'payout')
+        queryset = VendorLedger.objects.select_related('vendor')
 
         if user.role in ['super_admin', 'admin']:
             return queryset
@@ -295,6 +341,41 @@ class VendorLedgerViewSet(viewsets.ReadOnlyModelViewSet):
         """List vendor ledger entries."""
         return super().list(request, *args, **kwargs)
 
+    @extend_schema(tags=['Vendor Ledger'])
+    @action(detail=False, methods=['get'])
+    def balance(self, request):
+        """Get the current ledger balance (admins pass ?vendor=<id>)."""
+        user = request.user
+        if user.role in ['super_admin', 'admin']:
+            vendor_id = request.query_params.get('vendor')
+            if not vendor_id:
+                return Response({
+                    'success': False,
+                    'error': {'message': 'vendor is required'}
+                }, status=status.HTTP_400_BAD_REQUEST)
+        elif user.role == 'vendor' and hasattr(user, 'vendor'):
+            vendor_id = user.vendor.id
+        else:
+            # Only admins may look up another vendor's balance
+            return Response({
+                'success': False,
+                'error': {'message': 'Vendor profile not found'}
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        from apps.vendors.models import Vendor
+        try:
+            balance = LedgerService.get_balance(vendor_id)
+        except (Vendor.DoesNotExist, ValueError):
+            return Response({
+                'success': False,
+                'error': {'message': 'Vendor not found'}
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        return Response({
+            'success': True,
+            'data': {'vendor': int(vendor_id), 'balance': balance}
+        })
+
 
 class CommissionRecordViewSet(viewsets.ReadOnlyModelViewSet):
     """ViewSet for commission records."""
@@ -4,6 +4,7 @@ Base settings for ERP E-Commerce project.
 import os
 from pathlib import Path
 from datetime import timedelta
+from corsheaders.defaults import default_headers
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -126,6 +127,15 @@ MEDIA_ROOT = BASE_DIR / os.getenv('MEDIA_ROOT', 'media')
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Cache (use a shared backend such as django.core.cache.backends.redis.RedisCache
+# in production so every worker sees the same cached carts and lookups)
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    }
+}
+
 # Django REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
@@ -196,6 +206,53 @@ OTP_EXPIRY_MINUTES = int(os.getenv('OTP_EXPIRY_MINUTES', 5))
 OTP_LENGTH = int(os.getenv('OTP_LENGTH', 6))
 OTP_MAX_ATTEMPTS = 3
 
+# Document number sequences (values reserved per database round trip)
+DOCUMENT_SEQUENCE_BLOCK_SIZE = int(os.getenv('DOCUMENT_SEQUENCE_BLOCK_SIZE', 20))
+
+# Orders awaiting online payment longer than this are auto-cancelled
+PENDING_PAYMENT_TIMEOUT_MINUTES = int(os.getenv('PENDING_PAYMENT_TIMEOUT_MINUTES', 30))
+
+# Cart storage: 'db' serves carts from the database on every request,
+# 'cache' keeps a compact write-through copy of each cart in the cache
+CART_STORAGE = os.getenv('CART_STORAGE', 'db')
+CART_CACHE_TIMEOUT = int(os.getenv('CART_CACHE_TIMEOUT', 7 * 24 * 3600))
+
+# Guest carts are identified by the X-Cart-Session header, which cross-origin
+# frontends must be allowed to send and read
+CORS_ALLOW_HEADERS = (*default_headers, 'x-cart-session')
+CORS_EXPOSE_HEADERS = ['X-Cart-Session']
+
+# Abandoned cart reminders and cleanup of idle guest carts
+CART_ABANDONED_AFTER_HOURS = int(os.getenv('CART_ABANDONED_AFTER_HOURS', 24))
+CART_ABANDONED_MAX_AGE_DAYS = int(os.getenv('CART_ABANDONED_MAX_AGE_DAYS', 14))
+CART_GUEST_RETENTION_DAYS = int(os.getenv('CART_GUEST_RETENTION_DAYS', 30))
+
+# Compiled coupons (applicability sets) are cached for this many seconds
+COUPON_CACHE_TIMEOUT = int(os.getenv('COUPON_CACHE_TIMEOUT', 300))
+
+# Largest single-use coupon run the admin API generates in one request;
+# bigger runs go through the generate_coupon_codes command
+COUPON_BULK_MAX_PER_REQUEST = int(os.getenv('COUPON_BULK_MAX_PER_REQUEST', 100000))
+
+# GST charged on the platform commission, in percent
+COMMISSION_TAX_RATE = os.getenv('COMMISSION_TAX_RATE', '18')
+
+# Bank bulk-upload payout files are written here; required for payout batches
+# (keep outside the source tree and MEDIA_ROOT)
+PAYOUT_FILES_DIR = os.getenv('PAYOUT_FILES_DIR')
+
+# Shared secret for HMAC-SHA256 signatures on payment gateway webhooks
+PAYMENT_WEBHOOK_SECRET = os.getenv('PAYMENT_WEBHOOK_SECRET', '')
+
+# Gateway client used for refunds (dotted path); required to process refunds
+PAYMENT_GATEWAY_CLIENT = os.getenv('PAYMENT_GATEWAY_CLIENT')
+
+# Concurrent gateway calls per refund worker
+REFUND_WORKERS = int(os.getenv('REFUND_WORKERS', 8))
+
+# Dashboard stats endpoints cache their numbers per user scope (0 disables)
+STATS_CACHE_TIMEOUT = int(os.getenv('STATS_CACHE_TIMEOUT', 30))
+
 # File Upload Settings
 FILE_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
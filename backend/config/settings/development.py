@@ -1,6 +1,7 @@
 """
 Development settings for ERP E-Commerce project.
 """
+import tempfile
 from .base import *
 
 # SECURITY WARNING: don't run with debug turned on in production!
@@ -88,6 +89,12 @@ except ImportError:
 REST_FRAMEWORK['DEFAULT_THROTTLE_CLASSES'] = []
 REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'] = {}
 
+# Payout upload files go to the temp directory, outside the source tree
+PAYOUT_FILES_DIR = os.getenv('PAYOUT_FILES_DIR', os.path.join(tempfile.gettempdir(), 'erp-payouts'))
+
+# Refunds are completed by the stub client without calling a gateway
+PAYMENT_GATEWAY_CLIENT = os.getenv('PAYMENT_GATEWAY_CLIENT', 'apps.payments.gateway.StubGatewayClient')
+
 # Show OTP in API response for development
 SHOW_OTP_IN_RESPONSE = True
 
@@ -0,0 +1,177 @@
+"""
+Management command to re-price order lines and totals in bulk with the
+shared pricing engine.
+
+Usage:
+    python manage.py recalculate_order_totals --type sales --status pending
+    python manage.py recalculate_order_totals --type purchase --dry-run
+    python manage.py recalculate_order_totals --benchmark 100000
+"""
+import random
+import time
+from collections import defaultdict
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.utils.pricing import (
+    LINE_INPUT_FIELDS,
+    LINE_OUTPUT_FIELDS,
+    order_totals,
+    price_line,
+    price_order,
+)
+
+
+def _order_types():
+    from apps.purchase_orders.models import PurchaseOrder, PurchaseOrderItem
+    from apps.sales_orders.models import SalesOrder, SalesOrderItem, VendorOrder, VendorOrderItem
+
+    return {
+        'sales': {
+            'order_model': SalesOrder,
+            'item_model': SalesOrderItem,
+            'order_fk': 'sales_order_id',
+            'item_fields': LINE_OUTPUT_FIELDS,
+            'order_fields': ['subtotal', 'discount_amount', 'tax_amount', 'total_amount'],
+        },
+        'vendor': {
+            'order_model': VendorOrder,
+            'item_model': VendorOrderItem,
+            'order_fk': 'vendor_order_id',
+            'item_fields': LINE_OUTPUT_FIELDS + ('commission_amount',),
+            'order_fields': ['subtotal', 'tax_amount', 'total_amount', 'commission_amount', 'vendor_earning'],
+        },
+        'purchase': {
+            'order_model': PurchaseOrder,
+            'item_model': PurchaseOrderItem,
+            'order_fk': 'purchase_order_id',
+            'item_fields': LINE_OUTPUT_FIELDS,
+            'order_fields': ['subtotal', 'discount_amount', 'tax_amount', 'total_amount'],
+        },
+    }
+
+
+class Command(BaseCommand):
+    help = 'Recalculate order line amounts and order totals in bulk'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--type', dest='order_type', choices=['sales', 'vendor', 'purchase'], default='sales')
+        parser.add_argument('--status', action='append', help='Only orders in this status (repeatable)')
+        parser.add_argument('--chunk-size', type=int, default=500, help='Orders processed per transaction')
+        parser.add_argument('--dry-run', action='store_true', help='Report differences without saving')
+        parser.add_argument(
+            '--benchmark',
+            type=int,
+            metavar='LINES',
+            help='Price LINES synthetic lines in memory and report throughput',
+        )
+
+    def handle(self, *args, **options):
+        if options['benchmark']:
+            self._benchmark(options['benchmark'])
+            return
+
+        config = _order_types()[options['order_type']]
+        orders = config['order_model'].objects.all()
+        if options['status']:
+            orders = orders.filter(status__in=options['status'])
+
+        chunk_size = options['chunk_size']
+        seen = lines_changed = orders_changed = 0
+        last_id = 0
+        while True:
+            ids = list(orders.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:chunk_size])
+            if not ids:
+                break
+            with transaction.atomic():
+                changed = self._recalculate_chunk(config, ids, options['order_type'], options['dry_run'])
+            lines_changed += changed[0]
+            orders_changed += changed[1]
+            seen += len(ids)
+            last_id = ids[-1]
+
+        prefix = 'Would update' if options['dry_run'] else 'Updated'
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix} {lines_changed} lines and {orders_changed} of {seen} orders."
+        ))
+
+    def _recalculate_chunk(self, config, ids, order_type, dry_run):
+        item_model = config['item_model']
+        order_model = config['order_model']
+        order_fk = config['order_fk']
+        item_fields = list(config['item_fields'])
+        order_fields = config['order_fields']
+
+        input_fields = list(LINE_INPUT_FIELDS)
+        if order_type == 'vendor':
+            input_fields.append('commission_rate')
+
+        lines_by_order = defaultdict(list)
+        changed_items = []
+        for row in item_model.objects.filter(**{f'{order_fk}__in': ids}).values('id', order_fk, *input_fields, *item_fields):
+            stored = {field: row[field] for field in item_fields}
+            price_line(row)
+            lines_by_order[row[order_fk]].append(row)
+            if any(row[field] != stored[field] for field in item_fields):
+                changed_items.append(item_model(id=row['id'], **{field: row[field] for field in item_fields}))
+
+        order_values = ['id', 'discount_amount', 'shipping_amount', *order_fields]
+        if order_type == 'vendor':
+            order_values.append('vendor__commission_rate')
+        else:
+            order_values += ['discount_type', 'discount_value']
+
+        changed_orders = []
+        for row in order_model.objects.filter(id__in=ids).values(*dict.fromkeys(order_values)):
+            if order_type == 'vendor':
+                totals = order_totals(
+                    lines_by_order[row['id']],
+                    discount_type='amount',
+                    discount_value=row['discount_amount'],
+                    shipping_amount=row['shipping_amount'],
+                    commission_rate=row['vendor__commission_rate'],
+                )
+            else:
+                totals = order_totals(
+                    lines_by_order[row['id']],
+                    discount_type=row['discount_type'],
+                    discount_value=row['discount_value'],
+                    shipping_amount=row['shipping_amount'],
+                )
+            if any(totals[field] != row[field] for field in order_fields):
+                changed_orders.append(order_model(id=row['id'], **{field: totals[field] for field in order_fields}))
+
+        if not dry_run:
+            if changed_items:
+                item_model.objects.bulk_update(changed_items, item_fields)
+            if changed_orders:
+                order_model.objects.bulk_update(changed_orders, order_fields)
+
+        return len(changed_items), len(changed_orders)
+
+    def _benchmark(self, count):
+        rng = random.Random(42)
+        discount_types = [None, 'percentage', 'amount']
+        lines = [
+            {
+                'unit_price': Decimal(rng.randint(100, 500000)) / 100,
+                'quantity_ordered': rng.randint(1, 10),
+                'discount_type': rng.choice(discount_types),
+                'discount_value': Decimal(rng.randint(0, 2000)) / 100,
+                'tax_percentage': Decimal(rng.choice([0, 5, 12, 18, 28])),
+                'commission_rate': Decimal('10.00'),
+            }
+            for _ in range(count)
+        ]
+
+        started = time.perf_counter()
+        totals = price_order(lines, discount_type='percentage', discount_value=Decimal('5'),
+                             shipping_amount=Decimal('49'), commission_rate=Decimal('10'))
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            f"Priced {count} lines in {elapsed:.3f}s ({count / elapsed:,.0f} lines/s), "
+            f"total {totals['total_amount']}"
+        )
@@ -1,3 +1,5 @@
 from .base import BaseModel, TimeStampedModel
+from .sequence import DocumentSequence
+from .watermark import JobWatermark
 
-__all__ = ['BaseModel', 'TimeStampedModel']
+__all__ = ['BaseModel', 'TimeStampedModel', 'DocumentSequence', 'JobWatermark']
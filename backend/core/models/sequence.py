@@ -0,0 +1,28 @@
+"""
+Document number sequences.
+"""
+from django.db import models
+
+
+class DocumentSequence(models.Model):
+    """
+    Per-prefix, per-day counter backing human-readable document numbers
+    (SO-20240401-000001, PO-..., PAY-..., etc.).
+
+    Rows are only touched when a process needs a new block of numbers;
+    see core.utils.sequences.SequenceService.
+    """
+    prefix = models.CharField(max_length=20)
+    period = models.DateField()
+    last_value = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Document Sequence'
+        verbose_name_plural = 'Document Sequences'
+        constraints = [
+            models.UniqueConstraint(fields=['prefix', 'period'], name='uniq_document_sequence_prefix_period'),
+        ]
+
+    def __str__(self):
+        return f"{self.prefix} {self.period:%Y-%m-%d}: {self.last_value}"
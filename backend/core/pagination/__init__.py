@@ -1,3 +1,4 @@
 from .custom import StandardResultsPagination, LargeResultsPagination
+from .keyset import KeysetPagination
 
-__all__ = ['StandardResultsPagination', 'LargeResultsPagination']
+__all__ = ['StandardResultsPagination', 'LargeResultsPagination', 'KeysetPagination']
@@ -0,0 +1,98 @@
+"""
+Keyset (seek) pagination for high-traffic, append-mostly lists.
+"""
+import base64
+from datetime import datetime
+
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginate newest-first on (created_at, id) using an opaque cursor.
+
+    Each page is a range seek on an index leading with created_at (such as
+    (customer, -created_at)), so the cost of a page does not grow with how
+    far the client has scrolled, unlike OFFSET-based pages. Works on model
+    and values() querysets; the rows must expose `created_at` and `id`.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 50
+    cursor_query_param = 'cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size_value = self.get_page_size(request)
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            created_at, pk = self.decode_cursor(cursor)
+            queryset = queryset.filter(
+                Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+            )
+
+        rows = list(queryset.order_by('-created_at', '-id')[:self.page_size_value + 1])
+        self.has_more = len(rows) > self.page_size_value
+        rows = rows[:self.page_size_value]
+
+        self.next_cursor = None
+        if self.has_more:
+            last = rows[-1]
+            if isinstance(last, dict):
+                self.next_cursor = self.encode_cursor(last['created_at'], last['id'])
+            else:
+                self.next_cursor = self.encode_cursor(last.created_at, last.id)
+        return rows
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'success': True,
+            'data': data,
+            'pagination': {
+                'page_size': self.page_size_value,
+                'has_more': self.has_more,
+                'next_cursor': self.next_cursor,
+            }
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'success': {'type': 'boolean'},
+                'data': schema,
+                'pagination': {
+                    'type': 'object',
+                    'properties': {
+                        'page_size': {'type': 'integer'},
+                        'has_more': {'type': 'boolean'},
+                        'next_cursor': {'type': 'string', 'nullable': True},
+                    }
+                }
+            }
+        }
+
+    @staticmethod
+    def encode_cursor(created_at, pk) -> str:
+        raw = f"{created_at.isoformat()}|{pk}"
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    @staticmethod
+    def decode_cursor(cursor: str):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            created_at, pk = base64.urlsafe_b64decode(padded.encode()).decode().split('|')
+            return datetime.fromisoformat(created_at), int(pk)
+        except (ValueError, UnicodeDecodeError):
+            raise ValidationError({'cursor': 'Invalid cursor.'})
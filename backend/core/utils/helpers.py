@@ -4,8 +4,6 @@ Helper utilities for the application.
 import hashlib
 import random
 import string
-import uuid
-from datetime import datetime
 from django.utils.text import slugify
 
 
@@ -56,12 +54,11 @@ def get_client_ip(request):
 
 def generate_order_number(prefix='ORD'):
     """
-    Generate a unique order number.
-    Format: PREFIX-YYYYMMDD-XXXXXXXX
+    Generate a unique order number from the per-day sequence for `prefix`.
+    Format: PREFIX-YYYYMMDD-NNNNNN
     """
-    date_part = datetime.now().strftime('%Y%m%d')
-    unique_part = uuid.uuid4().hex[:8].upper()
-    return f"{prefix}-{date_part}-{unique_part}"
+    from core.utils.sequences import SequenceService
+    return SequenceService.next_number(prefix)
 
 
 def generate_po_number():
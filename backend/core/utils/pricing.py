@@ -0,0 +1,159 @@
+"""
+Order pricing engine.
+
+Pure functions over plain line dicts, shared by sales, vendor and purchase
+orders. All money values are Decimals quantized to 0.01 with ROUND_HALF_UP,
+so a line priced in a model save() and the same line priced by a bulk job
+always agree to the paisa.
+
+Line input keys (matching the order item model fields):
+    unit_price, quantity_ordered, discount_type, discount_value,
+    tax_percentage, commission_rate (optional)
+
+Priced line keys:
+    subtotal, discount_amount, tax_amount, total, commission_amount
+"""
+from decimal import Decimal, ROUND_HALF_UP
+
+ZERO = Decimal('0.00')
+HUNDRED = Decimal('100')
+TWO_PLACES = Decimal('0.01')
+
+DISCOUNT_PERCENTAGE = 'percentage'
+DISCOUNT_AMOUNT = 'amount'
+
+LINE_INPUT_FIELDS = (
+    'unit_price', 'quantity_ordered', 'discount_type', 'discount_value', 'tax_percentage',
+)
+LINE_OUTPUT_FIELDS = ('subtotal', 'discount_amount', 'tax_amount', 'total')
+
+
+def to_decimal(value) -> Decimal:
+    """Coerce None/int/float/str to Decimal without binary float artefacts."""
+    if value is None:
+        return ZERO
+    if isinstance(value, Decimal):
+        return value
+    if isinstance(value, float):
+        return Decimal(repr(value))
+    return Decimal(value)
+
+
+def quantize(value) -> Decimal:
+    """Round a money value to two decimal places (half up)."""
+    return to_decimal(value).quantize(TWO_PLACES, rounding=ROUND_HALF_UP)
+
+
+def calculate_discount(base: Decimal, discount_type, discount_value) -> Decimal:
+    """
+    Discount on `base` for a percentage or flat amount discount.
+
+    The discount never exceeds the base, so totals cannot go negative.
+    """
+    if discount_type == DISCOUNT_PERCENTAGE:
+        discount = (base * to_decimal(discount_value) / HUNDRED).quantize(TWO_PLACES, rounding=ROUND_HALF_UP)
+    elif discount_type == DISCOUNT_AMOUNT:
+        discount = quantize(discount_value)
+    else:
+        return ZERO
+    return min(discount, base) if discount > 0 else ZERO
+
+
+def price_line(line: dict) -> dict:
+    """
+    Price a single line in place.
+
+    Args:
+        line: Dict with the LINE_INPUT_FIELDS keys (commission_rate optional)
+
+    Returns:
+        The same dict with subtotal, discount_amount, tax_amount, total and
+        commission_amount set
+    """
+    subtotal = (to_decimal(line.get('unit_price')) * (line.get('quantity_ordered') or 0)).quantize(
+        TWO_PLACES, rounding=ROUND_HALF_UP
+    )
+    discount = calculate_discount(subtotal, line.get('discount_type'), line.get('discount_value'))
+    taxable = subtotal - discount
+    tax = (taxable * to_decimal(line.get('tax_percentage')) / HUNDRED).quantize(TWO_PLACES, rounding=ROUND_HALF_UP)
+    total = taxable + tax
+
+    line['subtotal'] = subtotal
+    line['discount_amount'] = discount
+    line['tax_amount'] = tax
+    line['total'] = total
+    line['commission_amount'] = (total * to_decimal(line.get('commission_rate')) / HUNDRED).quantize(
+        TWO_PLACES, rounding=ROUND_HALF_UP
+    )
+    return line
+
+
+def price_lines(lines):
+    """Price every line in an iterable in place and return them as a list."""
+    return [price_line(line) for line in lines]
+
+
+def order_totals(lines, discount_type=None, discount_value=None, shipping_amount=None,
+                 commission_rate=None) -> dict:
+    """
+    Total already-priced lines into order-level amounts.
+
+    The order subtotal is the sum of line values after line discounts; the
+    order discount (percentage or flat) applies on top of that, and tax is
+    the sum of line taxes.
+
+    Args:
+        lines: Iterable of priced line dicts (subtotal, discount_amount, tax_amount)
+        discount_type: Order-level discount type ('percentage' or 'amount')
+        discount_value: Order-level discount value
+        shipping_amount: Shipping charged on the order
+        commission_rate: Marketplace commission percentage on the order total
+
+    Returns:
+        Dict with subtotal, discount_amount, tax_amount, shipping_amount,
+        total_amount, commission_amount and vendor_earning
+    """
+    subtotal = ZERO
+    tax = ZERO
+    for line in lines:
+        subtotal += to_decimal(line['subtotal']) - to_decimal(line['discount_amount'])
+        tax += to_decimal(line['tax_amount'])
+
+    discount = calculate_discount(subtotal, discount_type, discount_value)
+    shipping = quantize(shipping_amount)
+    total = subtotal - discount + tax + shipping
+    commission = (total * to_decimal(commission_rate) / HUNDRED).quantize(TWO_PLACES, rounding=ROUND_HALF_UP)
+
+    return {
+        'subtotal': subtotal,
+        'discount_amount': discount,
+        'tax_amount': tax,
+        'shipping_amount': shipping,
+        'total_amount': total,
+        'commission_amount': commission,
+        'vendor_earning': total - commission,
+    }
+
+
+def price_order(lines, **order_kwargs) -> dict:
+    """
+    Price a whole basket in one pass.
+
+    Args:
+        lines: Iterable of line input dicts; priced in place
+        **order_kwargs: Passed through to order_totals
+
+    Returns:
+        order_totals() result with the priced lines under 'lines'
+    """
+    priced = price_lines(lines)
+    totals = order_totals(priced, **order_kwargs)
+    totals['lines'] = priced
+    return totals
+
+
+def line_from_instance(instance) -> dict:
+    """Build a line input dict from an order item model instance."""
+    line = {field: getattr(instance, field) for field in LINE_INPUT_FIELDS}
+    line['commission_rate'] = getattr(instance, 'commission_rate', None)
+    return line
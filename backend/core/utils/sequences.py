@@ -0,0 +1,210 @@
+"""
+Central sequence service for human-readable document numbers.
+
+Numbers have the form PREFIX-YYYYMMDD-NNNNNN and are monotonic per prefix
+and day within a process. Each process reserves a block of values from the
+DocumentSequence row in one short UPDATE and hands them out from memory, so
+the counter row is only locked once per block instead of once per document.
+
+Blocks are reserved in their own transaction, committed straight away: on a
+dedicated connection when the caller is inside transaction.atomic(), so the
+counter row is never held until the caller's (possibly long) transaction
+ends. Values handed out to a transaction that later rolls back, and unused
+values when the process exits, are skipped: numbers may have gaps but are
+never duplicated. SQLite cannot take a second writer while the caller
+writes, so there a caller inside a transaction gets one value per UPDATE.
+"""
+import logging
+import threading
+from collections import deque
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, connection, connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+class SequenceService:
+    """Allocate per-prefix, per-day document numbers in cached blocks."""
+
+    DEFAULT_BLOCK_SIZE = 20
+    NUMBER_WIDTH = 6
+
+    _blocks = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def next_number(cls, prefix: str, day=None) -> str:
+        """
+        Return the next document number for a prefix.
+
+        Args:
+            prefix: Document prefix, e.g. 'SO', 'PO', 'PAY'
+            day: Date the number belongs to (defaults to today, local time)
+
+        Returns:
+            Number formatted as PREFIX-YYYYMMDD-NNNNNN
+        """
+        day = day or timezone.localdate()
+        value = cls.next_value(prefix, day)
+        return f"{prefix}-{day.strftime('%Y%m%d')}-{value:0{cls.NUMBER_WIDTH}d}"
+
+    @classmethod
+    def next_value(cls, prefix: str, day=None) -> int:
+        """
+        Return the next raw counter value for a prefix and day.
+
+        Args:
+            prefix: Document prefix
+            day: Date the counter belongs to (defaults to today, local time)
+
+        Returns:
+            Counter value, starting at 1 each day
+        """
+        day = day or timezone.localdate()
+        key = (prefix, day)
+
+        with cls._lock:
+            value = cls._take_cached(key)
+        if value is not None:
+            return value
+
+        if not connection.in_atomic_block:
+            start, end = cls._allocate_block(prefix, day, cls.get_block_size())
+        elif connection.vendor == 'sqlite':
+            return cls._allocate_block(prefix, day, 1)[0]
+        else:
+            start, end = cls._allocate_block_detached(prefix, day, cls.get_block_size())
+
+        # The block is already committed, so the rest can be cached now
+        if start < end:
+            cls._store_block(key, start + 1, end)
+        return start
+
+    @staticmethod
+    def get_block_size() -> int:
+        """Number of values reserved per database round trip."""
+        return max(int(getattr(settings, 'DOCUMENT_SEQUENCE_BLOCK_SIZE', SequenceService.DEFAULT_BLOCK_SIZE)), 1)
+
+    @classmethod
+    def reset_cache(cls):
+        """Drop all cached blocks (e.g. after a fork or in tests)."""
+        with cls._lock:
+            cls._blocks.clear()
+
+    @classmethod
+    def _take_cached(cls, key):
+        """Pop the next cached value for a key; caller must hold the lock."""
+        ranges = cls._blocks.get(key)
+        while ranges:
+            current = ranges[0]
+            if current[0] <= current[1]:
+                value = current[0]
+                current[0] += 1
+                return value
+            ranges.popleft()
+        return None
+
+    @classmethod
+    def _store_block(cls, key, start: int, end: int):
+        """Cache the unused remainder of an allocated block."""
+        today = timezone.localdate()
+        with cls._lock:
+            # Blocks for past days will never be used again
+            for stale in [k for k in cls._blocks if k[1] < today]:
+                del cls._blocks[stale]
+            if key[1] >= today:
+                cls._blocks.setdefault(key, deque()).append([start, end])
+
+    @staticmethod
+    def _allocate_block(prefix: str, day, size: int):
+        """
+        Reserve `size` consecutive values from the database counter.
+
+        Returns:
+            (first, last) values of the reserved block, inclusive
+        """
+        from core.models import DocumentSequence
+
+        with transaction.atomic():
+            updated = DocumentSequence.objects.filter(
+                prefix=prefix, period=day
+            ).update(last_value=F('last_value') + size)
+
+            if not updated:
+                try:
+                    with transaction.atomic():
+                        DocumentSequence.objects.create(
+                            prefix=prefix, period=day, last_value=size
+                        )
+                except IntegrityError:
+                    # Another process created the row first
+                    DocumentSequence.objects.filter(
+                        prefix=prefix, period=day
+                    ).update(last_value=F('last_value') + size)
+
+            last_value = DocumentSequence.objects.filter(
+                prefix=prefix, period=day
+            ).values_list('last_value', flat=True).get()
+
+        logger.debug("Allocated %s sequence block %s-%s for %s", prefix, last_value - size + 1, last_value, day)
+        return last_value - size + 1, last_value
+
+    @classmethod
+    def _allocate_block_detached(cls, prefix: str, day, size: int):
+        """
+        Reserve a block on a short-lived connection of its own, committed at
+        once. The connection is closed afterwards, so it never outlives the
+        allocation (one connect per block, not per number).
+
+        Returns:
+            (first, last) values of the reserved block, inclusive
+        """
+        from core.models import DocumentSequence
+
+        conn = connections.create_connection(DEFAULT_DB_ALIAS)
+        table = conn.ops.quote_name(DocumentSequence._meta.db_table)
+        period = conn.ops.adapt_datefield_value(day)
+        now = conn.ops.adapt_datetimefield_value(timezone.now())
+
+        try:
+            conn.set_autocommit(False)
+            # A second pass only happens if another process created the row first
+            for attempt in range(2):
+                try:
+                    with conn.cursor() as cursor:
+                        cursor.execute(
+                            f"UPDATE {table} SET last_value = last_value + %s, updated_at = %s "
+                            f"WHERE prefix = %s AND period = %s",
+                            [size, now, prefix, period],
+                        )
+                        if not cursor.rowcount:
+                            cursor.execute(
+                                f"INSERT INTO {table} (prefix, period, last_value, updated_at) "
+                                f"VALUES (%s, %s, %s, %s)",
+                                [prefix, period, size, now],
+                            )
+                        cursor.execute(
+                            f"SELECT last_value FROM {table} WHERE prefix = %s AND period = %s",
+                            [prefix, period],
+                        )
+                        last_value = cursor.fetchone()[0]
+                    conn.commit()
+                    break
+                except IntegrityError:
+                    conn.rollback()
+                    if attempt:
+                        raise
+        finally:
+            # Closing discards anything uncommitted
+            conn.close()
+
+        logger.debug("Allocated %s sequence block %s-%s for %s", prefix, last_value - size + 1, last_value, day)
+        return last_value - size + 1, last_value
+
+
+def next_document_number(prefix: str, day=None) -> str:
+    """Shortcut for SequenceService.next_number."""
+    return SequenceService.next_number(prefix, day)